@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Parser throughput over synthetic release names.
+
+Generates N names (default one million) from the filename shapes in tests/data.py,
+with random titles and years, then times the original three-regex parser against
+extract_title_and_year and extract_many, and checks they all agree.
+
+Usage: uv run python -m benchmarks.bench_parser [count] [processes]
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+import os
+import re
+import sys
+import time
+from typing import Optional
+
+from reelname.constants import (
+    BRACKETED_PATTERN,
+    DOT_YEAR_PATTERN,
+    SPACE_YEAR_PATTERN,
+    URL_PREFIX_PATTERN,
+)
+from reelname.utils import extract_many, extract_title_and_year
+
+from .names import generate, shapes
+
+Parsed = tuple[Optional[str], Optional[str]]
+
+
+def legacy_extract(filename: str) -> tuple[str | None, str | None]:
+    """The parser as it was before the single-pass matcher, for comparison."""
+    if m := URL_PREFIX_PATTERN.match(filename):
+        filename = filename[m.end() :]
+    for pat in (BRACKETED_PATTERN, DOT_YEAR_PATTERN, SPACE_YEAR_PATTERN):
+        if m := pat.search(filename):
+            raw_title = m.group("title").strip()
+            return re.sub(r"[._]+", " ", raw_title).strip(), m.group("year")
+    return None, None
+
+
+def timed(label: str, count: int, func: Callable[[], list[Parsed]]) -> list[Parsed]:
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:7.2f} s  {count / elapsed:12,.0f} names/s")
+    return result
+
+
+def main(count: int, processes: int) -> None:
+    names = generate(count)
+    print(f"{count:,} names from {len(list(shapes()))} shapes")
+    legacy = timed("legacy three-regex parser", count, lambda: [legacy_extract(n) for n in names])
+    fast = timed(
+        "extract_title_and_year", count, lambda: [extract_title_and_year(n) for n in names]
+    )
+    pooled = timed(
+        f"extract_many (processes={processes})",
+        count,
+        lambda: extract_many(names, processes=processes),
+    )
+    if not legacy == fast == pooled:
+        sys.exit("❌ parsers disagree")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1),
+    )
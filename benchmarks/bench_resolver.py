@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compare per-lookup overhead of a fresh Cinemagoer session per file
+against one shared ImdbResolver.
+
+The sessions are real Cinemagoer instances; only their data access (the
+dataset adapter's title query, this cinemagoer's equivalent of the HTTP
+opener) is replaced with canned rows, so building a session and parsing its
+results cost what they do in a real run.
+
+Usage: uv run python -m benchmarks.bench_resolver [lookups]
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Any
+
+from reelname.resolver import ImdbResolver
+from reelname.utils import _search_imdb
+
+# What IMDb's title_basics table holds for the query, plus a few near misses.
+ROWS = [
+    {"tconst": "tt1375666", "titleType": "movie", "primaryTitle": "Inception", "startYear": 2010},
+    {"tconst": "tt5295894", "titleType": "movie", "primaryTitle": "Inceptio", "startYear": 2016},
+    {"tconst": "tt1790736", "titleType": "video", "primaryTitle": "Inception", "startYear": 2010},
+]
+
+
+def _search_titles(*args: Any, **kwargs: Any) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    return [dict(row) for row in ROWS], []
+
+
+def session_factory(directory: Path) -> Any:
+    """Build real Cinemagoer sessions whose dataset queries return `ROWS`."""
+    from imdb import Cinemagoer
+
+    uri = f"sqlite:///{directory / 'cinemagoer.db'}"
+
+    def factory() -> Any:
+        ia = Cinemagoer(uri=uri)
+        ia._adapter.search_titles = _search_titles
+        return ia
+
+    return factory
+
+
+def bench(label: str, lookups: int, shared: bool, factory: Any) -> float:
+    resolver = ImdbResolver(size=1, factory=factory)
+    start = time.perf_counter()
+    for _ in range(lookups):
+        if not shared:
+            resolver = ImdbResolver(size=1, factory=factory)
+        _search_imdb("Inception", "2010", resolver)
+    per_lookup = (time.perf_counter() - start) / lookups
+    print(f"{label:<28} {per_lookup * 1000:8.3f} ms/lookup")
+    return per_lookup
+
+
+def main(lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        factory = session_factory(Path(directory))
+        factory()  # warm up: the imdb package imports its parser on first use
+        fresh = bench("fresh session per lookup", lookups, shared=False, factory=factory)
+        shared = bench("shared resolver", lookups, shared=True, factory=factory)
+    print(f"{'speedup':<28} {fresh / shared:8.2f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+End-to-end run_once benchmark with a stubbed IMDb.
+
+Fills a temporary directory with N synthetic release names, runs run_once
+against StubCinemagoer (configurable latency and result sets), and reports
+total time, per-stage time (scan, parse, lookup, rename) and peak memory.
+With --workers N it is also run sharded across N processes (each with its
+own stub), to see how throughput scales with cores.
+Results are written as JSON, one file per commit by default, so runs can
+be compared with --compare.
+
+Usage: uv run python -m benchmarks.bench_run [--files N] [--latency-ms MS] ...
+"""
+
+from __future__ import annotations
+
+import argparse
+from contextlib import redirect_stdout
+from functools import partial
+import io
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from reelname.metrics import Metrics
+from reelname.reelname import run_once
+from reelname.resolver import ImdbResolver
+from reelname.shard import run_sharded
+
+from .names import generate
+from .stub import StubCinemagoer
+
+RESULTS_DIR = Path(".benchmarks")
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return out.stdout.strip()
+
+
+def populate(directory: Path, names: list[str]) -> None:
+    for name in names:
+        (directory / name).touch()
+
+
+def run(
+    args: argparse.Namespace, names: list[str], trace_memory: bool, workers: int = 1
+) -> dict[str, Any]:
+    factory = partial(
+        StubCinemagoer,
+        latency=args.latency_ms / 1000,
+        candidates=args.candidates,
+        miss_rate=args.miss_rate,
+    )
+    with tempfile.TemporaryDirectory(prefix="reelname-bench-") as tmp:
+        populate(Path(tmp), names)
+        metrics = Metrics()
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            if workers > 1:
+                resolvers = partial(ImdbResolver, size=args.jobs, factory=factory)
+                run_sharded(tmp, workers, resolvers, jobs=args.jobs)
+            else:
+                resolver = ImdbResolver(size=args.jobs, factory=factory)
+                run_once(tmp, None, args.jobs, resolver, metrics=metrics)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        tracemalloc.stop()
+    return {"seconds": elapsed, "stages": metrics.as_dict(), "peak_memory_bytes": peak}
+
+
+def compare(current: dict[str, Any], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\nvs {baseline_path} ({baseline['commit']}):")
+
+    def delta(label: str, new: float, old: float) -> None:
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"  {label:<20} {old:10.3f} → {new:10.3f}  ({change:+.1f}%)")
+
+    delta("total seconds", current["seconds"], baseline["seconds"])
+    for stage, stats in current["stages"].items():
+        if stage in baseline["stages"]:
+            delta(f"{stage} seconds", stats["seconds"], baseline["stages"][stage]["seconds"])
+    delta(
+        "peak memory MiB",
+        current["peak_memory_bytes"] / 2**20,
+        baseline["peak_memory_bytes"] / 2**20,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files", type=int, default=2000, help="number of files to generate")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated search latency")
+    parser.add_argument("--candidates", type=int, default=8, help="results per search")
+    parser.add_argument(
+        "--miss-rate", type=float, default=0.1, help="share of searches with no match"
+    )
+    parser.add_argument("--jobs", type=int, default=8, help="concurrent lookups")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="also run sharded across this many processes"
+    )
+    parser.add_argument(
+        "--output", type=Path, help="JSON results file (default .benchmarks/<commit>.json)"
+    )
+    parser.add_argument("--compare", type=Path, help="earlier JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    names = generate(args.files, unique=True)
+    timing = run(args, names, trace_memory=False)
+    memory = run(args, names, trace_memory=True)  # tracemalloc skews timings, so a separate pass
+
+    result = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()},
+        "files": len(names),
+        "seconds": timing["seconds"],
+        "files_per_second": len(names) / timing["seconds"],
+        "stages": timing["stages"],
+        "peak_memory_bytes": memory["peak_memory_bytes"],
+    }
+    if args.workers > 1:
+        sharded = run(args, names, trace_memory=False, workers=args.workers)
+        result["sharded"] = {
+            "workers": args.workers,
+            "seconds": sharded["seconds"],
+            "files_per_second": len(names) / sharded["seconds"],
+            "speedup": timing["seconds"] / sharded["seconds"],
+        }
+
+    rate = result["files_per_second"]
+    print(f"{len(names)} files in {timing['seconds']:.3f} s ({rate:.0f} files/s)")
+    # lookup time is summed over all lookup workers, so it can exceed the total
+    for stage in ("scan", "parse", "lookup", "search", "rename"):
+        if stats := timing["stages"].get(stage):
+            print(f"  {stage:<8} {stats['count']:7d} x  {stats['seconds']:8.3f} s")
+    print(f"  peak memory {result['peak_memory_bytes'] / 2**20:.1f} MiB")
+    if scaled := result.get("sharded"):
+        speedup = scaled["speedup"]
+        print(
+            f"  {args.workers} workers {scaled['seconds']:.3f} s "
+            f"({speedup:.2f}x, {speedup / args.workers:.0%} of linear)"
+        )
+
+    output = args.output or RESULTS_DIR / f"{result['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    print(f"📄 Results written to {output}")
+
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,50 @@
+"""
+Synthetic release names built from the filename shapes in tests/data.py.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import random
+
+from tests.data import EXTRACT_CASES
+
+# title words borrowed from the test data, reshuffled into new titles
+WORDS = sorted({word for _, (title, _) in EXTRACT_CASES if title for word in title.split()})
+
+TITLE, YEAR = "\0T", "\0Y"
+
+
+def shapes() -> Iterator[tuple[str, str]]:
+    """Yield (template, separator) pairs derived from the EXTRACT_CASES filenames."""
+    for filename, (title, year) in EXTRACT_CASES:
+        if title is None:
+            yield filename, ""  # names without a year keep their shape as-is
+            continue
+        for sep in (".", " "):
+            raw = title.replace(" ", sep)
+            if raw in filename:
+                yield filename.replace(raw, TITLE, 1).replace(year, YEAR, 1), sep
+                break
+
+
+def generate(count: int, seed: int = 0, unique: bool = False) -> list[str]:
+    """
+    Return `count` release names; with `unique=True` all of them distinct,
+    so they can live in one directory.
+    """
+    rng = random.Random(seed)  # noqa: S311
+    templates = list(shapes())
+    names: list[str] = []
+    seen: set[str] = set()
+    while len(names) < count:
+        template, sep = rng.choice(templates)
+        title = sep.join(rng.sample(WORDS, rng.randint(1, 4)))
+        year = str(rng.randint(1920, 2025))
+        name = template.replace(TITLE, title).replace(YEAR, year)
+        if unique:
+            if name in seen:
+                continue
+            seen.add(name)
+        names.append(name)
+    return names
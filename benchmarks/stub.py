@@ -0,0 +1,48 @@
+"""
+A deterministic, offline stand-in for Cinemagoer.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+import zlib
+
+
+class StubCinemagoer:
+    """
+    Answers `search_movie` like Cinemagoer, without the network.
+
+    Every query gets `candidates` results: decoys from other years and with
+    altered titles, plus (unless the query falls in the `miss_rate` share) the
+    exact title, at a position that depends on the query. `latency` (seconds)
+    simulates a search round trip.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        candidates: int = 8,
+        miss_rate: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.candidates = max(candidates, 1)
+        self.miss_rate = miss_rate
+
+    def search_movie(self, query: str) -> list[dict[str, Any]]:
+        if self.latency:
+            time.sleep(self.latency)
+        title, _, year_str = query.rpartition(" ")
+        year = int(year_str)
+        seed = zlib.crc32(query.encode("utf-8"))
+
+        results: list[dict[str, Any]] = []
+        for i in range(self.candidates - 1):
+            decoy = f"{title} {'Returns' if i % 2 else 'Origins'} {i}"
+            results.append({"title": decoy, "year": year + (i % 3) - 1})
+        if (seed % 1000) / 1000 >= self.miss_rate:
+            results.insert(seed % self.candidates, {"title": title, "year": year})
+        return results
+
+    def update(self, movie: dict[str, Any]) -> None:
+        """Stub results always carry a year."""
@@ -1,4 +1,28 @@
-from ._version import __version__
-from .cli import main
+from __future__ import annotations
 
-__all__ = ["__version__", "main"]
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ._version import __version__
+    from .api import Resolution, aresolve_many, resolve_many
+    from .cli import main
+
+__all__ = ["Resolution", "__version__", "aresolve_many", "main", "resolve_many"]
+
+# Public names and the module each comes from. They are loaded on first use, so
+# importing a submodule doesn't pull in the CLI or the lookup machinery, and the
+# installed version is only read (via importlib.metadata) when asked for.
+_LAZY = {
+    "__version__": "._version",
+    "main": ".cli",
+    "Resolution": ".api",
+    "aresolve_many": ".api",
+    "resolve_many": ".api",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY:
+        raise AttributeError(name)
+    return getattr(import_module(_LAZY[name], __name__), name)
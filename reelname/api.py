@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple, Union
+
+from .cache import LookupCache, normalize_key
+from .constants import COALESCE_WINDOW, DEFAULT_JOBS
+from .exceptions import LookupFailedError
+from .resolver import ImdbResolver, Resolver
+from .throttle import ThrottledResolver, TokenBucket
+from .utils import extract_title_and_year, get_match_score, lookup_imdb_source, rebuild_filename
+
+_Match = tuple[Union[tuple[str, str], None], str]  # (title, year) or None, and its source
+
+
+class Resolution(NamedTuple):
+    """What `resolve_many` worked out for one file name."""
+
+    original: str
+    title: str | None  # the matched title, else the one parsed from the name
+    year: str | None
+    new_name: str | None  # None without a title/year to go by, or if the lookup failed
+    score: float | None  # fuzzy match score (0-100) of the matched title, None if unmatched
+    # where the title came from: "lookup" (the resolver), "cache", "similar" (the
+    # cached match of a close enough title), "filename" (no match, so the parsed
+    # title is kept), "formatted" (already "Title (Year) ..."), "unparsed" (no
+    # title/year found) or "failed" (the lookup failed after retries)
+    source: str
+
+
+class _Started(NamedTuple):
+    """A name whose lookup is running; `lookup` may be shared with other names."""
+
+    original: str
+    title: str
+    year: str
+    lookup: Any  # concurrent.futures.Future or asyncio.Future of a _Match
+
+
+class _Batch:
+    """Parsing, lookup coalescing and result building shared by the sync and async APIs."""
+
+    def __init__(self, jobs: int, resolver: Resolver | None, cache: LookupCache | None) -> None:
+        self.resolver = resolver or ThrottledResolver(
+            ImdbResolver(size=jobs), TokenBucket(burst=jobs)
+        )
+        self.cache = cache
+        # most recent lookups by key, capped like the pipeline's
+        self.inflight: OrderedDict[tuple[str, str], Any] = OrderedDict()
+
+    def lookup(self, title: str, year: str) -> _Match:
+        """Runs on a worker thread."""
+        try:
+            return lookup_imdb_source(title, year, self.cache, self.resolver)
+        except LookupFailedError:
+            return None, "failed"
+
+    def start(self, name: str, spawn: Callable[..., Any]) -> Resolution | _Started:
+        """Parse `name` and, if it needs one, start its lookup with `spawn`."""
+        title, year = extract_title_and_year(name)
+        if not title or not year:
+            return Resolution(name, None, None, None, None, "unparsed")
+        if name.startswith(f"{title} ({year})"):
+            return Resolution(name, title, year, name, None, "formatted")
+        key = normalize_key(title, year)
+        if (future := self.inflight.get(key)) is None:
+            future = self.inflight[key] = spawn(self.lookup, title, year)
+            if len(self.inflight) > COALESCE_WINDOW:
+                self.inflight.popitem(last=False)
+        return _Started(name, title, year, future)
+
+    @staticmethod
+    def finish(started: _Started, result: _Match) -> Resolution:
+        name, title, year, _ = started
+        match, source = result
+        if source == "failed":
+            return Resolution(name, title, year, None, None, source)
+        score = None
+        if match is None:
+            source = "filename"
+        else:
+            score = get_match_score(title, match[0])
+            title, year = match
+        # the new name is built from the part of the name starting at the parsed year
+        new_name = rebuild_filename(name[name.find(started.year) :], title, year)
+        return Resolution(name, title, year, new_name, score, source)
+
+
+def resolve_many(
+    names: Iterable[str],
+    *,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    cache: LookupCache | None = None,
+) -> Iterator[Resolution]:
+    """
+    Work out the new name of each file name in `names`, the way `reelname run`
+    would, without touching the file system. Results come back in input order.
+
+    Names are read from `names` only as results are consumed: at most
+    `jobs * 2` are in flight, looked up by `jobs` worker threads, so any
+    number of names streams through in constant memory. Duplicate titles
+    close together share one lookup. Pass a `LookupCache` to use and fill
+    the on-disk lookup cache; there is none by default.
+    """
+    batch = _Batch(jobs, resolver, cache)
+    window: deque[Resolution | _Started] = deque()
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="reelname")
+
+    def result(item: Resolution | _Started) -> Resolution:
+        if isinstance(item, Resolution):
+            return item
+        future: Future[_Match] = item.lookup
+        return batch.finish(item, future.result())
+
+    try:
+        for name in names:
+            window.append(batch.start(name, executor.submit))
+            if len(window) >= jobs * 2:
+                yield result(window.popleft())
+        while window:
+            yield result(window.popleft())
+    finally:
+        # a consumer that stops early shouldn't wait for lookups nobody will read
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aresolve_many(
+    names: Iterable[str] | AsyncIterable[str],
+    *,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    cache: LookupCache | None = None,
+) -> AsyncIterator[Resolution]:
+    """
+    `resolve_many` for asyncio: an async iterator over the results for a
+    plain or async iterable of names. Lookups run on worker threads, so the
+    event loop is never blocked by the network.
+    """
+    loop = asyncio.get_running_loop()
+    batch = _Batch(jobs, resolver, cache)
+    window: deque[Resolution | _Started] = deque()
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="reelname")
+
+    def spawn(func: Callable[[str, str], _Match], title: str, year: str) -> Awaitable[_Match]:
+        return loop.run_in_executor(executor, func, title, year)
+
+    async def result(item: Resolution | _Started) -> Resolution:
+        if isinstance(item, Resolution):
+            return item
+        return batch.finish(item, await item.lookup)
+
+    async def each_name() -> AsyncIterator[str]:
+        if isinstance(names, AsyncIterable):
+            async for name in names:
+                yield name
+        else:
+            for name in names:
+                yield name
+
+    try:
+        async for name in each_name():
+            window.append(batch.start(name, spawn))
+            if len(window) >= jobs * 2:
+                yield await result(window.popleft())
+        while window:
+            yield await result(window.popleft())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import logging
+import os
+from pathlib import Path
+import sqlite3
+import sys
+import threading
+import time
+from types import TracebackType
+from typing import Callable, NamedTuple
+
+from .constants import (
+    CACHE_HIT_TTL,
+    CACHE_MISS_TTL,
+    CACHE_TIMEOUT,
+    EARLY_EXIT_SCORE,
+    MATCH_THRESHOLD,
+    NON_WORD_PATTERN,
+    TITLE_SEPARATOR_PATTERN,
+)
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookups (
+    title      TEXT NOT NULL,
+    year       TEXT NOT NULL,
+    imdb_title TEXT,
+    imdb_year  TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (title, year)
+);
+CREATE INDEX IF NOT EXISTS lookups_by_imdb_year ON lookups (imdb_year);
+"""
+
+# Scores a title against candidate titles, like utils.get_match_scores
+Scorer = Callable[[str, list[str]], list[float]]
+
+
+def default_cache_dir() -> Path:
+    """
+    Return the per-user cache directory for reelname.
+
+    Honours $REELNAME_CACHE_DIR, then the platform conventions
+    (%LOCALAPPDATA% on Windows, ~/Library/Caches on macOS, $XDG_CACHE_HOME elsewhere).
+    """
+    if override := os.environ.get("REELNAME_CACHE_DIR"):
+        return Path(override)
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "reelname"
+
+
+def normalize_key(title: str, year: str) -> tuple[str, str]:
+    """
+    Normalize an extracted (title, year) so trivially different spellings
+    ("The.Dark.Knight", "the dark  knight") share a cache entry.
+    """
+    return " ".join(TITLE_SEPARATOR_PATTERN.sub(" ", title).casefold().split()), year.strip()
+
+
+def _similarity_key(title: str) -> str:
+    """`title` casefolded with punctuation dropped, for comparing it to resolved titles."""
+    return " ".join(NON_WORD_PATTERN.sub(" ", title).casefold().split())
+
+
+class CacheEntry(NamedTuple):
+    """A cached lookup outcome. Both fields are None for a cached "no match"."""
+
+    imdb_title: str | None
+    imdb_year: str | None
+
+    @property
+    def match(self) -> tuple[str, str] | None:
+        if self.imdb_title is None or self.imdb_year is None:
+            return None
+        return self.imdb_title, self.imdb_year
+
+
+class CacheStats(NamedTuple):
+    """How a cache's reads went, for the end-of-run report."""
+
+    hits: int = 0
+    misses: int = 0
+    similar_hits: int = 0
+    similar_misses: int = 0
+
+
+class LookupCache:
+    """
+    Persistent SQLite cache of IMDb lookups keyed on the normalized (title, year).
+
+    Matches and "no match" results are both stored, each expiring after its own TTL.
+    With `refresh=True` reads are skipped, so every lookup goes to the network
+    and overwrites what was stored. Safe to share between lookup worker threads.
+
+    The IMDb titles matched so far also form an index, bucketed by year, that
+    `similar` searches for titles spelled differently from any cached lookup.
+
+    The database is in WAL mode, so several processes (`--workers`) can use
+    it at once: readers never wait, and writers queue for up to `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        *,
+        hit_ttl: float = CACHE_HIT_TTL,
+        miss_ttl: float = CACHE_MISS_TTL,
+        refresh: bool = False,
+        timeout: float = CACHE_TIMEOUT,
+    ) -> None:
+        self.path = path or default_cache_dir() / "lookups.sqlite3"
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.similar_hits = 0
+        self.similar_misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        # year -> {similarity key: IMDb title}, loaded the first time a year is searched
+        self._buckets: dict[str, dict[str, str]] = {}
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(self.hits, self.misses, self.similar_hits, self.similar_misses)
+
+    def get(self, title: str, year: str) -> CacheEntry | None:
+        """Return the cached outcome for (title, year), or None if absent or expired."""
+        with self._lock:
+            row = None
+            if not self.refresh:
+                row = self._conn.execute(
+                    "SELECT imdb_title, imdb_year, created_at FROM lookups "
+                    "WHERE title = ? AND year = ?",
+                    normalize_key(title, year),
+                ).fetchone()
+            if row is not None:
+                entry = CacheEntry(row[0], row[1])
+                ttl = self.hit_ttl if entry.match else self.miss_ttl
+                if time.time() - row[2] < ttl:
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def set(self, title: str, year: str, match: tuple[str, str] | None) -> None:
+        """Store a lookup outcome; `match=None` records a "no match"."""
+        imdb_title, imdb_year = match if match else (None, None)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookups VALUES (?, ?, ?, ?, ?)",
+                (*normalize_key(title, year), imdb_title, imdb_year, time.time()),
+            )
+            self._conn.commit()
+            bucket = self._buckets.get(str(imdb_year))
+            if imdb_title is not None and bucket is not None:
+                bucket.setdefault(_similarity_key(imdb_title), imdb_title)
+
+    def _bucket(self, year: str) -> dict[str, str]:
+        """IMDb titles matched for `year` that haven't expired; call with the lock held."""
+        if (bucket := self._buckets.get(year)) is None:
+            rows = self._conn.execute(
+                "SELECT DISTINCT imdb_title FROM lookups "
+                "WHERE imdb_year = ? AND imdb_title IS NOT NULL AND created_at >= ?",
+                (year, time.time() - self.hit_ttl),
+            )
+            bucket = self._buckets[year] = {_similarity_key(t): t for (t,) in rows}
+        return bucket
+
+    def similar(
+        self,
+        title: str,
+        year: str,
+        scorer: Scorer,
+        threshold: float = MATCH_THRESHOLD,
+        early_exit: float = EARLY_EXIT_SCORE,
+    ) -> tuple[str, str] | None:
+        """
+        The best IMDb title already matched for `year` that `scorer` rates at
+        least `threshold` against `title`, or None. Punctuation and case are
+        ignored, so "Spider Man" finds "Spider-Man". Skipped with `refresh`.
+        """
+        if self.refresh:
+            return None
+        key = _similarity_key(title)
+        year = year.strip()
+        with self._lock:
+            bucket = self._bucket(year)
+            names = list(bucket)
+        best = None
+        best_score = 0.0
+        if key in bucket:
+            best, best_score = key, 100.0
+        elif names:
+            for name, score in zip(names, scorer(key, names)):
+                if score >= threshold and score > best_score:
+                    best, best_score = name, score
+                    if score >= early_exit:
+                        break
+        with self._lock:
+            if best is None:
+                self.similar_misses += 1
+                return None
+            self.similar_hits += 1
+        logger.debug("reused %r (%s) for %r: %.1f", bucket[best], year, title, best_score)
+        return bucket[best], year
+
+    def prune(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM lookups WHERE "
+                "(imdb_title IS NOT NULL AND created_at < ?) OR "
+                "(imdb_title IS NULL AND created_at < ?)",
+                (now - self.hit_ttl, now - self.miss_ttl),
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> LookupCache:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
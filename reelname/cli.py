@@ -1,11 +1,259 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import partial
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
 import click
 
-from ._version import __version__
-from .reelname import run_once, watch_directory
+from .constants import (
+    DEFAULT_DEBOUNCE,
+    DEFAULT_JOBS,
+    LIBRARY_LAYOUT,
+    LOOKUP_RATE,
+    LOOKUP_RATE_MAX,
+    LOOKUP_RATE_MIN,
+    PROFILE_TOP,
+)
+from .exceptions import ReelNameError
+from .scan import ScanOptions, normalize_extensions
+
+# The modules behind each command are imported inside it, so that `--help`,
+# `--version` and shell completion don't pay for asyncio, sqlite3, IMDb access
+# and the rest of the pipeline.
+if TYPE_CHECKING:
+    from .metrics import Metrics
+    from .profiling import SamplingProfiler
+    from .resolver import Resolver
+
+CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class DefaultGroup(click.Group):
+    """
+    A group that falls back to `default_command` when the first argument
+    isn't one of its subcommands, so `reelname DIR` keeps working next to
+    `reelname index build ...`.
+    """
+
+    def __init__(self, *args: Any, default_command: str, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or args[0] not in self.commands:
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+# Options shared by `run` and `plan`
+SCAN_OPTIONS = [
+    click.option(
+        "-r",
+        "--recursive",
+        is_flag=True,
+        default=False,
+        help="Also process files in subdirectories",
+    ),
+    click.option(
+        "--include",
+        metavar="GLOB",
+        multiple=True,
+        help="Only process files whose name or relative path matches (repeatable)",
+    ),
+    click.option(
+        "--exclude",
+        metavar="GLOB",
+        multiple=True,
+        help="Skip files and subdirectories whose name or relative path matches (repeatable)",
+    ),
+    click.option(
+        "--ext",
+        "extensions",
+        metavar="EXT",
+        multiple=True,
+        help="Only process files with this extension, e.g. mkv (repeatable)",
+    ),
+]
+LOOKUP_OPTIONS = [
+    click.option(
+        "-j",
+        "--jobs",
+        type=click.IntRange(min=1),
+        default=DEFAULT_JOBS,
+        show_default=True,
+        help="Number of IMDb lookups to run concurrently",
+    ),
+    click.option(
+        "--rate",
+        metavar="PER_SECOND",
+        type=click.FloatRange(min=LOOKUP_RATE_MIN, max=LOOKUP_RATE_MAX),
+        default=LOOKUP_RATE,
+        show_default=True,
+        help="IMDb requests per second to start at; backs off when throttled",
+    ),
+    click.option(
+        "--no-cache",
+        is_flag=True,
+        default=False,
+        help="Bypass the on-disk IMDb lookup cache",
+    ),
+    click.option(
+        "--refresh-cache",
+        is_flag=True,
+        default=False,
+        help="Ignore cached lookups and overwrite them with fresh results, "
+        "re-checking files already handled",
+    ),
+    click.option(
+        "--resolver",
+        "resolver_name",
+        type=click.Choice(["imdb", "offline"]),
+        default="imdb",
+        show_default=True,
+        help="Look titles up on IMDb, or in a local index built with `reelname index build`",
+    ),
+    click.option(
+        "--index",
+        "index_path",
+        type=click.Path(dir_okay=False, path_type=Path),
+        default=None,
+        help="Offline index to use with --resolver offline",
+    ),
+]
+SOCKET_OPTION = click.option(
+    "--socket",
+    "socket_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Daemon socket [default: $XDG_RUNTIME_DIR/reelname.sock or the cache directory]",
+)
+
+
+def make_resolver(
+    resolver_name: str, index_path: Path | None, jobs: int, rate: float = LOOKUP_RATE
+) -> Resolver:
+    if resolver_name == "offline":
+        from .offline import OfflineResolver
+
+        try:
+            return OfflineResolver(index_path)
+        except ReelNameError as exc:
+            raise click.ClickException(str(exc)) from exc
+    from .resolver import ImdbResolver
+    from .throttle import ThrottledResolver, TokenBucket
+
+    return ThrottledResolver(ImdbResolver(size=jobs), TokenBucket(rate, burst=jobs))
+
+
+def report_throttling(resolver: Resolver) -> None:
+    from .throttle import ThrottledResolver
+
+    if not isinstance(resolver, ThrottledResolver):
+        return
+    stats = resolver.stats
+    if stats.retries or stats.failed:
+        click.echo(
+            f"🚦 IMDb errors: {stats.retries} retried ({stats.throttled} rate-limited), "
+            f"{stats.failed} lookups failed, lookups paused {resolver.breaker.trips} times"
+        )
+
+
+def write_metrics(metrics: Metrics, stats_path: Path | None, metrics_file: Path | None) -> None:
+    if metrics_file is not None:
+        metrics.write_textfile(metrics_file)
+    if stats_path is not None:
+        summary = json.dumps(metrics.summary(), indent=2)
+        if str(stats_path) == "-":
+            click.echo(summary)
+        else:
+            stats_path.write_text(summary + "\n", encoding="utf-8")
+
+
+def write_profile(profiler: SamplingProfiler, path: Path) -> None:
+    profiler.write_collapsed(path)
+    busy, hotspots = profiler.hotspots(PROFILE_TOP)
+    if not busy:
+        click.echo(f"🔥 Run too short to sample; stacks in {path}")
+        return
+    click.echo(f"🔥 Hotspots ({busy} busy samples; self% total%), stacks in {path}:")
+    for label, own, total in hotspots:
+        click.echo(f"  {own / busy:6.1%} {total / busy:6.1%}  {label}")
+
+
+def print_version(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    # click.version_option needs the version up front, which means reading the
+    # package metadata on every start; look it up only when asked for instead
+    if not value or ctx.resilient_parsing:
+        return
+    from ._version import __version__
+
+    click.echo(f"{ctx.find_root().info_name}, version {__version__}")
+    ctx.exit()
+
+
+def try_daemon(
+    socket_path: Path | None, directory: str, scan: ScanOptions, no_manifest: bool
+) -> bool:
+    """Run through a daemon if one is listening; False if there is none."""
+    from .client import DaemonClient, default_socket_path, run_via_daemon
+
+    path = socket_path or default_socket_path()
+    try:
+        client = DaemonClient(path)
+    except OSError:
+        click.echo(f"🔌 No daemon listening on {path}; running here", err=True)
+        return False
+    with client:
+        manifest = None
+        if not no_manifest:
+            from .manifest import Manifest
+
+            manifest = Manifest(directory)
+        try:
+            run_via_daemon(client, directory, scan, manifest)
+        except (OSError, ReelNameError) as exc:
+            raise click.ClickException(str(exc)) from exc
+        finally:
+            if manifest is not None:
+                manifest.close()
+    return True
+
+
+def add_options(options: list[Callable[[F], F]]) -> Callable[[F], F]:
+    """Apply a list of click options as one decorator, in the listed order."""
 
+    def decorator(func: F) -> F:
+        for option in reversed(options):
+            func = option(func)
+        return func
 
-@click.command(context_settings={"help_option_names": ["-h", "--help"]})
-@click.version_option(__version__, "-v", "--version")
+    return decorator
+
+
+@click.group(cls=DefaultGroup, default_command="run", context_settings=CONTEXT_SETTINGS)
+def main() -> None:
+    """
+    Rename media files by correcting their titles via IMDb.
+    """
+
+
+@main.command(context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "-v",
+    "--version",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=print_version,
+    help="Show the version and exit.",
+)
 @click.option(
     "-w",
     "--watch",
@@ -13,27 +261,475 @@ from .reelname import run_once, watch_directory
     default=False,
     help="Continuously watch directory instead of one-time run",
 )
+@click.option(
+    "--debounce",
+    metavar="SECONDS",
+    type=click.FloatRange(min=0),
+    default=DEFAULT_DEBOUNCE,
+    show_default=True,
+    help="In watch mode, wait until a new file's size is stable for this long",
+)
+@add_options(SCAN_OPTIONS)
+@add_options(LOOKUP_OPTIONS)
+@click.option(
+    "--prune-cache",
+    is_flag=True,
+    default=False,
+    help="Remove expired entries from the lookup cache before running",
+)
+@click.option(
+    "--no-manifest",
+    is_flag=True,
+    default=False,
+    help="Re-evaluate every file, not just those new or changed since the last run",
+)
+@click.option(
+    "--workers",
+    metavar="N",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Split a one-time run across this many processes, sharing the lookup cache",
+)
+@click.option(
+    "--output-dir",
+    metavar="DIR",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Move renamed files into this library directory instead of renaming them in place",
+)
+@click.option(
+    "--layout",
+    default=LIBRARY_LAYOUT,
+    show_default=True,
+    help="Where files go under --output-dir; {title}, {year} and {filename} are filled in",
+)
+@click.option(
+    "--journal",
+    "journal_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Record lookups and renames in this file, so they can be resumed or undone",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Reuse the lookups already recorded in --journal instead of repeating them",
+)
+@click.option(
+    "--stats",
+    "stats_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, allow_dash=True, path_type=Path),
+    default=None,
+    help="Write a JSON summary of timings and counts here when done ('-' for stdout)",
+)
+@click.option(
+    "--metrics-file",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Keep Prometheus metrics in this file, for node_exporter's textfile collector",
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Sample all threads while running, write collapsed stacks here "
+    "(for flamegraph.pl or speedscope) and print the top hotspots",
+)
+@click.option(
+    "--trace-lookups",
+    is_flag=True,
+    default=False,
+    help="Log each IMDb search, candidate score and scoring cost to stderr",
+)
+@click.option(
+    "--via-socket",
+    is_flag=True,
+    default=False,
+    help="Hand lookups and renames to a running `reelname serve` daemon, if there is one",
+)
+@SOCKET_OPTION
 @click.argument(
-    "directory",
-    metavar="<directory>",
-    nargs=1,
-    required=False,
+    "directories",
+    metavar="<directory>...",
+    nargs=-1,
     type=click.Path(exists=True, file_okay=False),
 )
-def main(directory: str, watch: bool) -> None:
+def run(
+    directories: tuple[str, ...],
+    watch: bool,
+    debounce: float,
+    recursive: bool,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    extensions: tuple[str, ...],
+    jobs: int,
+    rate: float,
+    no_cache: bool,
+    refresh_cache: bool,
+    prune_cache: bool,
+    no_manifest: bool,
+    workers: int,
+    resolver_name: str,
+    index_path: Path | None,
+    output_dir: Path | None,
+    layout: str,
+    journal_path: Path | None,
+    resume: bool,
+    stats_path: Path | None,
+    metrics_file: Path | None,
+    profile_path: Path | None,
+    trace_lookups: bool,
+    via_socket: bool,
+    socket_path: Path | None,
+) -> None:
     """
     Rename media files by correcting their titles via IMDb.
 
     By default runs once; use -w/--watch to run continuously.
+    Several directories are processed in turn, or watched together by one
+    process that shares its lookups between them.
+    Files handled by an earlier run are skipped until they change.
+    With --output-dir, files are moved into a library laid out by --layout,
+    copied (and checked) when it is on another device.
+    With --workers, a huge library is split between processes that share
+    one lookup cache; their reports are merged in order.
+    The offline resolver needs no network and skips the lookup cache.
+    With --via-socket, a running daemon does the lookups (with its own lookup
+    options) and renames.
 
     \b
     Examples:
       reelname /path/to/media
       reelname -w /path/to/media
+      reelname -w -r /downloads/movies /downloads/tv /landing
+      reelname -j 8 --refresh-cache /path/to/media
+      reelname -r --ext mkv --exclude 'Sample*' /path/to/library
+      reelname -r --workers 8 /mnt/archive
+      reelname -w --output-dir /mnt/library/movies /mnt/landing
+      reelname --resolver offline --index title.basics.idx /path/to/media
+      reelname --journal renames.jsonl --resume /path/to/library
+      reelname -w --metrics-file /var/lib/node_exporter/reelname.prom /path/to/media
+      reelname --profile run.folded --trace-lookups /path/to/media
+      reelname --via-socket /path/to/downloads
+
+    \b
+    Other commands:
+      reelname index build title.basics.tsv.gz
+      reelname plan /path/to/media -o plan.json
+      reelname apply plan.json
+      reelname undo renames.jsonl
+      reelname serve
     """
-    if not directory:
-        directory = "."
-    if watch:
-        watch_directory(directory)
-    else:
-        run_once(directory)
+    directories = tuple(dict.fromkeys(os.path.abspath(d) for d in directories or (".",)))
+    if resume and journal_path is None:
+        raise click.UsageError("--resume needs --journal")  # noqa: TRY003
+    scan = ScanOptions(recursive, include, exclude, normalize_extensions(extensions))
+    sharded = workers > 1
+    if sharded and (
+        watch or via_socket or journal_path or stats_path or metrics_file or profile_path
+    ):
+        message = (
+            "--workers excludes --watch, --via-socket, --journal, --stats, "
+            "--metrics-file and --profile"
+        )
+        raise click.UsageError(message)
+    if via_socket:
+        if (
+            watch
+            or journal_path
+            or output_dir
+            or stats_path
+            or metrics_file
+            or profile_path
+            or trace_lookups
+        ):
+            message = (
+                "--via-socket excludes --watch, --journal, --output-dir, --stats, "
+                "--metrics-file, --profile and --trace-lookups"
+            )
+            raise click.UsageError(message)
+        while directories and try_daemon(socket_path, directories[0], scan, no_manifest):
+            directories = directories[1:]
+        if not directories:
+            return
+
+    from .cache import LookupCache
+    from .journal import Journal
+    from .manifest import Manifest
+    from .metrics import Metrics
+    from .move import Library, check_layout
+    from .profiling import SamplingProfiler, enable_lookup_tracing
+    from .reelname import run_once, watch_directories
+    from .shard import run_sharded
+
+    library = None
+    if output_dir is not None:
+        try:
+            library = Library(output_dir.absolute(), check_layout(layout))
+        except ReelNameError as exc:
+            raise click.ClickException(str(exc)) from exc
+    resolver = make_resolver(resolver_name, index_path, jobs, rate)
+    no_cache = no_cache or resolver_name == "offline"
+    cache = None if no_cache else LookupCache(refresh=refresh_cache)
+    journal = None if journal_path is None else Journal(journal_path, resume=resume)
+    manifests = (
+        []
+        if no_manifest
+        else [Manifest(directory, refresh=refresh_cache) for directory in directories]
+    )
+    metrics = Metrics() if stats_path or metrics_file else None
+    profiler = None if profile_path is None else SamplingProfiler()
+    if trace_lookups:
+        enable_lookup_tracing()
+    if profiler is not None:
+        profiler.start()
+    try:
+        if cache is not None and prune_cache:
+            click.echo(f"🧹 Pruned {cache.prune()} expired cache entries")
+        if watch:
+            watch_directories(
+                directories,
+                cache,
+                jobs,
+                resolver,
+                scan,
+                debounce,
+                journal,
+                manifests,
+                metrics,
+                metrics_file,
+                library,
+            )
+        else:
+            # each worker makes its own resolver, with a share of the lookup rate
+            factory = partial(make_resolver, resolver_name, index_path, jobs, rate / workers)
+            by_root = {manifest.root: manifest for manifest in manifests}
+            for directory in directories:
+                manifest = by_root.get(directory)
+                if sharded:
+                    run_sharded(directory, workers, factory, cache, jobs, scan, manifest, library)
+                else:
+                    run_once(
+                        directory, cache, jobs, resolver, scan, metrics, journal, manifest, library
+                    )
+    finally:
+        report_throttling(resolver)
+        if profiler is not None and profile_path is not None:
+            profiler.stop()
+            write_profile(profiler, profile_path)
+        if metrics is not None:
+            write_metrics(metrics, stats_path, metrics_file)
+        for manifest in manifests:
+            manifest.close()
+        if journal is not None:
+            journal.close()
+        if cache is not None:
+            cache.close()
+
+
+@main.command("plan", context_settings=CONTEXT_SETTINGS)
+@add_options(SCAN_OPTIONS)
+@add_options(LOOKUP_OPTIONS)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default="plan.json",
+    show_default=True,
+    help="Where to write the plan",
+)
+@click.argument(
+    "directory",
+    metavar="<directory>",
+    type=click.Path(exists=True, file_okay=False),
+)
+def plan_command(
+    directory: str,
+    recursive: bool,
+    include: tuple[str, ...],
+    exclude: tuple[str, ...],
+    extensions: tuple[str, ...],
+    jobs: int,
+    rate: float,
+    no_cache: bool,
+    refresh_cache: bool,
+    resolver_name: str,
+    index_path: Path | None,
+    output: Path,
+) -> None:
+    """
+    Work out the renames for a directory without touching it, and write
+    them to a JSON plan for `reelname apply`.
+    """
+    from .cache import LookupCache
+    from .plan import write_plan
+    from .reelname import plan_directory
+
+    resolver = make_resolver(resolver_name, index_path, jobs, rate)
+    no_cache = no_cache or resolver_name == "offline"
+    scan = ScanOptions(recursive, include, exclude, normalize_extensions(extensions))
+    cache = None if no_cache else LookupCache(refresh=refresh_cache)
+    try:
+        plan = plan_directory(directory, cache, jobs, resolver, scan)
+    finally:
+        report_throttling(resolver)
+        if cache is not None:
+            cache.close()
+    write_plan(plan, output)
+    click.echo(f"📄 Plan written to {output}")
+
+
+@main.command("apply", context_settings=CONTEXT_SETTINGS)
+@click.option(
+    "--root",
+    metavar="DIR",
+    type=click.Path(exists=True, file_okay=False),
+    default=None,
+    help="Apply to this directory instead of the one the plan was made for",
+)
+@click.option(
+    "--journal",
+    "journal_path",
+    metavar="PATH",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Record the renames in this file, so they can be undone",
+)
+@click.argument(
+    "plan_path",
+    metavar="<plan.json>",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+def apply_command(plan_path: Path, root: str | None, journal_path: Path | None) -> None:
+    """
+    Do the renames of a plan written by `reelname plan`.
+
+    Files that changed since they were planned, and renames whose new name
+    is already taken, are skipped.
+    """
+    from .journal import Journal
+    from .plan import apply_plan, read_plan
+
+    try:
+        plan = read_plan(plan_path, root)
+    except ReelNameError as exc:
+        raise click.ClickException(str(exc)) from exc
+    renamed = skipped = 0
+    journal = None if journal_path is None else Journal(journal_path)
+    try:
+        for result in apply_plan(plan, journal):
+            entry = result.entry
+            if result.error:
+                skipped += 1
+                click.echo(f"⏩ Not renamed ({result.error}): {entry.old}")
+            else:
+                renamed += 1
+                click.echo(f"✅ Renamed: {entry.old} → {entry.new}")
+    finally:
+        if journal is not None:
+            journal.close()
+    click.echo(f"✅ Apply complete: {renamed} renamed, {skipped} skipped.")
+
+
+@main.command("undo", context_settings=CONTEXT_SETTINGS)
+@click.argument(
+    "journal_path",
+    metavar="<journal>",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+def undo_command(journal_path: Path) -> None:
+    """
+    Reverse the renames recorded in a journal written with --journal,
+    newest first.
+    """
+    from .journal import undo
+
+    restored = skipped = 0
+    for result in undo(journal_path):
+        if result.error:
+            skipped += 1
+            click.echo(f"⏩ Not restored ({result.error}): {result.new}")
+        else:
+            restored += 1
+            click.echo(f"↩️ Restored: {result.new} → {result.old}")
+    click.echo(f"✅ Undo complete: {restored} restored, {skipped} skipped.")
+
+
+@main.command("serve", context_settings=CONTEXT_SETTINGS)
+@add_options(LOOKUP_OPTIONS)
+@SOCKET_OPTION
+def serve_command(
+    jobs: int,
+    rate: float,
+    no_cache: bool,
+    refresh_cache: bool,
+    resolver_name: str,
+    index_path: Path | None,
+    socket_path: Path | None,
+) -> None:
+    """
+    Run a long-lived resolver daemon on a Unix socket, for `reelname --via-socket`.
+
+    It keeps IMDb sessions, the lookup cache and the matching code warm
+    between requests, so each post-download run skips the cold start.
+    Stop it with Ctrl-C or SIGTERM.
+    """
+    from .cache import LookupCache
+    from .client import default_socket_path
+    from .daemon import Daemon
+
+    path = socket_path or default_socket_path()
+    resolver = make_resolver(resolver_name, index_path, jobs, rate)
+    no_cache = no_cache or resolver_name == "offline"
+    cache = None if no_cache else LookupCache(refresh=refresh_cache)
+    daemon = Daemon(path, resolver, cache, jobs)
+    click.echo(f"🔌 Starting daemon on {path}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except ReelNameError as exc:
+        raise click.ClickException(str(exc)) from exc
+    finally:
+        if cache is not None:
+            cache.close()
+    click.echo(f"👋 Stopped after {daemon.requests} requests")
+
+
+@main.group(context_settings=CONTEXT_SETTINGS)
+def index() -> None:
+    """
+    Manage the offline title index.
+    """
+
+
+@index.command("build", context_settings=CONTEXT_SETTINGS)
+@click.argument(
+    "tsv",
+    metavar="<title.basics.tsv>",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Where to write the index (defaults to the reelname cache directory)",
+)
+def index_build(tsv: Path, output: Path | None) -> None:
+    """
+    Build the offline index from IMDb's title.basics.tsv(.gz) dataset,
+    downloadable from https://datasets.imdbws.com/.
+    """
+    from .offline import build_index, default_index_path
+
+    output = output or default_index_path()
+    count = build_index(tsv, output)
+    click.echo(f"📇 Indexed {count} titles → {output}")
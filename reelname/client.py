@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+import errno
+import json
+import os
+from pathlib import Path
+import socket
+from types import TracebackType
+from typing import Any
+
+import click
+
+from .cache import default_cache_dir
+from .constants import DAEMON_BATCH
+from .exceptions import DaemonRequestError
+from .manifest import FileKey, Manifest
+from .scan import ScanOptions, iter_file_batches
+
+# Decisions that leave a file to be looked at again on the next run
+_RETRY = frozenset({"failed", "error"})
+
+
+def default_socket_path() -> Path:
+    """$XDG_RUNTIME_DIR/reelname.sock, or next to the lookup cache without one."""
+    if runtime := os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(runtime) / "reelname.sock"
+    return default_cache_dir() / "reelname.sock"
+
+
+class DaemonClient:
+    """
+    Connection to a `reelname serve` daemon. Raises OSError if none is
+    listening on `path`.
+
+    The protocol is JSON lines: each request is one object with an "op"
+    ("resolve", "rename" or "ping"), answered by one object per item and a
+    final {"done": true}. It is simple enough to drive from a shell hook with
+    `nc -U` or `socat` instead of starting Python at all.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        family = getattr(socket, "AF_UNIX", None)
+        if family is None:  # Windows
+            raise OSError(errno.EAFNOSUPPORT, os.strerror(errno.EAFNOSUPPORT))
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            self._sock.connect(str(path))
+        except OSError:
+            self._sock.close()
+            raise
+        self._file = self._sock.makefile("rwb")
+
+    def request(self, op: str, **fields: Any) -> Iterator[dict[str, Any]]:
+        """Send one request and yield its replies; consume them all before the next."""
+        self._file.write(json.dumps({"op": op, **fields}).encode() + b"\n")
+        self._file.flush()
+        error = None
+        for line in self._file:
+            reply: dict[str, Any] = json.loads(line)
+            if reply.get("done"):
+                if error is not None:
+                    raise DaemonRequestError(error)
+                return
+            if "error" in reply:
+                error = reply["error"]  # raised once the request is finished
+            else:
+                yield reply
+        raise ConnectionResetError(errno.ECONNRESET, os.strerror(errno.ECONNRESET))
+
+    def resolve(self, names: list[str]) -> list[dict[str, Any]]:
+        """New names for `names`, as `reelname.resolve_many` results in dict form."""
+        return list(self.request("resolve", names=names))
+
+    def rename(self, paths: list[str]) -> list[dict[str, Any]]:
+        """Have the daemon rename the files at (absolute) `paths`; one result each."""
+        return list(self.request("rename", paths=paths))
+
+    def ping(self) -> dict[str, Any]:
+        return next(self.request("ping"))
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> DaemonClient:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def _report(name: str, result: dict[str, Any]) -> None:
+    """Print what the daemon did with a file, the way a local run would."""
+    decision = result["decision"]
+    if decision == "unparsed":
+        click.echo(f"⏩ Skipping (no title/year): {name}")
+    elif decision == "formatted":
+        click.echo(f"⏩ Skipping already formatted: {name}")
+    elif decision == "failed":
+        click.echo(f"⏩ Skipping (lookup failed): {name}")
+    elif decision == "error":
+        click.echo(f"⏩ Not renamed ({result['reason']}): {name}")
+    else:
+        if result["source"] in ("lookup", "cache", "similar"):
+            click.echo(f"🔎 Found: {result['title']} ({result['year']})")
+        if decision == "renamed":
+            click.echo(f"✅ Renamed: {name} → {result['new_name']}")
+        else:
+            click.echo(f"⏩ Already correct: {name}")
+
+
+def _chunks(
+    files: Iterable[tuple[Path, FileKey | None]], size: int
+) -> Iterator[list[tuple[Path, FileKey | None]]]:
+    chunk: list[tuple[Path, FileKey | None]] = []
+    for item in files:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_via_daemon(
+    client: DaemonClient,
+    directory: str,
+    scan: ScanOptions | None = None,
+    manifest: Manifest | None = None,
+) -> None:
+    """
+    `run_once`, with the lookups and renames done by a daemon: scan `directory`
+    here (skipping files the manifest has seen) and send the files over in batches.
+    """
+    sent = unchanged = 0
+    for batch in iter_file_batches(Path(directory), scan):
+        if manifest is None:
+            files: list[tuple[Path, FileKey | None]] = [(file, None) for file in batch]
+        else:
+            files = manifest.changed(batch)
+            unchanged += len(batch) - len(files)
+        for chunk in _chunks(files, DAEMON_BATCH):
+            results = client.rename([os.path.abspath(file) for file, _ in chunk])
+            sent += len(chunk)
+            for (file, key), result in zip(chunk, results):
+                _report(file.name, result)
+                if manifest is not None and key is not None and result["decision"] not in _RETRY:
+                    final = file.parent / result["new_name"] if result["new_name"] else file
+                    manifest.record(final, key, result["decision"])
+    if manifest is not None:
+        manifest.prune()
+    click.echo("✅ Run-once processing complete.")
+    click.echo(f"🔌 Daemon: {sent} files handled by {client.path}")
+    if manifest is not None:
+        click.echo(f"📒 Manifest: {unchanged} unchanged files skipped")
@@ -33,6 +33,30 @@ DOT_YEAR_PATTERN: Pattern[str] = re.compile(r"(?P<title>.+?)\.(?P<year>\d{4})\."
 #   (?:\s|$)               → Non-capturing group: either a space or end of string
 SPACE_YEAR_PATTERN: Pattern[str] = re.compile(r"(?P<title>.+?)\s+(?P<year>\d{4})(?:\s|$)")
 
+# All three year patterns above in one regex, tried in the same priority order.
+# Each pattern becomes a lookahead alternative anchored at the start, with its
+# named groups turned into plain ones, so a single match() call does the work of
+# up to three search() calls and `lastindex` tells which alternative matched:
+#   groups (1, 2) → bracketed, (3, 4) → dot-year, (5, 6) → space-year
+# (title is group lastindex - 1, year is group lastindex). This is equivalent to
+# searching each pattern in turn because every pattern starts with a lazy
+# `(?P<title>.+?)`, which can always absorb a prefix, for newline-free names.
+TITLE_YEAR_PATTERN: Pattern[str] = re.compile(
+    "^(?:"
+    + "|".join(
+        "(?=" + pat.pattern.replace("?P<title>", "").replace("?P<year>", "") + ")"
+        for pat in (BRACKETED_PATTERN, DOT_YEAR_PATTERN, SPACE_YEAR_PATTERN)
+    )
+    + ")"
+)
+
+# Matches any run of four digits; a name without one cannot contain a year.
+YEAR_DIGITS_PATTERN: Pattern[str] = re.compile(r"\d{4}")
+
+# Matches leading punctuation/brackets/whitespace left on the suffix after a year:
+#   ").1080p.mkv" → " 1080p.mkv"
+SUFFIX_SEPARATOR_PATTERN: Pattern[str] = re.compile(r"^[\s._\-()\[\]{}<>]+")
+
 # Matches characters that are not allowed in Windows filenames:
 #   < > : " / \ | ? *
 # Regex breakdown:
@@ -56,3 +80,130 @@ INVALID_FILENAME_CHARS: Pattern[str] = re.compile(r'[<>:"/\\|?*]|[ .]+$')
 URL_PREFIX_PATTERN: Pattern[str] = re.compile(
     r"^(?:www\.[\w.-]+|\w+\.\w{2,})(?:\s*[--]\s*)", re.IGNORECASE
 )
+
+# Matches runs of dots/underscores used as word separators in release names:
+#   "The.Dark_Knight" → "The Dark Knight"
+TITLE_SEPARATOR_PATTERN: Pattern[str] = re.compile(r"[._]+")
+
+# Matches runs of anything but letters and digits, ignored when a title is compared
+# with ones resolved before: "Spider Man" and "Spider-Man" are then the same title.
+NON_WORD_PATTERN: Pattern[str] = re.compile(r"[\W_]+")
+
+# How long cached IMDb lookups stay valid, in seconds.
+# Matches rarely change, so they live much longer than "no match" results,
+# which may start resolving once IMDb catches up with a new release.
+CACHE_HIT_TTL: float = 30 * 24 * 60 * 60
+CACHE_MISS_TTL: float = 24 * 60 * 60
+
+# Seconds a write to the lookup cache waits for another process (--workers) to finish its own.
+CACHE_TIMEOUT: float = 30.0
+
+# Number of IMDb lookups run concurrently by default.
+DEFAULT_JOBS: int = 4
+
+# Title types from IMDb's title.basics.tsv that go into the offline index.
+# Episodes are left out: they are most of the dump and never name a release.
+OFFLINE_TITLE_TYPES: frozenset[str] = frozenset(
+    {"movie", "tvMovie", "tvSeries", "tvMiniSeries", "tvSpecial", "video"}
+)
+
+# How many of the closest titles in a year's bucket the offline resolver hands to the matcher.
+OFFLINE_CANDIDATES: int = 10
+
+# Without an exact hit, the offline resolver only fuzzy-matches titles sharing a word
+# with the query, compared on this many leading characters so typos past them still
+# match, and at most OFFLINE_SHORTLIST of them, leaving out the most common words first.
+OFFLINE_PREFIX: int = 3
+OFFLINE_SHORTLIST: int = 2000
+
+# Fuzzy-match scores (0-100, see utils.get_match_score): a candidate needs at least
+# MATCH_THRESHOLD to be accepted, and one reaching EARLY_EXIT_SCORE stops the search.
+MATCH_THRESHOLD: float = 80.0
+EARLY_EXIT_SCORE: float = 98.0
+
+# How many distinct recent lookups the pipeline remembers for coalescing duplicates.
+COALESCE_WINDOW: int = 4096
+
+# Seconds a watched file's size must stay unchanged before it is processed.
+DEFAULT_DEBOUNCE: float = 2.0
+
+# How many processed files a watcher remembers, so our own renames don't trigger a second pass.
+WATCH_REMEMBER: int = 65536
+
+# Suffixes download clients use for files that are still being written.
+PARTIAL_SUFFIXES: frozenset[str] = frozenset({".part", ".partial", ".crdownload", ".!qb", ".tmp"})
+
+# The rename journal is fsynced after this many records or seconds, whichever
+# comes first; each record is written through to the OS as soon as it's made.
+JOURNAL_SYNC_EVERY: int = 512
+JOURNAL_SYNC_INTERVAL: float = 1.0
+
+# The processed-file manifest writes its new entries in batches of this many.
+MANIFEST_FLUSH_EVERY: int = 1000
+
+# Upper bounds, in seconds, of the latency histogram buckets kept per pipeline stage.
+# They span a microsecond-scale parse up to a slow IMDb search.
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Seconds between stack samples taken by --profile, and how many hotspots it prints.
+PROFILE_INTERVAL: float = 0.005
+PROFILE_TOP: int = 15
+
+# IMDb request rate: where the adaptive limiter starts, and how far it may
+# back off under throttling or climb back up (requests per second).
+LOOKUP_RATE: float = 5.0
+LOOKUP_RATE_MIN: float = 0.2
+LOOKUP_RATE_MAX: float = 20.0
+# Requests per second added back to the rate after each success.
+LOOKUP_RATE_STEP: float = 0.1
+
+# Requests slower than this (seconds) count as a sign of load and slow the limiter.
+LOOKUP_SLOW: float = 3.0
+
+# Attempts per request, and the base and cap (seconds) of the jittered backoff between them.
+LOOKUP_ATTEMPTS: int = 4
+BACKOFF_BASE: float = 0.5
+BACKOFF_MAX: float = 30.0
+
+# Consecutive failed requests that open the circuit breaker, and how long (seconds)
+# it first stays open; every failed probe doubles that, up to BREAKER_COOLDOWN_MAX.
+BREAKER_THRESHOLD: int = 5
+BREAKER_COOLDOWN: float = 15.0
+BREAKER_COOLDOWN_MAX: float = 300.0
+
+# HTTP statuses IMDb answers with when it wants us to slow down.
+THROTTLE_STATUSES: frozenset[int] = frozenset({429, 503})
+
+# Files per request sent by the --via-socket client, and the longest request
+# line (bytes) the daemon accepts.
+DAEMON_BATCH: int = 256
+DAEMON_LINE_LIMIT: int = 16 * 1024 * 1024
+
+# Where --output-dir puts a file: {title} and {year} are IMDb's, {filename} is the new name.
+LIBRARY_LAYOUT: str = "{title} ({year})/{filename}"
+
+# Files moved into the library at once. Moves across devices are copies, bound by the
+# disks rather than the CPU, so a few at a time keep them busy.
+MOVE_JOBS: int = 4
+
+# Bytes handed to the kernel per copy call when moving across devices; progress is
+# reported between calls.
+MOVE_CHUNK: int = 64 * 1024 * 1024
+
+# Files per shard handed to a --workers process. Neighbouring files (a season pack)
+# stay together, so they still share one lookup.
+SHARD_SIZE: int = 256
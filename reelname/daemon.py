@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable
+import contextlib
+import json
+import os
+from pathlib import Path
+import signal
+import stat
+import threading
+from typing import Any, Callable
+
+from .api import Resolution, aresolve_many
+from .cache import LookupCache
+from .client import DaemonClient
+from .constants import DAEMON_LINE_LIMIT, DEFAULT_JOBS
+from .exceptions import DaemonRunningError, NotASocketError
+from .move import rename_no_replace
+from .resolver import ImdbResolver, Resolver
+from .utils import get_match_score
+
+
+def _warm_up(resolver: Resolver) -> None:
+    """Load the scoring code and open an IMDb session before the first request."""
+    get_match_score("warm", "up")
+    inner = getattr(resolver, "resolver", resolver)  # unwrap a ThrottledResolver
+    if isinstance(inner, ImdbResolver):
+        with inner.session():
+            pass
+
+
+def _rename(path: str, resolution: Resolution) -> dict[str, Any]:
+    """Rename the file at `path` as `resolution` says; runs on a worker thread."""
+    result: dict[str, Any] = {"path": path, **resolution._asdict(), "reason": None}
+    if resolution.source in ("unparsed", "formatted", "failed"):
+        result["decision"] = resolution.source
+        return result
+    if resolution.new_name == resolution.original:
+        result["decision"] = "correct"
+        return result
+    new = os.path.join(os.path.dirname(path), str(resolution.new_name))
+    try:
+        st = os.stat(path, follow_symlinks=False)
+        try:
+            taken = os.stat(new, follow_symlinks=False)
+        except FileNotFoundError:
+            taken = None
+        # a case-only rename on a case-insensitive file system finds the file itself
+        if taken is not None and os.path.samestat(st, taken):
+            os.rename(path, new)
+        else:
+            rename_no_replace(path, new)  # another connection may be renaming to `new` too
+    except FileExistsError:
+        result.update(decision="error", reason="target name is taken")
+        return result
+    except OSError as exc:
+        result.update(decision="error", reason=exc.strerror or str(exc))
+        return result
+    result["decision"] = "renamed"
+    return result
+
+
+class Daemon:
+    """
+    Long-lived resolver behind a Unix domain socket (`reelname serve`).
+
+    The resolver's IMDb sessions, the lookup cache connection and the imported
+    matching code stay warm between requests, so a post-download hook pays for
+    a socket round trip and the rename instead of a cold start. Requests are
+    JSON lines, described in `DaemonClient`; each connection's requests are
+    handled in turn, and connections concurrently.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        resolver: Resolver,
+        cache: LookupCache | None = None,
+        jobs: int = DEFAULT_JOBS,
+    ) -> None:
+        self.path = path
+        self.resolver = resolver
+        self.cache = cache
+        self.jobs = jobs
+        self.requests = 0
+        self.ready = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+
+    def serve_forever(self) -> None:
+        """Listen until `stop` is called or SIGTERM/SIGINT arrives."""
+        asyncio.run(self._serve())
+
+    def stop(self) -> None:
+        """Stop serving; safe to call from any thread."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def _claim_socket(self) -> None:
+        try:
+            mode = self.path.lstat().st_mode
+        except FileNotFoundError:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            return
+        if not stat.S_ISSOCK(mode):
+            raise NotASocketError(str(self.path))
+        try:
+            DaemonClient(self.path).close()
+        except OSError:
+            self.path.unlink()  # left behind by a daemon that didn't shut down cleanly
+            return
+        raise DaemonRunningError(str(self.path))
+
+    async def _serve(self) -> None:
+        self._claim_socket()
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        # not possible off the main thread, or without signal support
+        with contextlib.suppress(NotImplementedError, RuntimeError, ValueError):
+            self._loop.add_signal_handler(signal.SIGTERM, self._stop.set)
+        await self._loop.run_in_executor(None, _warm_up, self.resolver)
+        server = await asyncio.start_unix_server(
+            self._handle, path=str(self.path), limit=DAEMON_LINE_LIMIT
+        )
+        os.chmod(self.path, 0o600)
+        self.ready.set()
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            self.path.unlink(missing_ok=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def send(reply: dict[str, Any]) -> None:
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                self.requests += 1
+                try:
+                    request = json.loads(line)
+                    await self._dispatch(request, send)
+                except (ValueError, KeyError, TypeError) as exc:
+                    await send({"error": f"bad request: {exc!r}"})
+                await send({"done": True})
+        except (ConnectionError, ValueError):
+            pass  # client went away, or sent a line over DAEMON_LINE_LIMIT
+        finally:
+            writer.close()
+
+    async def _dispatch(
+        self, request: dict[str, Any], send: Callable[[dict[str, Any]], Awaitable[None]]
+    ) -> None:
+        op = request["op"]
+        if op == "ping":
+            await send({"pid": os.getpid(), "requests": self.requests})
+        elif op == "resolve":
+            names = [str(name) for name in request["names"]]
+            async for resolution in self._resolve(names):
+                await send(resolution._asdict())
+        elif op == "rename":
+            paths = [os.path.abspath(path) for path in request["paths"]]
+            names = [os.path.basename(path) for path in paths]
+            # results come back in request order
+            pending = iter(paths)
+            async for resolution in self._resolve(names):
+                await send(await asyncio.to_thread(_rename, next(pending), resolution))
+        else:
+            await send({"error": f"unknown op {op!r}"})
+
+    def _resolve(self, names: list[str]) -> AsyncIterator[Resolution]:
+        return aresolve_many(names, jobs=self.jobs, resolver=self.resolver, cache=self.cache)
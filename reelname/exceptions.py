@@ -17,3 +17,68 @@ class ReelNameError(Exception):
         if self.extra_detail:
             return f"{self.detail} :: {self.extra_detail}"
         return self.detail
+
+
+class InvalidIndexError(ReelNameError):
+    """
+    The offline index is missing, truncated or not a reelname index.
+    """
+
+    detail = "Invalid offline index; rebuild it with `reelname index build`."
+
+
+class InvalidPlanError(ReelNameError):
+    """
+    A rename plan is unreadable or was written by an incompatible version.
+    """
+
+    detail = "Invalid rename plan; create a new one with `reelname plan`."
+
+
+class LookupFailedError(ReelNameError):
+    """
+    A title lookup still failed after every retry.
+    """
+
+    detail = "Lookup failed."
+
+
+class DaemonRunningError(ReelNameError):
+    """
+    `reelname serve` found another daemon already listening on its socket.
+    """
+
+    detail = "A reelname daemon is already listening on this socket."
+
+
+class NotASocketError(ReelNameError):
+    """
+    `reelname serve` was given a socket path where something other than a socket is.
+    """
+
+    detail = "Something other than a socket is at the socket path; it was left alone."
+
+
+class DaemonRequestError(ReelNameError):
+    """
+    The daemon answered a request with an error.
+    """
+
+    detail = "The reelname daemon rejected the request."
+
+
+class InvalidLayoutError(ReelNameError):
+    """
+    A library layout uses fields other than {title}, {year} and {filename},
+    or doesn't lead to a file under the output directory.
+    """
+
+    detail = "Invalid --layout; use {title}, {year} and {filename} in a relative path."
+
+
+class CopyMismatchError(ReelNameError):
+    """
+    A file copied to another device doesn't match the original, which was kept.
+    """
+
+    detail = "Copy does not match the original; the original was kept."
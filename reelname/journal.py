@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+import json
+import os
+from pathlib import Path
+import time
+from types import TracebackType
+from typing import Any, NamedTuple
+
+from .constants import JOURNAL_SYNC_EVERY, JOURNAL_SYNC_INTERVAL
+from .exceptions import CopyMismatchError
+from .move import move_file
+
+# A journal is a JSON-lines file, appended to by every run that uses it:
+#   {"op": "planned",  "path": OLD, "title": ..., "year": ...}   lookup started
+#   {"op": "resolved", "path": OLD, "match": [title, year] | null, "new": NEW | null}
+#   {"op": "renamed",  "path": OLD, "new": NEW}
+#   {"op": "undone",   "path": OLD, "new": NEW}                  written by `undo`
+# Paths are absolute. "resolved" carries the rename target before the rename
+# happens, so a crash between the rename and its "renamed" record can still be undone.
+
+
+def read_journal(path: Path) -> Iterator[dict[str, Any]]:
+    """Yield the records of a journal, skipping a line torn by a crash."""
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and "op" in record and "path" in record:
+                yield record
+
+
+class Journal:
+    """
+    Append-only record of what a run planned, resolved and renamed.
+
+    Each record is written straight to the file, so it survives the process
+    being killed; fsyncs are batched (every `sync_every` records or
+    `sync_interval` seconds, and on close) to stay off the hot path.
+    With `resume=True`, lookups resolved by earlier runs are read back and
+    reused instead of being repeated.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        resume: bool = False,
+        sync_every: int = JOURNAL_SYNC_EVERY,
+        sync_interval: float = JOURNAL_SYNC_INTERVAL,
+    ) -> None:
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        # path -> IMDb match (None for "no match") from earlier runs
+        self.resolved: dict[str, tuple[str, str] | None] = {}
+        if resume and path.exists():
+            for record in read_journal(path):
+                if record["op"] == "resolved":
+                    match = record.get("match")
+                    self.resolved[record["path"]] = (match[0], match[1]) if match else None
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+        # finish a line torn by a crash, so the next record starts on its own line
+        size = os.fstat(self._fd).st_size
+        if size:
+            with path.open("rb") as fh:
+                fh.seek(size - 1)
+                if fh.read(1) != b"\n":
+                    os.write(self._fd, b"\n")
+
+    def record(self, op: str, path: str, **fields: Any) -> None:
+        line = json.dumps({"op": op, "path": path, **fields}, ensure_ascii=False) + "\n"
+        os.write(self._fd, line.encode("utf-8"))
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.sync_every
+            or time.monotonic() - self._synced_at >= self.sync_interval
+        ):
+            self.sync()
+
+    def planned(self, path: str, title: str, year: str) -> None:
+        self.record("planned", path, title=title, year=year)
+
+    def resolved_as(self, path: str, match: tuple[str, str] | None, new: str | None) -> None:
+        self.record("resolved", path, match=match, new=new)
+
+    def renamed(self, path: str, new: str) -> None:
+        self.record("renamed", path, new=new)
+
+    def sync(self) -> None:
+        if self._unsynced:
+            os.fsync(self._fd)
+            self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        self.sync()
+        os.close(self._fd)
+        self._fd = -1
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class UndoResult(NamedTuple):
+    """One rename reversed (or not) by `undo`."""
+
+    old: str
+    new: str
+    error: str | None = None  # why it was left alone, if it was
+
+
+def _renames(path: Path) -> list[tuple[str, str]]:
+    """(old, new) renames recorded in a journal and not undone yet, oldest first."""
+    applied: dict[str, str] = {}
+    started: dict[str, str] = {}  # resolved with a target, rename not recorded (yet)
+    for record in read_journal(path):
+        op, old = record["op"], record["path"]
+        if op == "resolved" and record.get("new"):
+            started[old] = record["new"]
+        elif op == "renamed":
+            started.pop(old, None)
+            applied.pop(old, None)  # re-insert, so the order follows the latest rename
+            applied[old] = record["new"]
+        elif op == "undone":
+            started.pop(old, None)
+            applied.pop(old, None)
+
+    renames = list(applied.items())
+    # a run killed between a rename and its record: trust the file system
+    renames += [
+        (old, new)
+        for old, new in started.items()
+        if old not in applied and os.path.lexists(new) and not os.path.lexists(old)
+    ]
+    return renames
+
+
+def undo(path: Path) -> Iterator[UndoResult]:
+    """
+    Reverse the renames recorded in the journal at `path`, newest first.
+
+    A rename is skipped if its new name is gone or its old name has been
+    taken in the meantime. Files moved into a library on another device are
+    copied back. Reversed renames are recorded, so running it twice is harmless.
+    """
+    with Journal(path) as journal:
+        for old, new in reversed(_renames(path)):
+            if not os.path.lexists(new):
+                yield UndoResult(old, new, "file no longer exists")
+                continue
+            if os.path.lexists(old):
+                yield UndoResult(old, new, "original name is taken")
+                continue
+            try:
+                move_file(Path(new), Path(old))
+            except OSError as exc:
+                yield UndoResult(old, new, exc.strerror or str(exc))
+                continue
+            except CopyMismatchError as exc:
+                yield UndoResult(old, new, exc.detail)
+                continue
+            journal.record("undone", old, new=new)
+            yield UndoResult(old, new)
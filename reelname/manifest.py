@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import os
+from pathlib import Path
+import sqlite3
+import threading
+from types import TracebackType
+
+from .cache import default_cache_dir
+from .constants import MANIFEST_FLUSH_EVERY
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    root     TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    inode    INTEGER NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    decision TEXT NOT NULL,
+    PRIMARY KEY (root, name)
+) WITHOUT ROWID
+"""
+
+# (inode, size, mtime_ns): a file whose name and FileKey are unchanged is the same file
+FileKey = tuple[int, int, int]
+
+
+def file_key(st: os.stat_result) -> FileKey:
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+class Manifest:
+    """
+    Per-directory record of files already processed and what was decided for
+    each (renamed, already correct, no match, ...), stored next to the lookup cache.
+
+    Files are keyed by their path relative to `root` plus inode, size and mtime,
+    so a file that is replaced, modified or renamed is processed again. All of
+    a root's entries are loaded into memory up front; new decisions are written
+    in batches. Safe to share between the scan thread and the event loop.
+
+    With `refresh`, every file counts as changed (so `--refresh-cache` looks
+    them all up again), and the new decisions are still recorded.
+    """
+
+    def __init__(self, root: Path | str, path: Path | None = None, refresh: bool = False) -> None:
+        self.root = os.path.abspath(root)
+        self.refresh = refresh
+        self.path = path or default_cache_dir() / "manifest.sqlite3"
+        self._prefix = len(os.path.join(self.root, ""))
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT name, inode, size, mtime_ns FROM files WHERE root = ?", (self.root,)
+        )
+        self._entries: dict[str, FileKey] = {
+            name: (ino, size, mtime) for name, ino, size, mtime in rows
+        }
+        self._seen: set[str] = set()
+        self._pending: list[tuple[str, str, int, int, int, str]] = []
+
+    def _name(self, path: Path) -> str:
+        return os.path.abspath(path)[self._prefix :].replace(os.sep, "/")
+
+    def changed(self, batch: Iterable[Path]) -> list[tuple[Path, FileKey | None]]:
+        """
+        Return the files of `batch` that are new or changed since they were
+        recorded, each with its current key (None if it couldn't be stat'ed).
+        """
+        result: list[tuple[Path, FileKey | None]] = []
+        for file in batch:
+            name = self._name(file)
+            self._seen.add(name)
+            try:
+                key = file_key(file.stat())
+            except OSError:
+                result.append((file, None))
+                continue
+            if self.refresh or self._entries.get(name) != key:
+                result.append((file, key))
+        return result
+
+    def record(self, path: Path, key: FileKey, decision: str) -> None:
+        """Remember the final `decision` for the file now at `path`."""
+        name = self._name(path)
+        with self._lock:
+            self._seen.add(name)
+            self._pending.append((self.root, name, *key, decision))
+            if len(self._pending) >= MANIFEST_FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", self._pending
+            )
+            self._conn.commit()
+            self._pending.clear()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def prune(self) -> int:
+        """
+        Forget files that were recorded but no longer exist, and return how
+        many there were. Entries merely outside this run's scan are kept.
+        """
+        with self._lock:
+            self._flush()
+            gone = [
+                name
+                for name in self._entries.keys() - self._seen
+                if not os.path.lexists(os.path.join(self.root, name))
+            ]
+            self._conn.executemany(
+                "DELETE FROM files WHERE root = ? AND name = ?",
+                ((self.root, name) for name in gone),
+            )
+            self._conn.commit()
+            return len(gone)
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> Manifest:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class ManifestShard:
+    """
+    A worker process's stand-in for a `Manifest` (`--workers`): `changed`
+    answers with the keys the parent's manifest worked out, and `record`
+    collects the decisions in `records` for the parent to record.
+    """
+
+    def __init__(self, files: Iterable[tuple[Path, FileKey | None]]) -> None:
+        self.keys = dict(files)
+        self.records: list[tuple[Path, FileKey, str]] = []
+
+    def changed(self, batch: Iterable[Path]) -> list[tuple[Path, FileKey | None]]:
+        return [(file, self.keys.get(file)) for file in batch]
+
+    def record(self, path: Path, key: FileKey, decision: str) -> None:
+        self.records.append((path, key, decision))
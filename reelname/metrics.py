@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, ContextManager
+
+from .constants import LATENCY_BUCKETS
+
+# Prometheus metric names, and the help text for each
+_PREFIX = "reelname"
+_HELP = {
+    "stage_seconds": "Time spent in each pipeline stage.",
+    "files_total": "Files processed, by final decision.",
+    "lookups_total": "Lookups started (after coalescing duplicates).",
+    "coalesced_total": "Files that shared another file's in-flight lookup.",
+    "cache_lookups_total": "Lookup cache reads, by result.",
+    "queue_depth": "Parsed files waiting for the rename stage.",
+    "lookups_in_flight": "Lookups currently running.",
+    "uptime_seconds": "Seconds since metrics collection started.",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class StageStats:
+    """How often a pipeline stage ran and how long it took in total."""
+
+    count: int = 0
+    seconds: float = 0.0
+    # observations per LATENCY_BUCKETS bound, the last slot for anything slower
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+
+class Metrics:
+    """
+    Counters, gauges and per-stage latency histograms for the processing
+    pipeline (scan, parse, lookup, search, rename).
+
+    Everything can be recorded from any thread. A disabled instance returns
+    straight away from every call and hands out a shared no-op context
+    manager, so instrumented code costs next to nothing when nobody is collecting.
+    Export with `summary` (JSON-friendly) or `to_prometheus` / `write_textfile`
+    (node_exporter's textfile collector format).
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.started = time.time()
+        self.stages: dict[str, StageStats] = {}
+        self.counters: dict[tuple[str, Labels], int] = {}
+        self.gauges: dict[str, float] = {}
+        self.peaks: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name: str) -> ContextManager[None]:
+        """Time the body of a `with` block as one run of stage `name`."""
+        if not self.enabled:
+            return _NOOP
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record one run of stage `name` that took `seconds`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def count(self, name: str, n: int = 1, **labels: str) -> None:
+        """Add `n` to counter `name` (e.g. "files", decision="renamed")."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def gauge(self, name: str, value: float) -> None:
+        """Set gauge `name`, remembering the highest value seen."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[name] = value
+            if name not in self.peaks or value > self.peaks[name]:
+                self.peaks[name] = value
+
+    def as_dict(self) -> dict[str, Any]:
+        """Per-stage totals and histogram buckets, keyed by stage name."""
+        with self._lock:
+            return {
+                name: {
+                    "count": stats.count,
+                    "seconds": stats.seconds,
+                    "buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], stats.buckets)),
+                }
+                for name, stats in sorted(self.stages.items())
+            }
+
+    def summary(self) -> dict[str, Any]:
+        """Everything collected so far, for `--stats`."""
+        stages = self.as_dict()
+        with self._lock:
+            counters: dict[str, Any] = {}
+            for (name, labels), value in sorted(self.counters.items()):
+                if labels:
+                    counters.setdefault(name, {})[",".join(v for _, v in labels)] = value
+                else:
+                    counters[name] = value
+            gauges = {
+                name: {"current": value, "max": self.peaks[name]}
+                for name, value in sorted(self.gauges.items())
+            }
+        elapsed = time.time() - self.started
+        files = sum(v for (name, _), v in self.counters.items() if name == "files")
+        return {
+            "elapsed_seconds": elapsed,
+            "files_per_second": files / elapsed if elapsed else 0.0,
+            "stages": stages,
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def header(name: str, kind: str) -> None:
+            lines.append(f"# HELP {_PREFIX}_{name} {_HELP.get(name, name)}")
+            lines.append(f"# TYPE {_PREFIX}_{name} {kind}")
+
+        with self._lock:
+            if self.stages:
+                header("stage_seconds", "histogram")
+            for stage, stats in sorted(self.stages.items()):
+                cumulative = 0
+                for bound, observed in zip([*map(str, LATENCY_BUCKETS), "+Inf"], stats.buckets):
+                    cumulative += observed
+                    bucket = f'stage="{stage}",le="{bound}"'
+                    lines.append(f"{_PREFIX}_stage_seconds_bucket{{{bucket}}} {cumulative}")
+                lines.append(f'{_PREFIX}_stage_seconds_sum{{stage="{stage}"}} {stats.seconds}')
+                lines.append(f'{_PREFIX}_stage_seconds_count{{stage="{stage}"}} {stats.count}')
+
+            seen: set[str] = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in seen:
+                    seen.add(name)
+                    header(f"{name}_total", "counter")
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{_PREFIX}_{name}_total{label_text} {value}")
+
+            for name, level in sorted(self.gauges.items()):
+                header(name, "gauge")
+                lines.append(f"{_PREFIX}_{name} {level}")
+
+        header("uptime_seconds", "gauge")
+        lines.append(f"{_PREFIX}_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """
+        Write `to_prometheus` output to `path` atomically, as the node_exporter
+        textfile collector expects.
+        """
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+_NOOP: ContextManager[None] = nullcontext()
+
+# Shared disabled instance for callers that don't collect metrics.
+NO_METRICS = Metrics(enabled=False)
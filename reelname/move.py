@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import errno
+import os
+from pathlib import Path
+import shutil
+from types import TracebackType
+from typing import Callable, NamedTuple
+
+import click
+
+from .constants import LIBRARY_LAYOUT, MOVE_CHUNK, MOVE_JOBS
+from .exceptions import CopyMismatchError, InvalidLayoutError
+
+# copy_file_range/sendfile errors that mean "not between these files", not a failed copy
+_UNSUPPORTED = frozenset(
+    {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSOCK, errno.EBADF}
+)
+
+Progress = Callable[[int, int], None]  # (bytes copied, bytes in total)
+
+
+def check_layout(layout: str) -> str:
+    """Return `layout` if it's a usable library layout, or raise InvalidLayoutError."""
+    try:
+        relpath = layout.format(title="Title", year="2000", filename="Title (2000).mkv")
+    except (IndexError, KeyError, ValueError) as exc:
+        raise InvalidLayoutError(layout) from exc
+    parts = Path(relpath).parts
+    if not parts or os.path.isabs(relpath) or ".." in parts:
+        raise InvalidLayoutError(layout)
+    return layout
+
+
+class Library(NamedTuple):
+    """Where `--output-dir` puts renamed files: under `root`, as `layout` says."""
+
+    root: Path
+    layout: str = LIBRARY_LAYOUT
+
+    def destination(self, title: str, year: str, filename: str) -> Path:
+        """The library path for a file; the parts must already be safe as file names."""
+        return self.root / self.layout.format(title=title, year=year, filename=filename)
+
+
+def _copy_file_range(src: int, dst: int, count: int) -> int:
+    return os.copy_file_range(src, dst, count)
+
+
+def _sendfile(src: int, dst: int, count: int) -> int:
+    return os.sendfile(dst, src, None, count)
+
+
+def _read_write(src: int, dst: int, count: int) -> int:
+    data = os.read(src, min(count, 1024 * 1024))
+    view = memoryview(data)
+    while view:
+        view = view[os.write(dst, view) :]
+    return len(data)
+
+
+def _copy(src: int, dst: int, size: int, progress: Progress | None) -> int:
+    """
+    Copy `size` bytes from the current offset of `src` to that of `dst`, in the
+    kernel where it can (copy_file_range, or sendfile between files on Linux)
+    and through a small buffer where it can't. Returns the bytes copied.
+    """
+    methods = [_read_write]
+    if hasattr(os, "sendfile"):
+        methods.insert(0, _sendfile)
+    if hasattr(os, "copy_file_range"):
+        methods.insert(0, _copy_file_range)
+    copied = 0
+    while copied < size:
+        try:
+            n = methods[0](src, dst, min(MOVE_CHUNK, size - copied))
+        except OSError as exc:
+            if exc.errno not in _UNSUPPORTED or len(methods) == 1:
+                raise
+            methods.pop(0)  # nothing was copied by the failed call; try the next way
+            continue
+        if n == 0:  # the source got shorter
+            break
+        copied += n
+        if progress is not None:
+            progress(copied, size)
+    return copied
+
+
+# link() errors that mean the file system has no hard links (FAT, some network shares)
+_NO_LINKS = frozenset({errno.EPERM, errno.EMLINK, errno.ENOSYS, errno.EOPNOTSUPP})
+
+
+def _check_free(path: Path | str) -> None:
+    if os.path.lexists(path):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(path))
+
+
+def rename_no_replace(src: Path | str, dst: Path | str) -> None:
+    """
+    Rename `src` to `dst` on the same file system, raising FileExistsError if
+    `dst` exists. Linking the new name fails atomically when it is taken, so
+    two renames racing to one name can't both succeed. Where there are no
+    hard links it falls back to a check and a rename.
+    """
+    try:
+        os.link(src, dst, follow_symlinks=False)
+    except FileExistsError:
+        # a case-only rename on a case-insensitive file system finds the file itself
+        same_name = os.fspath(src).casefold() == os.fspath(dst).casefold()
+        if not (same_name and os.path.samefile(src, dst)):
+            raise
+        os.rename(src, dst)
+        return
+    except OSError as exc:
+        if exc.errno not in _NO_LINKS:
+            raise
+        _check_free(dst)
+        os.rename(src, dst)
+        return
+    try:
+        os.unlink(src)
+    except BaseException:
+        os.unlink(dst)
+        raise
+
+
+def _check_copy(src: Path, before: os.stat_result, copied: int, written: int) -> None:
+    """Raise CopyMismatchError unless all of the unchanged `src` was copied."""
+    after = os.stat(src)
+    if (
+        copied != before.st_size
+        or written != before.st_size
+        or (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns)
+    ):
+        raise CopyMismatchError(str(src))
+
+
+def copy_file(src: Path, dst: Path, progress: Progress | None = None) -> None:
+    """
+    Copy `src` to a new file `dst` (which must not exist) with its times and
+    permissions, calling `progress` as it goes. The copy is flushed to disk and
+    checked against the original, which must not change meanwhile; on any
+    failure `dst` is removed.
+    """
+    with src.open("rb") as fin:
+        before = os.fstat(fin.fileno())
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, "wb") as fout:
+                copied = _copy(fin.fileno(), fout.fileno(), before.st_size, progress)
+                os.fsync(fout.fileno())
+                written = os.fstat(fout.fileno()).st_size
+            _check_copy(src, before, copied, written)
+            shutil.copystat(src, dst)
+        except BaseException:
+            dst.unlink(missing_ok=True)
+            raise
+
+
+def move_file(src: Path, dst: Path, progress: Progress | None = None) -> str:
+    """
+    Move `src` to `dst`, creating its directory, without ever overwriting.
+
+    A rename if both are on the same file system ("moved"). Otherwise the
+    file is copied next to `dst` under a temporary name, verified, put in
+    place and only then removed from its old place ("copied"), so an
+    interrupted move leaves the original where it was.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    _check_free(dst)  # before copying anything; rename_no_replace has the final say
+    try:
+        rename_no_replace(src, dst)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+    else:
+        return "moved"
+    # ".part", so a watcher on the destination waits for the real name
+    partial = dst.with_name(f".{dst.name}.{os.getpid()}.part")
+    copy_file(src, partial, progress)
+    try:
+        rename_no_replace(partial, dst)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.unlink(src)
+    return "copied"
+
+
+class Mover:
+    """
+    Moves files into a library in the background, up to `jobs` at a time, on
+    threads of its own, so lookups and renames carry on while large files are
+    copied to another device. File contents go from disk to disk in the
+    kernel, never through Python. Use from a single event loop.
+    """
+
+    def __init__(self, jobs: int = MOVE_JOBS) -> None:
+        self.jobs = jobs
+        self._executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="reelname-move")
+        self._tasks: set[asyncio.Future[None]] = set()
+
+    async def submit(self, src: Path, dst: Path, done: Callable[[str | None], None]) -> None:
+        """
+        Start moving `src` to `dst`, first waiting while `jobs` moves are running.
+        `done` is called on the event loop with how the file was moved
+        ("moved" or "copied", see `move_file`), or None if it wasn't.
+        """
+        while len(self._tasks) >= self.jobs:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+        task = asyncio.ensure_future(self._move(src, dst, done))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _move(self, src: Path, dst: Path, done: Callable[[str | None], None]) -> None:
+        reported = 0
+
+        def progress(copied: int, total: int) -> None:
+            nonlocal reported
+            quarter = copied * 4 // total
+            if reported < quarter < 4:  # 25%, 50% and 75%
+                reported = quarter
+                click.echo(f"📦 Copying {src.name}: {quarter * 25}%")
+
+        loop = asyncio.get_running_loop()
+        try:
+            how = await loop.run_in_executor(self._executor, move_file, src, dst, progress)
+        except (OSError, CopyMismatchError) as exc:
+            reason = exc.strerror if isinstance(exc, OSError) else exc.detail
+            click.echo(f"⏩ Not moved ({reason or exc}): {src.name}")
+            done(None)
+            return
+        click.echo(f"✅ Moved: {src.name} → {dst}")
+        done(how)
+
+    async def join(self) -> None:
+        """Wait for every move started so far."""
+        while self._tasks:
+            await asyncio.wait(self._tasks)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> Mover:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterator
+import gzip
+import mmap
+import os
+from pathlib import Path
+import struct
+from types import TracebackType
+from typing import IO, Any
+
+from .cache import _similarity_key, default_cache_dir
+from .constants import (
+    OFFLINE_CANDIDATES,
+    OFFLINE_PREFIX,
+    OFFLINE_SHORTLIST,
+    OFFLINE_TITLE_TYPES,
+)
+from .exceptions import InvalidIndexError
+
+# On-disk layout (all integers little-endian):
+#   magic                    8 bytes
+#   record count, year count u32, u32
+#   year table               year count x (u16 year, u32 first record, u32 end record)
+#   offset table             (record count + 1) x u32, relative to the blob
+#   blob                     records "normalized\x1fTitle\x1ftconst", sorted by (year, normalized)
+# where normalized is the title casefolded with punctuation dropped.
+_MAGIC = b"RNIDX002"
+_HEADER = struct.Struct("<8sII")
+_YEAR = struct.Struct("<HII")
+_OFFSET = struct.Struct("<I")
+_SPAN = struct.Struct("<II")  # a record's start and end offsets
+_SEP = "\x1f"
+
+
+def default_index_path() -> Path:
+    return default_cache_dir() / "title.basics.idx"
+
+
+def _open_tsv(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", newline="\n")
+    return path.open(encoding="utf-8", newline="\n")
+
+
+def _read_titles(tsv: Path) -> Iterator[tuple[int, str, str, str]]:
+    """Yield (year, normalized, title, tconst) for every usable row of title.basics.tsv."""
+    with _open_tsv(tsv) as fh:
+        next(fh, None)  # header
+        for line in fh:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 6 or fields[1] not in OFFLINE_TITLE_TYPES:
+                continue
+            tconst, _, title, _, _, start_year = fields[:6]
+            if start_year.isdigit():
+                yield int(start_year), _similarity_key(title), title, tconst
+
+
+def _prefixes(normalized: str) -> set[str]:
+    return {word[:OFFLINE_PREFIX] for word in normalized.split()}
+
+
+def build_index(tsv: Path, output: Path) -> int:
+    """
+    Build a compact offline index from IMDb's title.basics.tsv(.gz) dump
+    and return the number of records written.
+    """
+    records = sorted(set(_read_titles(tsv)))
+
+    years: list[tuple[int, int, int]] = []
+    offsets: list[int] = []
+    blob = bytearray()
+    for i, (year, normalized, title, tconst) in enumerate(records):
+        if not years or years[-1][0] != year:
+            years.append((year, i, i))
+        years[-1] = (year, years[-1][1], i + 1)
+        offsets.append(len(blob))
+        blob += _SEP.join((normalized, title, tconst)).encode("utf-8")
+    offsets.append(len(blob))
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(_HEADER.pack(_MAGIC, len(records), len(years)))
+        for entry in years:
+            fh.write(_YEAR.pack(*entry))
+        fh.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        fh.write(blob)
+    os.replace(tmp, output)
+    return len(records)
+
+
+class OfflineResolver:
+    """
+    Resolver backed by a memory-mapped index built with `build_index`.
+
+    Drop-in for `ImdbResolver`: `search` returns Cinemagoer-style candidates
+    ({"title", "year", "imdbID"}) from the year's bucket, which are then scored
+    by the usual matcher. An exact normalized-title hit is returned straight
+    from a binary search; otherwise the titles sharing a word with the query
+    are narrowed to the closest few with rapidfuzz. No network is ever used.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_index_path()
+        try:
+            with self.path.open("rb") as fh:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            raise InvalidIndexError(str(self.path)) from exc
+
+        try:
+            self._read_tables()
+        except InvalidIndexError:
+            self._mm.close()
+            raise
+        self._buckets: dict[int, list[str]] = {}
+        self._words: dict[int, dict[str, list[int]]] = {}
+
+    def _unpack(self, fmt: struct.Struct, offset: int) -> tuple[Any, ...]:
+        try:
+            return fmt.unpack_from(self._mm, offset)
+        except struct.error as exc:
+            raise InvalidIndexError(str(self.path)) from exc
+
+    def _read_tables(self) -> None:
+        """Read the year table and check the file is as long as its header says."""
+        magic, count, year_count = self._unpack(_HEADER, 0)
+        if magic != _MAGIC:
+            raise InvalidIndexError(str(self.path))
+        self._offsets_at = _HEADER.size + year_count * _YEAR.size
+        self._blob_at = self._offsets_at + (count + 1) * _OFFSET.size
+        (blob_size,) = self._unpack(_OFFSET, self._blob_at - _OFFSET.size)
+        if self._blob_at + blob_size > len(self._mm):
+            raise InvalidIndexError(str(self.path))
+        self._years: dict[int, tuple[int, int]] = {}
+        for pos in range(_HEADER.size, self._offsets_at, _YEAR.size):
+            year, first, end = self._unpack(_YEAR, pos)
+            if not first <= end <= count:
+                raise InvalidIndexError(str(self.path))
+            self._years[year] = (first, end)
+
+    def _record(self, i: int) -> list[str]:
+        start, end = self._unpack(_SPAN, self._offsets_at + i * _OFFSET.size)
+        raw = self._mm[self._blob_at + start : self._blob_at + end]
+        try:
+            return raw.decode("utf-8").split(_SEP)
+        except UnicodeDecodeError as exc:
+            raise InvalidIndexError(str(self.path)) from exc
+
+    def _bucket(self, year: int) -> list[str]:
+        """Normalized titles for `year`, decoded once and then kept."""
+        if (bucket := self._buckets.get(year)) is None:
+            first, end = self._years.get(year, (0, 0))
+            bucket = self._buckets[year] = [self._record(i)[0] for i in range(first, end)]
+        return bucket
+
+    def _shortlist(self, year: int, normalized: str) -> list[int]:
+        """
+        Positions in `year`'s bucket of the titles sharing a word prefix with
+        `normalized`, capped at OFFLINE_SHORTLIST by leaving out the most common.
+        """
+        if (words := self._words.get(year)) is None:
+            words = self._words[year] = {}
+            for i, title in enumerate(self._bucket(year)):
+                for prefix in _prefixes(title):
+                    words.setdefault(prefix, []).append(i)
+
+        shortlist: set[int] = set()
+        for positions in sorted((words.get(p, []) for p in _prefixes(normalized)), key=len):
+            if len(shortlist) + len(positions) > OFFLINE_SHORTLIST:
+                if not shortlist:
+                    shortlist.update(positions[:OFFLINE_SHORTLIST])
+                break
+            shortlist.update(positions)
+        return sorted(shortlist)
+
+    def _candidate(self, i: int, year: int) -> dict[str, Any]:
+        _, title, tconst = self._record(i)
+        return {"title": title, "year": year, "imdbID": tconst.removeprefix("tt")}
+
+    def search(self, title: str, year: str) -> list[dict[str, Any]]:
+        if not year.isdigit() or int(year) not in self._years:
+            return []
+        target = int(year)
+        first = self._years[target][0]
+        bucket = self._bucket(target)
+        normalized = _similarity_key(title)
+
+        # fast path: exact normalized title
+        lo = bisect_left(bucket, normalized)
+        hi = lo
+        while hi < len(bucket) and bucket[hi] == normalized:
+            hi += 1
+        if hi > lo:
+            return [self._candidate(first + i, target) for i in range(lo, hi)]
+
+        from rapidfuzz import fuzz, process
+
+        shortlist = {i: bucket[i] for i in self._shortlist(target, normalized)}
+        closest = process.extract(
+            normalized, shortlist, scorer=fuzz.token_sort_ratio, limit=OFFLINE_CANDIDATES
+        )
+        return [self._candidate(first + i, target) for _, _, i in closest]
+
+    def update(self, movie: Any) -> None:
+        """Offline candidates always carry their year; nothing to fetch."""
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __enter__(self) -> OfflineResolver:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
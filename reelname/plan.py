@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from itertools import groupby
+import json
+import os
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .exceptions import InvalidPlanError
+from .journal import Journal
+
+PLAN_VERSION = 1
+
+# Renaming relative to an open directory fd saves resolving the full path for
+# every file; platforms without *at() calls (Windows) fall back to full paths.
+_DIR_FD = os.rename in os.supports_dir_fd and os.stat in os.supports_dir_fd
+
+
+class PlanEntry(NamedTuple):
+    """One planned rename, with what the source file looked like when planned."""
+
+    directory: str  # absolute
+    old: str
+    new: str
+    title: str  # the title and year the new name was built from
+    year: str
+    size: int
+    mtime_ns: int
+
+
+class Plan(NamedTuple):
+    """The renames planned for `root`, in the order they were planned."""
+
+    root: str
+    entries: list[PlanEntry]
+
+
+class ApplyResult(NamedTuple):
+    """What `apply_plan` did with one entry."""
+
+    entry: PlanEntry
+    error: str | None = None  # why it wasn't renamed, if it wasn't
+
+
+def write_plan(plan: Plan, path: Path) -> None:
+    """Write `plan` as JSON, with directories relative to its root."""
+    renames = [
+        {
+            "dir": os.path.relpath(entry.directory, plan.root).replace(os.sep, "/"),
+            "old": entry.old,
+            "new": entry.new,
+            "title": entry.title,
+            "year": entry.year,
+            "size": entry.size,
+            "mtime_ns": entry.mtime_ns,
+        }
+        for entry in plan.entries
+    ]
+    data = {
+        "version": PLAN_VERSION,
+        "root": plan.root,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "renames": renames,
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_plan(path: Path, root: str | None = None) -> Plan:
+    """
+    Read a plan written by `write_plan`. Pass `root` to apply it to a
+    different mount point of the same directory than the one it was planned on.
+    """
+    try:
+        data: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+        if data["version"] != PLAN_VERSION:
+            raise InvalidPlanError(str(path))
+        root = os.path.abspath(root or data["root"])
+        entries = [
+            PlanEntry(
+                os.path.normpath(os.path.join(root, item["dir"])),
+                item["old"],
+                item["new"],
+                item["title"],
+                item["year"],
+                int(item["size"]),
+                int(item["mtime_ns"]),
+            )
+            for item in data["renames"]
+        ]
+    except (OSError, ValueError, TypeError, KeyError) as exc:
+        raise InvalidPlanError(str(path)) from exc
+    return Plan(root, entries)
+
+
+def _check(entry: PlanEntry, dir_fd: int | None) -> str | None:
+    """Return why `entry` can't be applied, or None if it can."""
+    old = entry.old if dir_fd is not None else os.path.join(entry.directory, entry.old)
+    new = entry.new if dir_fd is not None else os.path.join(entry.directory, entry.new)
+    if "/" in entry.old or "/" in entry.new or os.sep in entry.old or os.sep in entry.new:
+        return "not a plain file name"
+    try:
+        st = os.stat(old, dir_fd=dir_fd, follow_symlinks=False)
+    except OSError:
+        return "file no longer exists"
+    if (st.st_size, st.st_mtime_ns) != (entry.size, entry.mtime_ns):
+        return "file changed since planned"
+    try:
+        taken = os.stat(new, dir_fd=dir_fd, follow_symlinks=False)
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        return exc.strerror or str(exc)
+    # a case-only rename on a case-insensitive file system finds the file itself
+    return None if os.path.samestat(st, taken) else "target name is taken"
+
+
+def _apply_directory(
+    directory: str, entries: list[PlanEntry], journal: Journal | None
+) -> Iterator[ApplyResult]:
+    try:
+        dir_fd = (
+            os.open(directory, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)) if _DIR_FD else None
+        )
+    except OSError:
+        for entry in entries:
+            yield ApplyResult(entry, "directory no longer exists")
+        return
+    try:
+        for entry in entries:
+            if (error := _check(entry, dir_fd)) is not None:
+                yield ApplyResult(entry, error)
+                continue
+            old_path = os.path.join(entry.directory, entry.old)
+            new_path = os.path.join(entry.directory, entry.new)
+            if journal is not None:
+                journal.resolved_as(old_path, (entry.title, entry.year), new_path)
+            try:
+                if dir_fd is not None:
+                    os.rename(entry.old, entry.new, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+                else:
+                    os.rename(old_path, new_path)
+            except OSError as exc:
+                yield ApplyResult(entry, exc.strerror or str(exc))
+                continue
+            if journal is not None:
+                journal.renamed(old_path, new_path)
+            yield ApplyResult(entry)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def apply_plan(plan: Plan, journal: Journal | None = None) -> Iterator[ApplyResult]:
+    """
+    Carry out the renames of `plan`, one directory at a time, relative to an
+    open directory descriptor.
+
+    An entry is skipped if its file is gone or has changed size or mtime since
+    it was planned (stale), or if its new name is already taken, e.g. by an
+    earlier entry (conflict). Nothing is ever overwritten.
+    """
+    for directory, entries in groupby(plan.entries, key=lambda entry: entry.directory):
+        yield from _apply_directory(directory, list(entries), journal)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Hashable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import Any, Callable, TypeVar
+
+from .constants import DEFAULT_JOBS
+
+T = TypeVar("T")
+
+
+class FairPool:
+    """
+    `jobs` lookup threads shared by several producers ("lanes", e.g. watched roots).
+
+    At most `jobs` calls run at once. When they are all busy, waiting calls
+    get the next free thread lane by lane in turn (round robin), so a burst
+    of thousands of files in one lane delays another lane's next file by at
+    most one call rather than the whole burst. Within a lane calls run in the
+    order they were made. Use from a single event loop.
+    """
+
+    def __init__(self, jobs: int = DEFAULT_JOBS) -> None:
+        self.jobs = jobs
+        self.executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="reelname")
+        self._free = jobs
+        self._waiting: OrderedDict[Hashable, deque[asyncio.Future[None]]] = OrderedDict()
+
+    @asynccontextmanager
+    async def turn(self, lane: Hashable) -> AsyncIterator[None]:
+        """Wait for `lane`'s turn at a thread, and hold it for the `async with` body."""
+        await self._acquire(lane)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def run(self, lane: Hashable, func: Callable[..., T], *args: Any) -> T:
+        """Call `func(*args)` on a pool thread once `lane`'s turn comes."""
+        async with self.turn(lane):
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _acquire(self, lane: Hashable) -> None:
+        if self._free > 0 and not self._waiting:
+            self._free -= 1
+            return
+        turn = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(lane, deque()).append(turn)
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.done() and not turn.cancelled():
+                self._release()  # the thread was handed over just as we were cancelled
+            raise
+
+    def _release(self) -> None:
+        """Hand the freed thread to the next lane in turn, or put it back."""
+        while self._waiting:
+            lane, queue = next(iter(self._waiting.items()))
+            turn = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(lane)
+            else:
+                del self._waiting[lane]
+            if not turn.cancelled():
+                turn.set_result(None)
+                return
+        self._free += 1
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self) -> FairPool:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
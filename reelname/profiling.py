@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections import Counter
+import logging
+import os
+from pathlib import Path
+import re
+import sys
+import threading
+from types import CodeType, FrameType, TracebackType
+
+from .constants import PROFILE_INTERVAL
+
+# Leaf frames of threads that are only waiting for work; left out of the hotspots
+_IDLE = frozenset(
+    {
+        "threading.py:wait",
+        "selectors.py:select",
+        "queue.py:get",
+        "thread.py:_worker",
+        "profiling.py:_run",
+    }
+)
+_THREAD_SUFFIX = re.compile(r"[_-]\d+$")
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler that samples the stacks of every thread each `interval`
+    seconds, so the lookup workers are covered as well as the event loop.
+
+    Results are kept as collapsed stacks ("thread;frame;frame count"), the input
+    format of flamegraph.pl and speedscope. Sampling from a background thread
+    adds no cost to the code being profiled beyond the sampler's own GIL time.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self._labels: dict[CodeType, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="reelname-profiler", daemon=True)
+
+    def _label(self, code: CodeType) -> str:
+        if (label := self._labels.get(code)) is None:
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+        return label
+
+    def _stack(self, thread: str, frame: FrameType | None) -> tuple[str, ...]:
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.append(thread)
+        return tuple(reversed(stack))
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    thread = _THREAD_SUFFIX.sub("", names.get(ident, "thread"))
+                    self.samples[self._stack(thread, frame)] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self) -> SamplingProfiler:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def write_collapsed(self, path: Path) -> None:
+        lines = [f"{';'.join(stack)} {count}" for stack, count in sorted(self.samples.items())]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def hotspots(self, top: int) -> tuple[int, list[tuple[str, int, int]]]:
+        """
+        Return the number of busy samples and the `top` functions by self time,
+        as (function, self samples, total samples), ignoring idle threads.
+        """
+        busy = 0
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self.samples.items():
+            if stack[-1] in _IDLE:
+                continue
+            busy += count
+            own[stack[-1]] += count
+            for label in set(stack[1:]):
+                total[label] += count
+        return busy, [(label, n, total[label]) for label, n in own.most_common(top)]
+
+
+def enable_lookup_tracing() -> None:
+    """Send the per-lookup trace logged by `utils._search_imdb` to stderr."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(threadName)s %(message)s"))
+    logger = logging.getLogger("reelname")
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
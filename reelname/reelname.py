@@ -1,38 +1,93 @@
+from __future__ import annotations
+
 import asyncio
+from collections.abc import Iterable, Sequence
+import os
 from pathlib import Path
+from typing import Any
 
 import click
-from watchdog.events import FileSystemEvent, FileSystemEventHandler
-from watchdog.observers import Observer
-
-from .utils import _process_files
 
+from .cache import CacheStats, LookupCache
+from .constants import DEFAULT_DEBOUNCE, DEFAULT_JOBS
+from .journal import Journal
+from .manifest import Manifest
+from .metrics import Metrics
+from .move import Library
+from .plan import Plan, PlanEntry
+from .resolver import ImdbResolver, Resolver
+from .scan import ScanOptions
+from .utils import RunStats, _process_files
 
-class FileChangeHandler(FileSystemEventHandler):
-    """Trigger _process_files when new files appear."""
 
-    def __init__(self, directory: Path, loop: asyncio.AbstractEventLoop) -> None:
-        super().__init__()
-        self.directory = directory
-        self.loop = loop
+def __getattr__(name: str) -> Any:
+    # FileChangeHandler lives in .watch so that watchdog is only imported in watch mode
+    if name == "FileChangeHandler":
+        from .watch import FileChangeHandler
 
-    def on_created(self, event: FileSystemEvent) -> None:
-        if not event.is_directory:
-            click.echo(f"🔔 Detected new file: {event.src_path!s}")
-            asyncio.run_coroutine_threadsafe(_process_files(self.directory), self.loop)
+        return FileChangeHandler
+    raise AttributeError(name)
 
 
-def watch_directory(directory: str) -> None:
+def watch_directories(
+    directories: Sequence[str],
+    cache: LookupCache | None = None,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    scan: ScanOptions | None = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+    journal: Journal | None = None,
+    manifests: Iterable[Manifest] = (),
+    metrics: Metrics | None = None,
+    metrics_file: Path | None = None,
+    library: Library | None = None,
+) -> None:
     """
-    Continuously watch `directory` and perform IMDb-based renaming.
+    Continuously watch `directories` and perform IMDb-based renaming
+    of files as they arrive, or move them into `library`. With
+    `metrics_file`, Prometheus metrics are written there after every batch.
+
+    All of them are watched by one observer, and share one resolver and one
+    pool of `jobs` lookup threads, which takes the directories in turn so a
+    burst of files in one doesn't hold up the others. Each directory's files
+    are recorded in the one of `manifests` for that root, if any. What was
+    done in each directory is reported when the watcher stops.
     """
-    dir_path = Path(directory)
+    from watchdog.observers import Observer
+
+    from .pool import FairPool
+    from .watch import FileChangeHandler
+
+    roots = list(dict.fromkeys(Path(os.path.abspath(d)) for d in directories))
+    by_root = {manifest.root: manifest for manifest in manifests}
     loop = asyncio.get_event_loop()
-    handler = FileChangeHandler(dir_path, loop)
+    resolver = resolver or ImdbResolver(size=jobs)
+    scan = scan or ScanOptions()
+    pool = FairPool(jobs)
     observer = Observer()
-    observer.schedule(handler, str(dir_path), recursive=False)
+    handlers = []
+    for root in roots:
+        handler = FileChangeHandler(
+            root,
+            loop,
+            cache,
+            jobs,
+            resolver,
+            scan,
+            debounce,
+            journal,
+            by_root.get(str(root)),
+            metrics,
+            metrics_file,
+            pool,
+            # with -r, another root inside this one gets its own files
+            tuple(other for other in roots if scan.recursive and root in other.parents),
+            library,
+        )
+        observer.schedule(handler, str(root), recursive=scan.recursive)
+        handlers.append(handler)
+        click.echo(f"👀 Watching: {root!s}")
     observer.start()
-    click.echo(f"👀 Watching: {dir_path!s}")
 
     try:
         loop.run_forever()
@@ -40,13 +95,127 @@ def watch_directory(directory: str) -> None:
         click.echo("👋 Stopping watcher...")
         observer.stop()
     observer.join()
+    pool.close()
+    for handler in handlers:
+        stats = handler.stats
+        click.echo(
+            f"📊 {handler.directory!s}: {stats.files} files, {stats.renamed} renamed,"
+            f" {stats.moved} moved, {stats.lookups} lookups ({stats.coalesced} coalesced)"
+        )
+
+
+def watch_directory(
+    directory: str,
+    cache: LookupCache | None = None,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    scan: ScanOptions | None = None,
+    debounce: float = DEFAULT_DEBOUNCE,
+    journal: Journal | None = None,
+    manifest: Manifest | None = None,
+    metrics: Metrics | None = None,
+    metrics_file: Path | None = None,
+    library: Library | None = None,
+) -> None:
+    """`watch_directories` for a single directory."""
+    watch_directories(
+        [directory],
+        cache,
+        jobs,
+        resolver,
+        scan,
+        debounce,
+        journal,
+        [] if manifest is None else [manifest],
+        metrics,
+        metrics_file,
+        library,
+    )
+
+
+def report_cache(stats: CacheStats) -> None:
+    """Print the cache hit counts, and how often a similar title saved a search."""
+    click.echo(f"🗄️ Cache: {stats.hits} hits, {stats.misses} misses")
+    if tried := stats.similar_hits + stats.similar_misses:
+        click.echo(
+            f"🧩 Similar titles: {stats.similar_hits} of {tried} misses reused"
+            f" ({stats.similar_hits / tried:.0%})"
+        )
 
 
-def run_once(directory: str) -> None:
+def report_run(
+    stats: RunStats,
+    journal: Journal | None = None,
+    manifest: Manifest | None = None,
+    library: Library | None = None,
+) -> None:
+    """Print the summary at the end of a run."""
+    click.echo("✅ Run-once processing complete.")
+    click.echo(f"🔁 Lookups: {stats.lookups} run, {stats.coalesced} saved by coalescing")
+    if library is not None:
+        click.echo(
+            f"📦 Library: {stats.moved} files moved to {library.root!s}"
+            f" ({stats.copied} copied from another device)"
+        )
+    if journal is not None and stats.resumed:
+        click.echo(f"♻️ Resumed: {stats.resumed} lookups reused from {journal.path}")
+    if manifest is not None:
+        click.echo(f"📒 Manifest: {stats.unchanged} unchanged files skipped")
+
+
+def run_once(
+    directory: str,
+    cache: LookupCache | None = None,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    scan: ScanOptions | None = None,
+    metrics: Metrics | None = None,
+    journal: Journal | None = None,
+    manifest: Manifest | None = None,
+    library: Library | None = None,
+) -> None:
     """
-    Perform a single-pass scan of `directory` and rename matching files.
+    Perform a single-pass scan of `directory` and rename matching files,
+    or move them into `library`.
     """
     dir_path = Path(directory)
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(_process_files(dir_path))
-    click.echo("✅ Run-once processing complete.")
+    resolver = resolver or ImdbResolver(size=jobs)
+    stats = asyncio.run(
+        _process_files(
+            dir_path,
+            cache,
+            jobs,
+            resolver,
+            scan,
+            metrics=metrics,
+            journal=journal,
+            manifest=manifest,
+            library=library,
+        )
+    )
+    if manifest is not None:
+        manifest.prune()
+    report_run(stats, journal, manifest, library)
+    if cache is not None:
+        report_cache(cache.stats)
+
+
+def plan_directory(
+    directory: str,
+    cache: LookupCache | None = None,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    scan: ScanOptions | None = None,
+) -> Plan:
+    """
+    Scan `directory` and resolve its files like `run_once`, but return the
+    renames as a plan instead of doing them.
+    """
+    entries: list[PlanEntry] = []
+    resolver = resolver or ImdbResolver(size=jobs)
+    stats = asyncio.run(_process_files(Path(directory), cache, jobs, resolver, scan, plan=entries))
+    click.echo(f"✅ Planned {len(entries)} renames.")
+    click.echo(f"🔁 Lookups: {stats.lookups} run, {stats.coalesced} saved by coalescing")
+    if cache is not None:
+        report_cache(cache.stats)
+    return Plan(os.path.abspath(directory), entries)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+import queue
+import threading
+from typing import Any, Callable, Protocol
+
+from .constants import DEFAULT_JOBS
+
+
+class Resolver(Protocol):
+    """What the matcher needs from a lookup backend (Cinemagoer, offline index, ...)."""
+
+    def search(self, title: str, year: str) -> list[Any]:
+        """Return candidate titles; each is a mapping with at least "title" and "year"."""
+        ...
+
+    def update(self, movie: Any) -> None:
+        """Fill in missing details (such as the year) of a candidate in place."""
+        ...
+
+
+def _cinemagoer() -> Any:
+    # imported on first use: the imdb package is slow to import and not needed
+    # for --help, offline runs or directories with nothing to look up
+    from imdb import Cinemagoer
+
+    return Cinemagoer()
+
+
+class ImdbResolver:
+    """
+    Owns a small pool of long-lived Cinemagoer sessions and hands them out to
+    lookup threads, so HTTP plumbing is set up once per session instead of once per file.
+
+    Sessions are created lazily, up to `size`; a thread that finds them all busy
+    waits for one to be returned rather than building another.
+    """
+
+    def __init__(self, size: int = DEFAULT_JOBS, factory: Callable[[], Any] | None = None) -> None:
+        self.size = size
+        self._factory = factory or _cinemagoer
+        self._idle: queue.LifoQueue[Any] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self) -> Iterator[Any]:
+        """Borrow a session for the duration of the `with` block."""
+        try:
+            ia = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            ia = self._create() if can_create else self._idle.get()
+        try:
+            yield ia
+        finally:
+            self._idle.put(ia)
+
+    def _create(self) -> Any:
+        try:
+            return self._factory()
+        except BaseException:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def search(self, title: str, year: str) -> list[Any]:
+        """Return IMDb search results for the title and year."""
+        with self.session() as ia:
+            return list(ia.search_movie(f"{title} {year}"))
+
+    def update(self, movie: Any) -> None:
+        """Fetch full details for a search result in place."""
+        with self.session() as ia:
+            ia.update(movie)
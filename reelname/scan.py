@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from fnmatch import fnmatch
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+
+class ScanOptions(NamedTuple):
+    """Which files under a directory get processed."""
+
+    recursive: bool = False
+    include: tuple[str, ...] = ()  # globs a file must match (any of), if given
+    exclude: tuple[str, ...] = ()  # globs that skip a file or a whole subdirectory
+    extensions: tuple[str, ...] = ()  # e.g. (".mkv", ".mp4"); empty means all
+
+    def excludes(self, name: str, relpath: str) -> bool:
+        return any(fnmatch(name, pat) or fnmatch(relpath, pat) for pat in self.exclude)
+
+    def accepts(self, name: str, relpath: str) -> bool:
+        if self.extensions and os.path.splitext(name)[1].lower() not in self.extensions:
+            return False
+        if self.include and not any(
+            fnmatch(name, pat) or fnmatch(relpath, pat) for pat in self.include
+        ):
+            return False
+        return not self.excludes(name, relpath)
+
+
+def normalize_extensions(extensions: tuple[str, ...]) -> tuple[str, ...]:
+    """Turn user input like ("MKV", ".mp4") into (".mkv", ".mp4")."""
+    return tuple("." + ext.lower().lstrip(".") for ext in extensions)
+
+
+def iter_file_batches(directory: Path, options: ScanOptions | None = None) -> Iterator[list[Path]]:
+    """
+    Walk `directory` with os.scandir and yield the accepted files one directory
+    at a time, in name order (depth-first when recursive).
+
+    File types come from the cached DirEntry info, so there is no extra stat
+    per entry. Directories are listed only as the caller asks for more, so memory
+    is bounded by the largest single directory, not by the size of the tree.
+    """
+    options = options or ScanOptions()
+    root = os.fspath(directory)
+    prefix = len(os.path.join(root, ""))
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            # vanished or unreadable subdirectory; the root itself must exist
+            if current == root:
+                raise
+            continue
+
+        files: list[Path] = []
+        subdirs: list[str] = []
+        for entry in entries:
+            relpath = entry.path[prefix:].replace(os.sep, "/")
+            if entry.is_dir(follow_symlinks=False):
+                if options.recursive and not options.excludes(entry.name, relpath):
+                    subdirs.append(entry.path)
+            elif entry.is_file() and options.accepts(entry.name, relpath):
+                files.append(Path(entry.path))
+        del entries
+
+        if files:
+            yield files
+        pending.extend(reversed(subdirs))
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stdout
+import io
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import click
+
+from .cache import CacheStats, LookupCache
+from .constants import DEFAULT_JOBS, SHARD_SIZE
+from .manifest import FileKey, Manifest, ManifestShard
+from .move import Library
+from .reelname import report_cache, report_run
+from .resolver import Resolver
+from .scan import ScanOptions, iter_file_batches
+from .utils import RunStats, _process_batches
+
+Shard = list[tuple[str, "FileKey | None"]]
+
+
+class ShardResult(NamedTuple):
+    """What a worker did with one shard, sent back to the parent."""
+
+    output: str  # what a single-process run would have printed for these files
+    records: list[tuple[Path, FileKey, str]]  # decisions for the manifest
+    stats: RunStats
+    cache: CacheStats
+
+
+class _Worker(NamedTuple):
+    resolver: Resolver
+    cache: LookupCache | None
+    jobs: int
+    library: Library | None
+
+
+_worker: _Worker  # set in each worker process by _start_worker
+
+
+def _start_worker(
+    resolver_factory: Callable[[], Resolver],
+    cache_path: Path | None,
+    refresh: bool,
+    jobs: int,
+    library: Library | None,
+) -> None:
+    """Process pool initializer: one resolver and cache connection per worker, kept warm."""
+    global _worker
+    cache = None
+    if cache_path is not None:
+        cache = LookupCache(cache_path, refresh=refresh)
+        Finalize(cache, cache.close, exitpriority=10)  # pool workers skip atexit
+    _worker = _Worker(resolver_factory(), cache, jobs, library)
+
+
+def _run_shard(files: Shard) -> ShardResult:
+    """Process one shard in a worker, capturing its report."""
+    shard = ManifestShard((Path(path), key) for path, key in files)
+    before = _worker.cache.stats if _worker.cache is not None else CacheStats()
+    output = io.StringIO()
+    with redirect_stdout(output):
+        stats = asyncio.run(
+            _process_batches(
+                iter([list(shard.keys)]),
+                _worker.cache,
+                _worker.jobs,
+                _worker.resolver,
+                manifest=shard,
+                library=_worker.library,
+            )
+        )
+    after = _worker.cache.stats if _worker.cache is not None else CacheStats()
+    cache = CacheStats(*(now - then for now, then in zip(after, before)))
+    return ShardResult(output.getvalue(), shard.records, stats, cache)
+
+
+def _shards(
+    directory: Path,
+    scan: ScanOptions | None,
+    manifest: Manifest | None,
+    stats: RunStats,
+    size: int,
+) -> Iterator[Shard]:
+    """Scan `directory` (skipping what the manifest has seen) in shards of `size` files."""
+    shard: Shard = []
+    for batch in iter_file_batches(directory, scan):
+        if manifest is None:
+            files: Iterable[tuple[Path, FileKey | None]] = ((file, None) for file in batch)
+        else:
+            files = manifest.changed(batch)
+            stats.unchanged += len(batch) - len(files)
+        for file, key in files:
+            shard.append((str(file), key))
+            if len(shard) == size:
+                yield shard
+                shard = []
+    if shard:
+        yield shard
+
+
+def run_sharded(
+    directory: str,
+    workers: int,
+    resolver_factory: Callable[[], Resolver],
+    cache: LookupCache | None = None,
+    jobs: int = DEFAULT_JOBS,
+    scan: ScanOptions | None = None,
+    manifest: Manifest | None = None,
+    library: Library | None = None,
+    shard_size: int = SHARD_SIZE,
+) -> None:
+    """
+    `run_once` spread over `workers` processes, for libraries too big for one core.
+
+    The directory is scanned here, and the files are handed out in shards of
+    neighbouring files, each processed by a worker's own pipeline (`jobs`
+    concurrent lookups with a resolver from `resolver_factory`, which must be
+    picklable). All workers share the lookup `cache` database. Each shard's
+    report is printed in scan order as it completes, so the output reads as
+    if one process had done the work, and its decisions go into `manifest` here.
+    """
+    stats = RunStats()
+    totals = CacheStats()
+    initargs = (
+        resolver_factory,
+        None if cache is None else cache.path,
+        cache is not None and cache.refresh,
+        jobs,
+        library,
+    )
+    shards = _shards(Path(directory), scan, manifest, stats, shard_size)
+    pending: deque[Future[ShardResult]] = deque()
+    with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=initargs) as pool:
+        try:
+            # keep every worker busy, with a shard each queued behind it
+            for shard in shards:
+                pending.append(pool.submit(_run_shard, shard))
+                if len(pending) >= workers * 2:
+                    totals = _merge(pending.popleft().result(), stats, totals, manifest)
+            while pending:
+                totals = _merge(pending.popleft().result(), stats, totals, manifest)
+        finally:
+            for future in pending:
+                future.cancel()
+    if manifest is not None:
+        manifest.prune()
+    report_run(stats, manifest=manifest, library=library)
+    click.echo(f"🧵 Workers: {workers} processes")
+    if cache is not None:
+        report_cache(totals)
+
+
+def _merge(
+    result: ShardResult, stats: RunStats, totals: CacheStats, manifest: Manifest | None
+) -> CacheStats:
+    """Print a finished shard's report and add it to the run's."""
+    click.echo(result.output, nl=False)
+    stats.add(result.stats)
+    if manifest is not None:
+        for path, key, decision in result.records:
+            manifest.record(path, key, decision)
+    return CacheStats(*(a + b for a, b in zip(totals, result.cache)))
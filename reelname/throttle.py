@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+from .constants import (
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    BREAKER_COOLDOWN,
+    BREAKER_COOLDOWN_MAX,
+    BREAKER_THRESHOLD,
+    DEFAULT_JOBS,
+    LOOKUP_ATTEMPTS,
+    LOOKUP_RATE,
+    LOOKUP_RATE_MAX,
+    LOOKUP_RATE_MIN,
+    LOOKUP_RATE_STEP,
+    LOOKUP_SLOW,
+    THROTTLE_STATUSES,
+)
+from .exceptions import LookupFailedError
+from .resolver import Resolver
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def _details(error: BaseException) -> dict[str, Any]:
+    # Cinemagoer raises IMDbDataAccessError({"errcode": ..., "original exception": ...})
+    return error.args[0] if error.args and isinstance(error.args[0], dict) else {}
+
+
+def _causes(exc: BaseException) -> Iterator[BaseException]:
+    """`exc` and the errors behind it, including the one Cinemagoer wraps."""
+    seen: set[int] = set()
+    stack = [exc]
+    while stack:
+        error = stack.pop()
+        if id(error) in seen:
+            continue
+        seen.add(id(error))
+        yield error
+        if isinstance(original := _details(error).get("original exception"), BaseException):
+            stack.append(original)
+        stack.extend(e for e in (error.__cause__, error.__context__) if e is not None)
+
+
+def http_status(exc: BaseException) -> int | None:
+    """The HTTP status a lookup error came from, if it came from one."""
+    for error in _causes(exc):
+        for attr in ("code", "status", "status_code"):
+            if isinstance(value := getattr(error, attr, None), int):
+                return value
+        if isinstance(value := _details(error).get("errcode"), int):
+            return value
+    return None
+
+
+def retry_after(exc: BaseException) -> float | None:
+    """Seconds the server asked us to wait (the Retry-After header), if it did."""
+    for error in _causes(exc):
+        headers = getattr(error, "headers", None)
+        try:
+            return float(headers.get("Retry-After"))  # type: ignore[union-attr]
+        except (AttributeError, TypeError, ValueError):
+            continue
+    return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens a second, at most `burst` saved up.
+
+    The rate adapts the way TCP's congestion window does (AIMD): every
+    success adds `step`, a slow response takes off a fifth, and an error half
+    (throttling) or a fifth (anything else), staying within [min_rate, max_rate].
+    """
+
+    def __init__(
+        self,
+        rate: float = LOOKUP_RATE,
+        burst: int = DEFAULT_JOBS,
+        min_rate: float = LOOKUP_RATE_MIN,
+        max_rate: float = LOOKUP_RATE_MAX,
+        step: float = LOOKUP_RATE_STEP,
+        slow: float = LOOKUP_SLOW,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.step = step
+        self.slow = slow
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take a token, waiting for one if necessary; returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def _set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill()  # tokens earned so far count at the old rate
+            self.rate = min(self.max_rate, max(self.min_rate, rate))
+
+    def succeeded(self, seconds: float) -> None:
+        """Adapt to a request that succeeded after `seconds`."""
+        if seconds > self.slow:
+            self._set_rate(self.rate * 0.8)
+        else:
+            self._set_rate(self.rate + self.step)
+
+    def failed(self, throttled: bool) -> None:
+        """Adapt to a failed request; `throttled` if the server said to slow down."""
+        self._set_rate(self.rate * (0.5 if throttled else 0.8))
+        if throttled:
+            with self._lock:
+                self._tokens = min(self._tokens, 0.0)  # no burst straight back into the limit
+
+
+class CircuitBreaker:
+    """
+    Stops requests after `threshold` failures in a row.
+
+    While open, `wait` blocks its callers (nothing is dropped) until
+    `cooldown` seconds have passed and then lets one of them through as a
+    probe. A successful request closes the breaker and releases everyone; a
+    failed probe opens it again for twice as long, up to `max_cooldown`.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        max_cooldown: float = BREAKER_COOLDOWN_MAX,
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.failures = 0  # in a row
+        self.trips = 0  # times opened
+        self._current = cooldown
+        self._opened: float | None = None
+        self._probe: int | None = None  # thread id of the probe in flight
+        self._cond = threading.Condition()
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened is not None
+
+    def wait(self) -> None:
+        """Return once a request may be made, blocking while the breaker is open."""
+        with self._cond:
+            while self._opened is not None:
+                if self._probe is None:
+                    remaining = self._opened + self._current - time.monotonic()
+                    if remaining <= 0:
+                        self._probe = threading.get_ident()
+                        return
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+
+    def success(self) -> None:
+        with self._cond:
+            self.failures = 0
+            if self._opened is not None:
+                logger.debug("circuit breaker closed")
+                self._opened = self._probe = None
+                self._current = self.cooldown
+                self._cond.notify_all()
+
+    def failure(self) -> None:
+        with self._cond:
+            self.failures += 1
+            if self._probe == threading.get_ident():
+                self._current = min(self.max_cooldown, self._current * 2)
+                self._open()
+            elif self._opened is None and self.failures >= self.threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self.trips += 1
+        self._opened = time.monotonic()
+        self._probe = None
+        self._cond.notify_all()
+        logger.debug("circuit breaker open for %.1fs", self._current)
+
+
+@dataclass
+class ThrottleStats:
+    """What the throttling did during a run."""
+
+    retries: int = 0  # requests repeated after an error
+    throttled: int = 0  # errors that were rate-limit responses
+    failed: int = 0  # lookups given up on after every attempt
+
+
+class ThrottledResolver:
+    """
+    Wraps a resolver so its requests go through an adaptive `TokenBucket` and
+    a `CircuitBreaker`, and are retried up to `attempts` times with full-jitter
+    exponential backoff (at least as long as any Retry-After asks for).
+
+    A request that fails every attempt raises `LookupFailedError`, for the
+    caller to skip that file rather than abort the run.
+    """
+
+    def __init__(
+        self,
+        resolver: Resolver,
+        bucket: TokenBucket | None = None,
+        breaker: CircuitBreaker | None = None,
+        attempts: int = LOOKUP_ATTEMPTS,
+        backoff: float = BACKOFF_BASE,
+        max_backoff: float = BACKOFF_MAX,
+    ) -> None:
+        self.resolver = resolver
+        self.bucket = bucket or TokenBucket()
+        self.breaker = breaker or CircuitBreaker()
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = ThrottleStats()
+        self._lock = threading.Lock()
+
+    def _count(self, **counts: int) -> None:
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + n)
+
+    def _call(self, func: Callable[..., T], *args: Any) -> T:
+        for attempt in range(1, self.attempts + 1):
+            self.breaker.wait()
+            self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                result = func(*args)
+            except Exception as exc:  # any error may be transient
+                status = http_status(exc)
+                throttled = status in THROTTLE_STATUSES
+                self.bucket.failed(throttled)
+                self.breaker.failure()
+                self._count(throttled=int(throttled))
+                if attempt == self.attempts:
+                    self._count(failed=1)
+                    raise LookupFailedError(repr(exc)) from exc
+                # full jitter: anywhere up to the exponential bound, so workers spread out
+                cap = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+                delay = random.uniform(0, cap)  # noqa: S311
+                delay = max(delay, min(self.max_backoff, retry_after(exc) or 0.0))
+                logger.debug(
+                    "attempt %d failed (%s), retrying in %.2fs at %.1f/s",
+                    attempt,
+                    status or type(exc).__name__,
+                    delay,
+                    self.bucket.rate,
+                )
+                self._count(retries=1)
+                time.sleep(delay)
+                continue
+            self.breaker.success()
+            self.bucket.succeeded(time.perf_counter() - start)
+            return result
+        raise AssertionError  # unreachable: the last attempt returns or raises
+
+    def search(self, title: str, year: str) -> list[Any]:
+        return self._call(self.resolver.search, title, year)
+
+    def update(self, movie: Any) -> None:
+        self._call(self.resolver.update, movie)
@@ -1,20 +1,51 @@
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, fields
+import functools
+import logging
+import os
 from pathlib import Path
-import re
+import time
+from typing import Any, Callable, NamedTuple
 
-import aiofiles.os
 import click
-from imdb import Cinemagoer
-from rapidfuzz import fuzz
 
+from .cache import LookupCache, normalize_key
 from .constants import (
     BRACKETED_PATTERN,
+    COALESCE_WINDOW,
+    DEFAULT_JOBS,
     DOT_YEAR_PATTERN,
+    EARLY_EXIT_SCORE,
     INVALID_FILENAME_CHARS,
+    MATCH_THRESHOLD,
     SPACE_YEAR_PATTERN,
+    SUFFIX_SEPARATOR_PATTERN,
+    TITLE_SEPARATOR_PATTERN,
+    TITLE_YEAR_PATTERN,
     URL_PREFIX_PATTERN,
+    YEAR_DIGITS_PATTERN,
 )
+from .exceptions import LookupFailedError
+from .journal import Journal
+from .manifest import FileKey, Manifest, ManifestShard
+from .metrics import NO_METRICS, Metrics
+from .move import Library, Mover, rename_no_replace
+from .plan import PlanEntry
+from .pool import FairPool
+from .resolver import ImdbResolver, Resolver
+from .scan import ScanOptions, iter_file_batches
+
+logger = logging.getLogger(__name__)
+
+# Decisions not recorded in the manifest: the file is looked at again next
+# run (a failed lookup or move), or is no longer in the directory (moved)
+_UNRECORDED = frozenset({"failed", "error", "moved", "copied"})
 
 
 def extract_title_and_year(filename: str) -> tuple[str | None, str | None]:
@@ -29,17 +60,45 @@ def extract_title_and_year(filename: str) -> tuple[str | None, str | None]:
     if m := URL_PREFIX_PATTERN.match(filename):
         filename = filename[m.end() :]  # remove only prefix, not all ' - '
 
-    # Try year-extracting patterns
+    # Cheap reject: no four-digit run means no year
+    if not YEAR_DIGITS_PATTERN.search(filename):
+        return None, None
+
+    if "\n" in filename:  # the combined matcher assumes newline-free names
+        return _extract_slow(filename)
+
+    # Try the year-extracting patterns, in priority order, in a single pass
+    if m := TITLE_YEAR_PATTERN.match(filename):
+        year_group = m.lastindex or 0
+        # Normalize dot/underscore separators to spaces
+        title = TITLE_SEPARATOR_PATTERN.sub(" ", m.group(year_group - 1).strip()).strip()
+        return title, m.group(year_group)
+
+    return None, None
+
+
+def _extract_slow(filename: str) -> tuple[str | None, str | None]:
+    """Try each year-extracting pattern in turn; the reference for TITLE_YEAR_PATTERN."""
     for pat in (BRACKETED_PATTERN, DOT_YEAR_PATTERN, SPACE_YEAR_PATTERN):
         if m := pat.search(filename):
-            raw_title = m.group("title").strip()
-            year = m.group("year")
+            title = TITLE_SEPARATOR_PATTERN.sub(" ", m.group("title").strip()).strip()
+            return title, m.group("year")
+    return None, None
 
-            # Normalize dot/underscore separators to spaces
-            title = re.sub(r"[._]+", " ", raw_title).strip()
-            return title, year
 
-    return None, None
+def extract_many(
+    filenames: Iterable[str], processes: int | None = None, chunksize: int = 4096
+) -> list[tuple[str | None, str | None]]:
+    """
+    `extract_title_and_year` over many filenames, in order.
+
+    With `processes` > 1 the work is spread over a process pool in chunks of
+    `chunksize`, which pays off from a few hundred thousand names upwards.
+    """
+    if not processes or processes <= 1:
+        return [extract_title_and_year(name) for name in filenames]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(extract_title_and_year, filenames, chunksize=chunksize))
 
 
 def get_match_score(title: str, candidate: str) -> float:
@@ -50,6 +109,8 @@ def get_match_score(title: str, candidate: str) -> float:
       - fuzz.partial_token_sort_ratio
     This punishes missing tokens, order-changes, and trivial substrings.
     """
+    from rapidfuzz import fuzz
+
     return min(
         fuzz.ratio(title, candidate),
         fuzz.token_sort_ratio(title, candidate),
@@ -57,41 +118,160 @@ def get_match_score(title: str, candidate: str) -> float:
     )
 
 
-def fetch_info_from_imdb(title: str, year: str) -> tuple[str, str]:
+def get_match_scores(title: str, candidates: list[str]) -> list[float]:
     """
-    Look up the title on IMDb via Cinemagoer:
-      - Search IMDb for the raw title.
-      - Use fuzzy matching to pick the best.
-      - If found, return (official_title, imdb_year).
-      - Otherwise, fall back to the extracted (title, year).
+    Batched `get_match_score`: score `title` against every candidate at once,
+    one rapidfuzz call per metric instead of three calls per candidate.
     """
-    ia = Cinemagoer()
-    results = ia.search_movie(f"{title} {year}")
+    from rapidfuzz import fuzz, process
+
+    scores = [100.0] * len(candidates)
+    for scorer in (fuzz.ratio, fuzz.token_sort_ratio, fuzz.partial_token_sort_ratio):
+        for _, score, i in process.extract(title, candidates, scorer=scorer, limit=None):
+            scores[i] = min(scores[i], score)
+    return scores
+
+
+def _search_imdb(title: str, year: str, resolver: Resolver | None = None) -> tuple[str, str] | None:
+    """
+    Search IMDb for the raw title and use fuzzy matching to pick the best.
+    Return (official_title, imdb_year), or None if nothing matched well enough.
+
+    With debug logging on for this module (`--trace-lookups`), logs the search
+    time and each candidate's score and scoring cost.
+    """
+    resolver = resolver or ImdbResolver(size=1)
+    tracing = logger.isEnabledFor(logging.DEBUG)
+    start = time.perf_counter()
+    results = resolver.search(title, year)
+    if tracing:
+        logger.debug(
+            "search %r (%s): %d results in %.1f ms",
+            title,
+            year,
+            len(results),
+            (time.perf_counter() - start) * 1000,
+        )
+
+    # Candidates from another year can never win, so drop them before scoring.
+    # Ones without a year are kept and only resolved if they could win.
+    candidates = [
+        movie
+        for movie in results
+        if movie.get("title") and (not movie.get("year") or str(movie.get("year")) == year)
+    ]
+    start = time.perf_counter()
+    scores = get_match_scores(title, [movie["title"] for movie in candidates])
+    if tracing:
+        _trace_scores(title, candidates, scores, time.perf_counter() - start)
 
     best_match = None
     best_score = 0.0
-    for movie in results:
-        candidate = movie.get("title")
-        if not candidate:
+    for movie, score in zip(candidates, scores):
+        if score <= best_score or score < MATCH_THRESHOLD:
             continue
-        score = get_match_score(title, candidate)
-        if score > best_score:
-            movie_year = movie.get("year")
-            if not movie_year:
-                ia.update(movie)  # fetch full details for this movie
-            if str(movie_year) != year:
+        if not movie.get("year"):
+            start = time.perf_counter()
+            resolver.update(movie)  # fetch full details for this movie
+            if tracing:
+                logger.debug(
+                    "  update %r: year %s in %.1f ms",
+                    movie["title"],
+                    movie.get("year"),
+                    (time.perf_counter() - start) * 1000,
+                )
+            if str(movie.get("year")) != year:
                 continue
-            best_score = score
-            best_match = movie
-            if score >= 98.0:
-                break
-
-    if best_match and best_score >= 80:
-        imdb_title = best_match.get("title")
-        imdb_year = best_match.get("year")
-        if imdb_title and imdb_year:  # return the fixed title and year
-            click.echo(f"🔎 Found: {imdb_title} ({imdb_year})")
-            return imdb_title, str(imdb_year)
+        best_score = score
+        best_match = movie
+        if score >= EARLY_EXIT_SCORE:
+            break
+
+    if tracing:
+        logger.debug(
+            "  → %s", f"{best_match['title']!r} ({best_score:.1f})" if best_match else "no match"
+        )
+    if best_match:
+        return best_match["title"], str(best_match["year"])
+
+    return None
+
+
+def _trace_scores(title: str, candidates: list[Any], scores: list[float], batched: float) -> None:
+    """Log each candidate's score and what scoring it alone costs."""
+    logger.debug("  scored %d candidates in %.1f µs (batched)", len(candidates), batched * 1e6)
+    for movie, score in zip(candidates, scores):
+        start = time.perf_counter()
+        get_match_score(title, movie["title"])
+        cost = time.perf_counter() - start
+        logger.debug(
+            "    %5.1f  %r (%s)  %.1f µs", score, movie["title"], movie.get("year"), cost * 1e6
+        )
+
+
+def lookup_imdb(
+    title: str,
+    year: str,
+    cache: LookupCache | None = None,
+    resolver: Resolver | None = None,
+    metrics: Metrics = NO_METRICS,
+) -> tuple[str, str] | None:
+    """
+    Like `_search_imdb`, but consult `cache` first and record the outcome
+    (including "no match") so later runs skip the network. A title the cache
+    has no entry for is then compared with the IMDb titles it has matched for
+    that year, and a confident match is reused instead of searching.
+    """
+    return lookup_imdb_source(title, year, cache, resolver, metrics)[0]
+
+
+def lookup_imdb_source(
+    title: str,
+    year: str,
+    cache: LookupCache | None = None,
+    resolver: Resolver | None = None,
+    metrics: Metrics = NO_METRICS,
+) -> tuple[tuple[str, str] | None, str]:
+    """
+    `lookup_imdb`, also saying what answered: "cache" (an entry for this
+    title), "similar" (a close enough title the cache matched before) or
+    "lookup" (a search).
+    """
+    if cache is not None:
+        if (entry := cache.get(title, year)) is not None:
+            metrics.count("cache_lookups", result="hit")
+            return entry.match, "cache"
+        if (match := cache.similar(title, year, get_match_scores)) is not None:
+            metrics.count("cache_lookups", result="similar")
+            cache.set(title, year, match)
+            return match, "similar"
+        metrics.count("cache_lookups", result="miss")
+
+    with metrics.stage("search"):
+        match = _search_imdb(title, year, resolver)
+    if cache is not None:
+        cache.set(title, year, match)
+    return match, "lookup"
+
+
+def fetch_info_from_imdb(
+    title: str,
+    year: str,
+    cache: LookupCache | None = None,
+    resolver: Resolver | None = None,
+    metrics: Metrics = NO_METRICS,
+) -> tuple[str, str]:
+    """
+    Look up the title on IMDb via Cinemagoer:
+      - Search IMDb for the raw title (unless `cache` knows the answer, or a
+        close enough title it matched before).
+      - Use fuzzy matching to pick the best.
+      - If found, return (official_title, imdb_year).
+      - Otherwise, fall back to the extracted (title, year).
+    """
+    if match := lookup_imdb(title, year, cache, resolver, metrics):
+        click.echo(f"🔎 Found: {match[0]} ({match[1]})")
+        return match
 
     return title, year
 
@@ -122,7 +302,7 @@ def rebuild_filename(original: str, title: str, year: str) -> str:
 
         # 3) Strip any leading punctuation/brackets/whitespace from the suffix,
         #    replacing it with a single space (if there is any suffix at all).
-        suffix_clean = re.sub(r"^[\s._\-()\[\]{}<>]+", " ", suffix)
+        suffix_clean = SUFFIX_SEPARATOR_PATTERN.sub(" ", suffix)
 
         # 4) Build the new filename
         file_name = f"{title} ({year}){suffix_clean}"
@@ -131,49 +311,348 @@ def rebuild_filename(original: str, title: str, year: str) -> str:
 
 
 async def _rename_file_async(old_path: str, new_path: str) -> None:
-    await aiofiles.os.rename(old_path, new_path)
-
-
-async def _process_files(directory: Path) -> None:
+    """Rename off the event loop, never replacing a file already at `new_path`."""
+    import aiofiles.os
+
+    await aiofiles.os.wrap(rename_no_replace)(old_path, new_path)
+
+
+async def _start_move(
+    file: Path,
+    match: tuple[str, str] | None,
+    title: str,
+    year: str,
+    new_name: str,
+    library: Library,
+    mover: Mover,
+    journal: Journal | None = None,
+    moved: Callable[[Path, str], None] | None = None,
+) -> tuple[Path, str]:
+    """The library-mode end of `_rename_stage`: start moving `file` to where it belongs."""
+    target = library.destination(_sanitize_filename(title), year, new_name)
+    old_path = os.path.abspath(file)
+    if os.path.abspath(target) == old_path:
+        click.echo(f"⏩ Already correct: {file.name}")
+        return file, "correct"
+    if journal is not None:
+        journal.resolved_as(old_path, match, str(target))
+
+    def done(decision: str | None) -> None:
+        if decision is not None and journal is not None:
+            journal.renamed(old_path, str(target))
+        if moved is None:
+            return
+        if decision is None:
+            moved(file, "error")
+        else:
+            moved(target, decision)
+
+    click.echo(f"📦 Moving: {file.name} → {target}")
+    await mover.submit(file, target, done)
+    return target, "moving"
+
+
+@dataclass
+class RunStats:
+    """Counters reported at the end of a run."""
+
+    lookups: int = 0  # lookups actually started
+    coalesced: int = 0  # files that shared another file's in-flight lookup
+    resumed: int = 0  # files whose lookup was taken from the journal of an earlier run
+    unchanged: int = 0  # files skipped because the manifest says they were already handled
+    files: int = 0  # files that went through the pipeline
+    renamed: int = 0  # files renamed in place
+    moved: int = 0  # files moved into the library (--output-dir)
+    copied: int = 0  # of those, files copied because the library is on another device
+
+    def add(self, other: RunStats) -> None:
+        """Add the counters of another run (or batch) to these."""
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+
+class _Pending(NamedTuple):
+    """A parsed file travelling from the parse stage to the rename stage."""
+
+    file: Path
+    title: str | None
+    year: str | None
+    lookup: asyncio.Future[tuple[str, str] | None] | None
+    key: FileKey | None = None  # for the manifest
+
+
+async def _process_files(
+    directory: Path,
+    cache: LookupCache | None = None,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    scan: ScanOptions | None = None,
+    *,
+    metrics: Metrics | None = None,
+    journal: Journal | None = None,
+    manifest: Manifest | None = None,
+    plan: list[PlanEntry] | None = None,
+    library: Library | None = None,
+) -> RunStats:
     """
     Scan `directory` for files, skip ones without title/year,
-    skip already-formatted ones, lookup IMDb, and rename.
-    """
-    for file in directory.iterdir():
-        if not file.is_file():
-            continue
-
-        raw_filename = file.name
-
-        # 1) extract_title_and_year now handles prefix-stripping
-        title, year = extract_title_and_year(raw_filename)
-        if not title or not year:
-            click.echo(f"⏩ Skipping (no title/year): {raw_filename}")
-            continue
+    skip already-formatted ones, lookup IMDb, and rename
+    (or move them into `library`).
 
-        # 2) skip files already beginning with “Title (Year)”
-        formatted_prefix = f"{title} ({year})"
-        if raw_filename.startswith(formatted_prefix):
-            click.echo(f"⏩ Skipping already formatted: {raw_filename}")
-            continue
+    `scan` controls recursion and include/exclude/extension filters;
+    lookups start while the directory walk is still going.
+    """
+    return await _process_batches(
+        iter_file_batches(directory, scan),
+        cache,
+        jobs,
+        resolver,
+        metrics=metrics,
+        journal=journal,
+        manifest=manifest,
+        plan=plan,
+        library=library,
+    )
 
-        click.echo(f"🔎 Looking up: {title} ({year})")
-        imdb_title, imdb_year = fetch_info_from_imdb(title, year)
 
-        if not imdb_title or not imdb_year:
-            click.echo(f"⏩ Skipping (no IMDb match): {raw_filename}")
-            continue
+async def _process_batches(
+    batches: Iterator[list[Path]],
+    cache: LookupCache | None = None,
+    jobs: int = DEFAULT_JOBS,
+    resolver: Resolver | None = None,
+    *,
+    metrics: Metrics | None = None,
+    journal: Journal | None = None,
+    manifest: Manifest | ManifestShard | None = None,
+    plan: list[PlanEntry] | None = None,
+    pool: FairPool | None = None,
+    lane: Hashable = None,
+    library: Library | None = None,
+) -> RunStats:
+    """
+    Process files handed over in batches by a (possibly blocking) iterator.
+
+    Runs as a pipeline: the parse stage pulls batches on a background thread and
+    starts IMDb lookups on a pool of `jobs` worker threads, and the rename stage
+    consumes their results in order, so output and renames are the same whatever
+    order the lookups finish in.
+    Files that parse to the same (title, year), e.g. the episodes of a season pack,
+    share a single lookup as long as they are close together in the walk.
+    Pass a long-lived `resolver` to reuse its IMDb sessions across calls,
+    `metrics` to collect per-stage timings, a `journal` to record every
+    lookup and rename (and reuse the lookups of a resumed run), and a `manifest`
+    to skip files already handled by an earlier run and record new decisions.
+    With a `plan` list, renames are appended to it instead of being done.
+    Lookups run on `pool`, shared fairly with other callers by `lane`, or on
+    a pool of their own without one.
+    With a `library`, renamed files are moved into it instead, several at a
+    time in the background; the run returns once every move has finished.
+    """
+    resolver = resolver or ImdbResolver(size=jobs)
+    metrics = metrics or NO_METRICS
+    stats = RunStats()
+    # most recent lookups by key, capped so memory doesn't grow with the library size
+    inflight: OrderedDict[tuple[str, str], asyncio.Future[tuple[str, str] | None]] = OrderedDict()
+    loop = asyncio.get_running_loop()
+    # bounded, so the parse stage never runs more than a few lookups ahead
+    queue: asyncio.Queue[_Pending | None] = asyncio.Queue(maxsize=jobs * 2)
+
+    def next_batch() -> list[tuple[Path, FileKey | None]] | None:
+        with metrics.stage("scan"):
+            if (batch := next(batches, None)) is None:
+                return None
+            if manifest is None:
+                return [(file, None) for file in batch]
+            changed = manifest.changed(batch)
+            stats.unchanged += len(batch) - len(changed)
+            metrics.count("files", len(batch) - len(changed), decision="unchanged")
+            return changed
+
+    def timed_lookup(title: str, year: str) -> tuple[str, str] | None:
+        with metrics.stage("lookup"):
+            return lookup_imdb(title, year, cache, resolver, metrics)
+
+    running = 0
+
+    async def lookup(title: str, year: str) -> tuple[str, str] | None:
+        nonlocal running
+        async with lookups.turn(lane):
+            running += 1
+            metrics.gauge("lookups_in_flight", running)
+            try:
+                return await loop.run_in_executor(lookups.executor, timed_lookup, title, year)
+            finally:
+                running -= 1
+                metrics.gauge("lookups_in_flight", running)
+
+    async def parse() -> None:
+        try:
+            while (batch := await loop.run_in_executor(None, next_batch)) is not None:
+                for file, file_key in batch:
+                    # extract_title_and_year handles prefix-stripping
+                    with metrics.stage("parse"):
+                        title, year = extract_title_and_year(file.name)
+                    future = None
+                    # files already beginning with “Title (Year)” need no lookup
+                    if title and year and not file.name.startswith(f"{title} ({year})"):
+                        key = normalize_key(title, year)
+                        path = os.path.abspath(file) if journal is not None else ""
+                        if journal is not None and path in journal.resolved:
+                            # resumed run: this file's lookup already finished last time
+                            future = loop.create_future()
+                            future.set_result(journal.resolved[path])
+                            stats.resumed += 1
+                        else:
+                            if (future := inflight.get(key)) is not None:
+                                stats.coalesced += 1
+                                metrics.count("coalesced")
+                            else:
+                                future = inflight[key] = asyncio.ensure_future(lookup(title, year))
+                                stats.lookups += 1
+                                metrics.count("lookups")
+                                if len(inflight) > COALESCE_WINDOW:
+                                    inflight.popitem(last=False)
+                            if journal is not None:
+                                journal.planned(path, title, year)
+                    await queue.put(_Pending(file, title, year, future, file_key))
+                    metrics.gauge("queue_depth", queue.qsize())
+        finally:
+            await queue.put(None)
+
+    def finished(final: Path, decision: str, key: FileKey | None) -> None:
+        metrics.count("files", decision=decision)
+        stats.files += 1
+        stats.renamed += decision == "renamed"
+        stats.moved += decision in ("moved", "copied")
+        stats.copied += decision == "copied"
+        if manifest is not None and key is not None and decision not in _UNRECORDED:
+            manifest.record(final, key, decision)
+
+    with ExitStack() as stack:
+        lookups = pool or stack.enter_context(FairPool(jobs))
+        mover = None if library is None else stack.enter_context(Mover())
+        producer = asyncio.ensure_future(parse())
+        try:
+            while (pending := await queue.get()) is not None:
+                final, decision = await _rename_stage(
+                    pending,
+                    metrics,
+                    journal,
+                    plan,
+                    library,
+                    mover,
+                    functools.partial(finished, key=pending.key),
+                )
+                if decision != "moving":  # a move reports once it's done
+                    finished(final, decision, pending.key)
+            await producer
+            if mover is not None:
+                await mover.join()
+        finally:
+            producer.cancel()
+    return stats
+
+
+async def _rename_stage(
+    pending: _Pending,
+    metrics: Metrics = NO_METRICS,
+    journal: Journal | None = None,
+    plan: list[PlanEntry] | None = None,
+    library: Library | None = None,
+    mover: Mover | None = None,
+    moved: Callable[[Path, str], None] | None = None,
+) -> tuple[Path, str]:
+    """
+    Report on and rename a single parsed file once its lookup has finished
+    (or, given a `plan`, add the rename to it).
+    Returns where the file ended up and what was decided for it.
 
-        # 3) rebuild_filename expects the *cleaned* substring:
-        #    we re-slice from the first occurrence of the year
-        #    so that rebuild_filename sees “Title(…)suffix”
-        start = raw_filename.find(year)
-        cleaned = raw_filename[start:]
-
-        new_name = rebuild_filename(cleaned, imdb_title, imdb_year)
-        if new_name != raw_filename:
-            # rename the *original* file to the cleaned new_name
-            await _rename_file_async(str(file), str(file.parent / new_name))
-            click.echo(f"✅ Renamed: {raw_filename} → {new_name}")
-        else:
+    Given a `library` and a `mover`, the file is moved into the library in
+    the background instead: the decision is "moving", and `moved` is called
+    with the outcome once the move has finished.
+    """
+    file, title, year, lookup, _ = pending
+    raw_filename = file.name
+
+    # 1) skip files without a parsable title/year
+    if not title or not year:
+        click.echo(f"⏩ Skipping (no title/year): {raw_filename}")
+        return file, "unparsed"
+
+    # 2) skip files already beginning with “Title (Year)”, unless they go to a library
+    if lookup is None:
+        if library is not None and mover is not None:
+            return await _start_move(
+                file, None, title, year, raw_filename, library, mover, journal, moved
+            )
+        click.echo(f"⏩ Skipping already formatted: {raw_filename}")
+        return file, "formatted"
+
+    click.echo(f"🔎 Looking up: {title} ({year})")
+    try:
+        match = await lookup
+    except LookupFailedError as exc:
+        click.echo(f"⏩ Skipping (lookup failed, {exc.extra_detail}): {raw_filename}")
+        return file, "failed"
+    if match:
+        click.echo(f"🔎 Found: {match[0]} ({match[1]})")
+    imdb_title, imdb_year = match or (title, year)
+
+    if not imdb_title or not imdb_year:
+        click.echo(f"⏩ Skipping (no IMDb match): {raw_filename}")
+        return file, "unmatched"
+
+    # 3) rebuild_filename expects the *cleaned* substring:
+    #    we re-slice from the first occurrence of the year
+    #    so that rebuild_filename sees “Title(…)suffix”
+    start = raw_filename.find(year)
+    cleaned = raw_filename[start:]
+
+    new_name = rebuild_filename(cleaned, imdb_title, imdb_year)
+    if plan is not None:
+        if new_name == raw_filename:
             click.echo(f"⏩ Already correct: {raw_filename}")
+            return file, "correct"
+        try:
+            st = file.stat()
+        except OSError as exc:  # moved or deleted since the scan
+            click.echo(f"⏩ Skipping ({exc.strerror or exc}): {raw_filename}")
+            return file, "error"
+        plan.append(
+            PlanEntry(
+                os.path.abspath(file.parent),
+                raw_filename,
+                new_name,
+                imdb_title,
+                imdb_year,
+                st.st_size,
+                st.st_mtime_ns,
+            )
+        )
+        click.echo(f"📝 Planned: {raw_filename} → {new_name}")
+        return file, "planned"
+    if library is not None and mover is not None:
+        return await _start_move(
+            file, match, imdb_title, imdb_year, new_name, library, mover, journal, moved
+        )
+    old_path = os.path.abspath(file)
+    new_path = os.path.join(os.path.dirname(old_path), new_name)
+    if journal is not None:
+        journal.resolved_as(old_path, match, new_path if new_name != raw_filename else None)
+    if new_name != raw_filename:
+        # rename the *original* file to the cleaned new_name
+        try:
+            with metrics.stage("rename"):
+                await _rename_file_async(str(file), str(file.parent / new_name))
+        except FileExistsError:
+            click.echo(f"⏩ Not renamed (target name is taken): {raw_filename}")
+            return file, "error"
+        except OSError as exc:  # moved or deleted since the scan
+            click.echo(f"⏩ Not renamed ({exc.strerror or exc}): {raw_filename}")
+            return file, "error"
+        if journal is not None:
+            journal.renamed(old_path, new_path)
+        click.echo(f"✅ Renamed: {raw_filename} → {new_name}")
+        return file.parent / new_name, "renamed"
+    click.echo(f"⏩ Already correct: {raw_filename}")
+    return file, "correct"
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import os
+from pathlib import Path
+import threading
+
+import click
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+
+from .cache import LookupCache
+from .constants import DEFAULT_DEBOUNCE, DEFAULT_JOBS, PARTIAL_SUFFIXES, WATCH_REMEMBER
+from .journal import Journal
+from .manifest import Manifest
+from .metrics import Metrics
+from .move import Library
+from .pool import FairPool
+from .resolver import Resolver
+from .scan import ScanOptions
+from .utils import RunStats, _process_batches
+
+Identity = tuple[int, int, int, int]  # device, inode, size and mtime of a file
+
+
+class FileChangeHandler(FileSystemEventHandler):
+    """
+    Queue files that appear (created, or renamed into place) and process just
+    those, in debounced batches.
+
+    A queued file is processed once its size is unchanged over a full `debounce`
+    window, so a burst of events costs one batch, and files still being written
+    wait. Each file is processed at most once, tracked by inode, size and mtime,
+    so our own renames do not trigger a second pass; the last WATCH_REMEMBER
+    files are remembered. A batch that fails is retried file by file, and a
+    file that still fails is reported and left for its next event.
+
+    Several handlers (one per watched root) can share an observer and a
+    `pool` of lookup threads, which serves them in turn. Files under one of
+    the `nested` roots are left to that root's handler. With a `library`,
+    files are moved into it. `stats` adds up what was done in this root.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        loop: asyncio.AbstractEventLoop,
+        cache: LookupCache | None = None,
+        jobs: int = DEFAULT_JOBS,
+        resolver: Resolver | None = None,
+        scan: ScanOptions | None = None,
+        debounce: float = DEFAULT_DEBOUNCE,
+        journal: Journal | None = None,
+        manifest: Manifest | None = None,
+        metrics: Metrics | None = None,
+        metrics_file: Path | None = None,
+        pool: FairPool | None = None,
+        nested: tuple[Path, ...] = (),
+        library: Library | None = None,
+    ) -> None:
+        super().__init__()
+        self.directory = directory
+        self.loop = loop
+        self.cache = cache
+        self.jobs = jobs
+        self.resolver = resolver
+        self.scan = scan or ScanOptions()
+        self.debounce = debounce
+        self.journal = journal
+        self.manifest = manifest
+        self.metrics = metrics
+        self.metrics_file = metrics_file
+        self.pool = pool
+        self.nested = tuple(os.path.join(root, "") for root in nested)
+        self.library = library
+        self.stats = RunStats()
+        # paths from the watchdog thread, handed to the event loop a burst at a time
+        self._incoming: list[str] = []
+        self._incoming_lock = threading.Lock()
+        # the state below is only touched from the event loop thread
+        self._pending: dict[Path, tuple[int, float]] = {}  # path -> (size, when) last checked
+        self._done: OrderedDict[Identity, None] = OrderedDict()  # processed, oldest first
+        self._running: set[Identity] = set()  # queued for or being processed
+        self._timer: asyncio.TimerHandle | None = None
+        self._lock = asyncio.Lock()
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self._notify(os.fsdecode(event.src_path))
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        # e.g. a download client renaming "Movie.mkv.part" to "Movie.mkv"
+        if not event.is_directory:
+            self._notify(os.fsdecode(event.dest_path))
+
+    def _notify(self, src_path: str) -> None:
+        """Called on the watchdog thread; hands the path over to the event loop."""
+        path = Path(src_path)
+        if path.suffix.lower() in PARTIAL_SUFFIXES or src_path.startswith(self.nested):
+            return
+        relpath = os.path.relpath(path, self.directory).replace(os.sep, "/")
+        if not self.scan.accepts(path.name, relpath):
+            return
+        with self._incoming_lock:
+            self._incoming.append(src_path)
+            first = len(self._incoming) == 1
+        # one wakeup of the loop per burst, not per event
+        if first:
+            self.loop.call_soon_threadsafe(self._drain)
+
+    def _drain(self) -> None:
+        with self._incoming_lock:
+            incoming, self._incoming = self._incoming, []
+        for src_path in dict.fromkeys(incoming):
+            self._enqueue(Path(src_path))
+
+    def _enqueue(self, path: Path) -> None:
+        try:
+            st = path.stat()
+        except OSError:
+            return
+        if self._seen((st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)):
+            return
+        if path not in self._pending:
+            click.echo(f"🔔 Detected new file: {path!s}")
+        self._pending[path] = (st.st_size, self.loop.time())
+        self._schedule(self.debounce)
+
+    def _schedule(self, delay: float) -> None:
+        # keep a timer that is due sooner: a stream of events mustn't hold back settled files
+        when = self.loop.time() + delay
+        if self._timer is not None:
+            if self._timer.when() <= when:
+                return
+            self._timer.cancel()
+        self._timer = self.loop.call_at(when, self._flush)
+
+    def _flush(self) -> None:
+        self._timer = None
+        now = self.loop.time()
+        ready: list[tuple[Path, Identity]] = []
+        next_check = None
+        for path, (last_size, checked) in list(self._pending.items()):
+            wait = checked + self.debounce - now  # > 0: arrived after the window opened
+            if wait <= 0:
+                try:
+                    st = path.stat()
+                except OSError:  # renamed or deleted in the meantime
+                    del self._pending[path]
+                    continue
+                if st.st_size != last_size:  # still being written
+                    self._pending[path] = (st.st_size, now)
+                    wait = self.debounce
+            if wait > 0:
+                next_check = wait if next_check is None else min(next_check, wait)
+                continue
+            del self._pending[path]
+            identity = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+            if not self._seen(identity):
+                self._running.add(identity)
+                ready.append((path, identity))
+        if next_check is not None:
+            self._schedule(next_check)
+        if ready:
+            self.loop.create_task(self._process(sorted(ready)))
+
+    def _seen(self, identity: Identity) -> bool:
+        return identity in self._done or identity in self._running
+
+    def _finished(self, identity: Identity, done: bool) -> None:
+        self._running.discard(identity)
+        if done:
+            self._done[identity] = None
+            if len(self._done) > WATCH_REMEMBER:
+                self._done.popitem(last=False)
+
+    async def _process(self, files: list[tuple[Path, Identity]]) -> None:
+        async with self._lock:  # one batch at a time, in arrival order
+            try:
+                await self._run([path for path, _ in files])
+            except Exception:
+                # one file's error mustn't take the rest of its batch with it
+                for path, identity in files:
+                    self._finished(identity, await self._run_one(path))
+                return
+            for _, identity in files:
+                self._finished(identity, done=True)
+
+    async def _run_one(self, path: Path) -> bool:
+        try:
+            await self._run([path])
+        except Exception as exc:
+            click.echo(f"⚠️ Failed to process {path.name}: {exc!r}", err=True)
+            return False
+        return True
+
+    async def _run(self, paths: list[Path]) -> None:
+        stats = await _process_batches(
+            iter([paths]),
+            self.cache,
+            self.jobs,
+            self.resolver,
+            metrics=self.metrics,
+            journal=self.journal,
+            manifest=self.manifest,
+            pool=self.pool,
+            lane=self.directory,
+            library=self.library,
+        )
+        self.stats.add(stats)
+        if self.metrics is not None and self.metrics_file is not None:
+            self.metrics.write_textfile(self.metrics_file)
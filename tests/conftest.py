@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from reelname import utils
+
+from .data import MOVIE_RENAME_CASES, SKIP_CASES
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """Keep every test's lookup cache out of the real user cache directory."""
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("REELNAME_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def fake_search(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str]]:
+    """Replace the IMDb search with one that echoes the parsed title; returns its calls."""
+    calls: list[tuple[str, str]] = []
+
+    def search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        calls.append((title, year))
+        return title, year
+
+    monkeypatch.setattr(utils, "_search_imdb", search)
+    return calls
+
+
+@pytest.fixture
+def media(tmp_path: Path) -> Path:
+    """A directory of every sample name: MOVIE_RENAME_CASES, then SKIP_CASES."""
+    directory = tmp_path / "media"
+    directory.mkdir()
+    for orig, _ in MOVIE_RENAME_CASES:
+        (directory / orig).write_bytes(b"")
+    for orig in SKIP_CASES:
+        (directory / orig).write_bytes(b"")
+    return directory
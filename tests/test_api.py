@@ -0,0 +1,115 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+import itertools
+from pathlib import Path
+
+import pytest
+
+import reelname
+from reelname import utils
+from reelname.cache import LookupCache
+from reelname.exceptions import LookupFailedError
+
+from .data import MOVIE_RENAME_CASES, SKIP_CASES
+
+
+def test_resolve_many_matches_the_cli(fake_search: list) -> None:
+    names = [orig for orig, _ in MOVIE_RENAME_CASES] + SKIP_CASES
+
+    results = list(reelname.resolve_many(names, jobs=2))
+
+    assert [r.original for r in results] == names
+    renamed = results[: len(MOVIE_RENAME_CASES)]
+    assert [r.new_name for r in renamed] == [new for _, new in MOVIE_RENAME_CASES]
+    assert all(r.source == "lookup" and r.score == 100.0 for r in renamed)
+    skipped = results[len(MOVIE_RENAME_CASES) :]
+    assert all(r.source == "unparsed" and r.new_name is None for r in skipped)
+
+
+def test_resolve_many_sources(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, fake_search: list
+) -> None:
+    monkeypatch.setenv("REELNAME_CACHE_DIR", str(tmp_path))
+    with LookupCache() as cache:
+        cache.set("Heat", "1995", ("Heat", "1995"))
+        cache.set("Hat", "1995", None)
+        results = list(
+            reelname.resolve_many(
+                [
+                    "Heat.1995.720p.mkv",
+                    "Hat.1995.720p.mkv",
+                    "Heat (1995) 1080p.mkv",
+                    "Inception.2010.720p.mkv",
+                ],
+                cache=cache,
+            )
+        )
+
+    assert [(r.source, r.new_name) for r in results] == [
+        ("cache", "Heat (1995) 720p.mkv"),
+        ("filename", "Hat (1995) 720p.mkv"),
+        ("formatted", "Heat (1995) 1080p.mkv"),
+        ("lookup", "Inception (2010) 720p.mkv"),
+    ]
+    assert results[1].score is None
+    assert fake_search == [("Inception", "2010")]
+
+
+def test_resolve_many_reuses_similar_titles(fake_search: list) -> None:
+    with LookupCache() as cache:
+        cache.set("Spider-Man", "2002", ("Spider-Man", "2002"))
+        (result,) = reelname.resolve_many(["Spider.Man.2002.1080p.mkv"], cache=cache)
+
+    assert (result.source, result.new_name) == ("similar", "Spider-Man (2002) 1080p.mkv")
+    assert fake_search == []
+
+
+def test_resolve_many_streams_with_backpressure(fake_search: list) -> None:
+    read = 0
+
+    def names() -> Iterator[str]:
+        nonlocal read
+        for i in itertools.count():
+            read += 1
+            yield f"Movie {i}.{1900 + i}.mkv"
+
+    results = reelname.resolve_many(names(), jobs=2)
+    first = list(itertools.islice(results, 10))
+    results.close()
+
+    assert [r.original for r in first] == [f"Movie {i}.{1900 + i}.mkv" for i in range(10)]
+    assert read <= 10 + 2 * 2
+
+
+def test_resolve_many_shares_duplicate_lookups(fake_search: list) -> None:
+    names = [f"Show.2020.S01E{i:02}.mkv" for i in range(1, 9)]
+
+    results = list(reelname.resolve_many(names))
+
+    assert [r.new_name for r in results] == [f"Show (2020) S01E{i:02}.mkv" for i in range(1, 9)]
+    assert fake_search == [("Show", "2020")]
+
+
+def test_aresolve_many_takes_async_iterables(fake_search: list) -> None:
+    async def names() -> AsyncIterator[str]:
+        for orig, _ in MOVIE_RENAME_CASES:
+            await asyncio.sleep(0)
+            yield orig
+
+    async def collect() -> list[reelname.Resolution]:
+        return [result async for result in reelname.aresolve_many(names(), jobs=3)]
+
+    results = asyncio.run(collect())
+
+    assert [(r.original, r.new_name) for r in results] == MOVIE_RENAME_CASES
+
+
+def test_resolve_many_reports_failed_lookups(monkeypatch: pytest.MonkeyPatch) -> None:
+    def search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        raise LookupFailedError
+
+    monkeypatch.setattr(utils, "_search_imdb", search)
+
+    (result,) = reelname.resolve_many(["Heat.1995.720p.mkv"])
+
+    assert result == reelname.Resolution("Heat.1995.720p.mkv", "Heat", "1995", None, None, "failed")
@@ -0,0 +1,98 @@
+from pathlib import Path
+import time
+
+import pytest
+
+from reelname import utils
+from reelname.cache import LookupCache, normalize_key
+
+
+def test_normalize_key() -> None:
+    assert normalize_key("The.Dark_Knight", "2008") == normalize_key("the dark  knight ", "2008")
+
+
+def test_cache_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "lookups.sqlite3"
+    with LookupCache(path) as cache:
+        assert cache.get("Inception", "2010") is None
+        cache.set("Inception", "2010", ("Inception", "2010"))
+        cache.set("Nothing Here", "1999", None)
+
+    # a fresh instance reads what the previous run stored
+    with LookupCache(path) as cache:
+        hit = cache.get("inception", "2010")
+        assert hit is not None
+        assert hit.match == ("Inception", "2010")
+        miss = cache.get("Nothing Here", "1999")
+        assert miss is not None
+        assert miss.match is None
+        assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_cache_ttl_and_prune(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    with LookupCache(tmp_path / "lookups.sqlite3", hit_ttl=100, miss_ttl=10) as cache:
+        cache.set("Inception", "2010", ("Inception", "2010"))
+        cache.set("Nothing Here", "1999", None)
+
+        later = time.time() + 50
+        monkeypatch.setattr(time, "time", lambda: later)
+        assert cache.get("Inception", "2010") is not None
+        assert cache.get("Nothing Here", "1999") is None
+        assert cache.prune() == 1
+
+
+def test_refresh_skips_reads(tmp_path: Path) -> None:
+    with LookupCache(tmp_path / "lookups.sqlite3", refresh=True) as cache:
+        cache.set("Inception", "2010", ("Inception", "2010"))
+        assert cache.get("Inception", "2010") is None
+
+
+def test_lookup_imdb_uses_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[str, str]] = []
+
+    def fake_search(title: str, year: str, resolver: object = None) -> None:
+        calls.append((title, year))
+
+    monkeypatch.setattr(utils, "_search_imdb", fake_search)
+    with LookupCache(tmp_path / "lookups.sqlite3") as cache:
+        assert utils.lookup_imdb("Nothing Here", "1999", cache) is None
+        assert utils.lookup_imdb("Nothing.Here", "1999", cache) is None
+    assert calls == [("Nothing Here", "1999")]
+
+
+def test_similar_reuses_resolved_titles(tmp_path: Path) -> None:
+    path = tmp_path / "lookups.sqlite3"
+    with LookupCache(path) as cache:
+        cache.set("Spiderman", "2002", ("Spider-Man", "2002"))
+        cache.set("Nothing Here", "2002", None)
+
+    # loaded from disk, and kept up to date with new matches
+    with LookupCache(path) as cache:
+        assert cache.similar("Spider Man", "2002", utils.get_match_scores) == ("Spider-Man", "2002")
+        assert cache.similar("Heat REPACK", "1995", utils.get_match_scores) is None
+        cache.set("Heat", "1995", ("Heat", "1995"))
+        assert cache.similar("Heat REPACK", "1995", utils.get_match_scores) is None
+        assert cache.similar("Heat.", "1995", utils.get_match_scores) == ("Heat", "1995")
+        assert cache.similar("Spider Man", "2004", utils.get_match_scores) is None
+        assert (cache.similar_hits, cache.similar_misses) == (2, 3)
+
+
+def test_lookup_imdb_reuses_similar_titles(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[str, str]] = []
+
+    def fake_search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        calls.append((title, year))
+        return "Mission: Impossible", year
+
+    monkeypatch.setattr(utils, "_search_imdb", fake_search)
+    with LookupCache(tmp_path / "lookups.sqlite3") as cache:
+        assert utils.lookup_imdb("Mission Impossible", "1996", cache) == (
+            "Mission: Impossible",
+            "1996",
+        )
+        assert utils.lookup_imdb("Mission-Impossible", "1996", cache) == (
+            "Mission: Impossible",
+            "1996",
+        )
+        assert cache.get("Mission-Impossible", "1996") is not None  # stored as a lookup of its own
+    assert calls == [("Mission Impossible", "1996")]
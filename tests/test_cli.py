@@ -62,3 +62,18 @@ def test_real_run_once_skips(tmp_path: Path, orig: str) -> None:
 
     assert src.exists(), f"File was unexpectedly renamed: {orig}"
     assert "Skipping" in result.output
+
+
+def test_run_once_several_directories(tmp_path: Path, fake_search: list) -> None:
+    first, second = tmp_path / "a", tmp_path / "b"
+    first.mkdir()
+    second.mkdir()
+    (first / "Heat.1995.720p.mkv").write_bytes(b"")
+    (second / "Anora.2024.1080p.mkv").write_bytes(b"")
+
+    result = CliRunner().invoke(main, ["--no-cache", str(first), str(second), str(first)])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count("✅ Run-once processing complete.") == 2
+    assert (first / "Heat (1995) 720p.mkv").exists()
+    assert (second / "Anora (2024) 1080p.mkv").exists()
@@ -0,0 +1,142 @@
+from collections.abc import Iterator
+import os
+from pathlib import Path
+import threading
+from typing import Any
+
+from click.testing import CliRunner
+import pytest
+
+from reelname.api import Resolution
+from reelname.cli import main
+from reelname.client import DaemonClient
+from reelname.daemon import Daemon, _rename
+from reelname.exceptions import DaemonRequestError, DaemonRunningError, NotASocketError
+
+from .data import MOVIE_RENAME_CASES, SKIP_CASES
+from .test_utils import FakeResolver
+
+
+@pytest.fixture
+def daemon(tmp_path: Path, fake_search: list) -> Iterator[Daemon]:
+    server = Daemon(tmp_path / "reelname.sock", FakeResolver([], years={}), jobs=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+    yield server
+    server.stop()
+    thread.join(5)
+    assert not server.path.exists()
+
+
+def test_resolve_request(daemon: Daemon) -> None:
+    names = [orig for orig, _ in MOVIE_RENAME_CASES]
+
+    with DaemonClient(daemon.path) as client:
+        results = client.resolve(names)
+        assert client.ping()["requests"] == 2
+
+    assert [(r["original"], r["new_name"]) for r in results] == MOVIE_RENAME_CASES
+
+
+def test_run_via_socket(daemon: Daemon, media: Path) -> None:
+    args = ["--via-socket", "--socket", str(daemon.path), str(media)]
+
+    result = CliRunner().invoke(main, args)
+
+    assert result.exit_code == 0, result.output
+    assert f"🔌 Daemon: {len(MOVIE_RENAME_CASES) + len(SKIP_CASES)} files" in result.output
+    expected = sorted([new for _, new in MOVIE_RENAME_CASES] + SKIP_CASES)
+    assert sorted(p.name for p in media.iterdir()) == expected
+
+    # the client keeps the manifest, so nothing is sent the second time
+    result = CliRunner().invoke(main, args)
+    assert "🔌 Daemon: 0 files" in result.output
+
+
+def test_rename_never_overwrites(daemon: Daemon, tmp_path: Path) -> None:
+    (tmp_path / "Heat.1995.720p.mkv").write_bytes(b"new")
+    (tmp_path / "Heat (1995) 720p.mkv").write_bytes(b"old")
+
+    with DaemonClient(daemon.path) as client:
+        (result,) = client.rename([str(tmp_path / "Heat.1995.720p.mkv")])
+
+    assert (result["decision"], result["reason"]) == ("error", "target name is taken")
+    assert (tmp_path / "Heat (1995) 720p.mkv").read_bytes() == b"old"
+
+
+def test_renames_racing_to_one_name(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    sources = [tmp_path / "Heat.1995.720p.mkv", tmp_path / "Heat 1995 720p.mkv"]
+    for src in sources:
+        src.write_bytes(src.name.encode())
+    target = str(tmp_path / "Heat (1995) 720p.mkv")
+    barrier = threading.Barrier(2, timeout=5)
+    stat = os.stat
+
+    def stat_then_wait(path: Any, **kwargs: Any) -> os.stat_result:
+        try:
+            return stat(path, **kwargs)
+        except FileNotFoundError:
+            if path == target:
+                barrier.wait()  # both renames have now seen the name free
+            raise
+
+    monkeypatch.setattr(os, "stat", stat_then_wait)
+    resolution = Resolution("", "Heat", "1995", "Heat (1995) 720p.mkv", 100.0, "lookup")
+    results: list[dict[str, Any]] = []
+
+    def rename(src: Path) -> None:
+        results.append(_rename(str(src), resolution._replace(original=src.name)))
+
+    threads = [threading.Thread(target=rename, args=(src,)) for src in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(r["decision"] for r in results) == ["error", "renamed"]
+    (loser,) = (r for r in results if r["decision"] == "error")
+    assert loser["reason"] == "target name is taken"
+    assert Path(loser["path"]).exists()
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_not_a_socket_is_left_alone(tmp_path: Path) -> None:
+    notes = tmp_path / "notes.txt"
+    notes.write_text("keep me", encoding="utf-8")
+
+    with pytest.raises(NotASocketError):
+        Daemon(notes, FakeResolver([], years={})).serve_forever()
+
+    assert notes.read_text(encoding="utf-8") == "keep me"
+
+
+def test_bad_request_keeps_the_connection(daemon: Daemon) -> None:
+    with DaemonClient(daemon.path) as client:
+        with pytest.raises(DaemonRequestError, match="unknown op 'bogus'"):
+            list(client.request("bogus"))
+        assert client.ping()["requests"] == 2
+
+
+def test_one_daemon_per_socket(daemon: Daemon) -> None:
+    with pytest.raises(DaemonRunningError):
+        Daemon(daemon.path, FakeResolver([], years={})).serve_forever()
+
+
+@pytest.mark.parametrize("option", [["--stats", "-"], ["--trace-lookups"], ["-w"]])
+def test_via_socket_excludes_local_only_options(tmp_path: Path, option: list[str]) -> None:
+    result = CliRunner().invoke(main, ["--via-socket", *option, str(tmp_path)])
+
+    assert result.exit_code == 2
+    assert "--via-socket excludes" in result.output
+
+
+def test_falls_back_without_daemon(tmp_path: Path, media: Path, fake_search: list) -> None:
+    result = CliRunner().invoke(
+        main, ["--via-socket", "--socket", str(tmp_path / "none.sock"), "--no-cache", str(media)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "No daemon listening" in result.output
+    assert "✅ Run-once processing complete." in result.output
+    assert (media / MOVIE_RENAME_CASES[0][1]).exists()
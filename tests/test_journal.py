@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from reelname import utils
+from reelname.cli import main
+from reelname.journal import Journal, read_journal, undo
+
+from .data import MOVIE_RENAME_CASES
+
+
+def test_journal_records_renames_and_undo_reverses_them(
+    tmp_path: Path, media: Path, fake_search: list
+) -> None:
+    original = sorted(p.name for p in media.iterdir())
+    journal_path = tmp_path / "renames.jsonl"
+
+    with Journal(journal_path) as journal:
+        asyncio.run(utils._process_files(media, jobs=4, journal=journal))
+
+    renamed = [r for r in read_journal(journal_path) if r["op"] == "renamed"]
+    assert sorted(Path(r["new"]).name for r in renamed) == sorted(n for _, n in MOVIE_RENAME_CASES)
+    assert all(os.path.isabs(r["path"]) for r in renamed)
+
+    results = list(undo(journal_path))
+    assert len(results) == len(MOVIE_RENAME_CASES)
+    assert all(r.error is None for r in results)
+    assert sorted(p.name for p in media.iterdir()) == original
+
+    # undone renames are recorded, so a second undo has nothing left to do
+    assert list(undo(journal_path)) == []
+
+
+def test_resume_reuses_resolved_lookups(tmp_path: Path, media: Path, fake_search: list) -> None:
+    journal_path = tmp_path / "renames.jsonl"
+    done = media / "Parasite.2019.1080p.WEB-DL.DD5.1.H.264-ABCD.mkv"
+    with Journal(journal_path) as journal:
+        journal.planned(str(done), "Parasite", "2019")
+        journal.resolved_as(str(done), ("Parasite", "2019"), None)
+
+    with Journal(journal_path, resume=True) as journal:
+        stats = asyncio.run(utils._process_files(media, jobs=4, journal=journal))
+
+    assert ("Parasite", "2019") not in fake_search
+    assert stats.resumed == 1
+    assert (media / "Parasite (2019) 1080p.WEB-DL.DD5.1.H.264-ABCD.mkv").exists()
+
+
+def test_undo_recovers_a_rename_whose_record_was_lost(tmp_path: Path) -> None:
+    old, new = tmp_path / "Heat.1995.mkv", tmp_path / "Heat (1995).mkv"
+    new.write_bytes(b"")
+    with Journal(tmp_path / "renames.jsonl") as journal:
+        journal.resolved_as(str(old), ("Heat", "1995"), str(new))
+    # the run was killed mid-record
+    with (tmp_path / "renames.jsonl").open("a", encoding="utf-8") as fh:
+        fh.write('{"op": "renamed", "pa')
+
+    assert [r.error for r in undo(tmp_path / "renames.jsonl")] == [None]
+    assert old.exists()
+    assert not new.exists()
+    # the torn line was closed off, and the undo recorded after it
+    assert [r["op"] for r in read_journal(tmp_path / "renames.jsonl")] == ["resolved", "undone"]
+
+
+def test_undo_leaves_taken_names_alone(tmp_path: Path) -> None:
+    old, new = tmp_path / "Heat.1995.mkv", tmp_path / "Heat (1995).mkv"
+    old.write_bytes(b"someone else")
+    new.write_bytes(b"")
+    (tmp_path / "renames.jsonl").write_text(
+        json.dumps({"op": "renamed", "path": str(old), "new": str(new)}) + "\n", encoding="utf-8"
+    )
+
+    assert [r.error for r in undo(tmp_path / "renames.jsonl")] == ["original name is taken"]
+    assert new.exists()
+
+
+def test_cli_journal_resume_and_undo(tmp_path: Path, media: Path, fake_search: list) -> None:
+    original = sorted(p.name for p in media.iterdir())
+    journal_path = tmp_path / "renames.jsonl"
+    runner = CliRunner()
+
+    result = runner.invoke(main, ["--resume", str(media)])
+    assert result.exit_code != 0
+    assert "--resume needs --journal" in result.output
+
+    result = runner.invoke(main, ["--no-cache", "--journal", str(journal_path), str(media)])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(main, ["undo", str(journal_path)])
+    assert result.exit_code == 0, result.output
+    assert f"{len(MOVIE_RENAME_CASES)} restored, 0 skipped" in result.output
+    assert sorted(p.name for p in media.iterdir()) == original
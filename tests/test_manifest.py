@@ -0,0 +1,81 @@
+import asyncio
+from pathlib import Path
+
+from click.testing import CliRunner
+import pytest
+
+from reelname import utils
+from reelname.cli import main
+from reelname.manifest import Manifest
+
+from .data import MOVIE_RENAME_CASES, SKIP_CASES
+
+
+def process(directory: Path, db: Path) -> utils.RunStats:
+    with Manifest(directory, db) as manifest:
+        stats = asyncio.run(utils._process_files(directory, manifest=manifest))
+        manifest.prune()
+    return stats
+
+
+def test_unchanged_files_are_skipped_on_later_runs(
+    tmp_path: Path, media: Path, capsys: pytest.CaptureFixture[str], fake_search: list
+) -> None:
+    db = tmp_path / "manifest.sqlite3"
+
+    first = process(media, db)
+    assert first.unchanged == 0
+    capsys.readouterr()
+    fake_search.clear()
+
+    second = process(media, db)
+    total = len(MOVIE_RENAME_CASES) + len(SKIP_CASES)
+    assert second.unchanged == total
+    assert fake_search == []
+    assert capsys.readouterr().out == ""
+
+    # a modified file, and a new one, are picked up again
+    (media / "Parasite (2019) 1080p.WEB-DL.DD5.1.H.264-ABCD.mkv").write_bytes(b"more data")
+    (media / "Heat.1995.mkv").write_bytes(b"")
+    third = process(media, db)
+    assert third.unchanged == total - 1
+    assert fake_search == [("Heat", "1995")]
+    out = capsys.readouterr().out
+    assert "⏩ Skipping already formatted: Parasite (2019) 1080p.WEB-DL.DD5.1.H.264-ABCD.mkv" in out
+    assert "✅ Renamed: Heat.1995.mkv → Heat (1995)" in out
+
+
+def test_refresh_cache_rechecks_handled_files(tmp_path: Path, fake_search: list) -> None:
+    (tmp_path / "Heat.1995.720p.mkv").write_bytes(b"")
+    (tmp_path / "Anora (2024) 1080p.mkv").write_bytes(b"")
+    CliRunner().invoke(main, [str(tmp_path)])
+
+    result = CliRunner().invoke(main, ["--refresh-cache", str(tmp_path)])
+
+    assert result.exit_code == 0, result.output
+    assert "📒 Manifest: 0 unchanged files skipped" in result.output
+    assert "⏩ Skipping already formatted: Heat (1995) 720p.mkv" in result.output
+    # the decisions are still recorded
+    result = CliRunner().invoke(main, [str(tmp_path)])
+    assert "📒 Manifest: 2 unchanged files skipped" in result.output
+
+
+def test_prune_forgets_deleted_files_only(tmp_path: Path) -> None:
+    media = tmp_path / "media"
+    (media / "sub").mkdir(parents=True)
+    kept, deleted = media / "sub" / "Heat (1995).mkv", media / "Alien (1979).mkv"
+    kept.write_bytes(b"")
+    deleted.write_bytes(b"")
+    db = tmp_path / "manifest.sqlite3"
+    with Manifest(media, db) as manifest:
+        for file in (kept, deleted):
+            [(_, key)] = manifest.changed([file])
+            assert key is not None
+            manifest.record(file, key, "formatted")
+
+    deleted.unlink()
+    # this run doesn't see sub/, but its files still exist and are kept
+    with Manifest(media, db) as manifest:
+        assert manifest.prune() == 1
+    with Manifest(media, db) as manifest:
+        assert manifest.changed([kept]) == []
@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from reelname.cli import main
+from reelname.metrics import NO_METRICS, Metrics
+
+from .data import MOVIE_RENAME_CASES
+
+
+def test_metrics_counts_and_times_stages_across_threads() -> None:
+    metrics = Metrics()
+
+    def work(_: int) -> None:
+        with metrics.stage("lookup"):
+            pass
+
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(work, range(50)))
+    with metrics.stage("parse"):
+        pass
+
+    stats = metrics.as_dict()
+    assert list(stats) == ["lookup", "parse"]
+    assert stats["lookup"]["count"] == 50
+    assert stats["lookup"]["seconds"] >= 0
+
+
+def test_disabled_metrics_record_nothing() -> None:
+    with NO_METRICS.stage("lookup"):
+        pass
+    NO_METRICS.count("files", decision="renamed")
+    NO_METRICS.gauge("queue_depth", 3)
+    assert NO_METRICS.as_dict() == {}
+    assert NO_METRICS.summary()["counters"] == {}
+
+
+def test_histograms_counters_and_prometheus_export(tmp_path: Path) -> None:
+    metrics = Metrics()
+    metrics.observe("search", 0.003)
+    metrics.observe("search", 30.0)
+    metrics.count("files", decision="renamed")
+    metrics.count("files", 2, decision="correct")
+    metrics.gauge("queue_depth", 5)
+    metrics.gauge("queue_depth", 1)
+
+    search = metrics.as_dict()["search"]
+    assert search["count"] == 2
+    assert search["buckets"]["0.005"] == 1
+    assert search["buckets"]["+Inf"] == 1
+    summary = metrics.summary()
+    assert summary["counters"]["files"] == {"renamed": 1, "correct": 2}
+    assert summary["gauges"]["queue_depth"] == {"current": 1, "max": 5}
+
+    path = tmp_path / "reelname.prom"
+    metrics.write_textfile(path)
+    text = path.read_text(encoding="utf-8")
+    assert "# TYPE reelname_stage_seconds histogram" in text
+    assert 'reelname_stage_seconds_bucket{stage="search",le="0.001"} 0' in text
+    assert 'reelname_stage_seconds_bucket{stage="search",le="0.005"} 1' in text
+    assert 'reelname_stage_seconds_bucket{stage="search",le="+Inf"} 2' in text
+    assert 'reelname_stage_seconds_count{stage="search"} 2' in text
+    assert 'reelname_files_total{decision="correct"} 2' in text
+    assert "reelname_queue_depth 1" in text
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_cli_stats_and_metrics_file(tmp_path: Path, media: Path, fake_search: list) -> None:
+    stats, prom = tmp_path / "stats.json", tmp_path / "reelname.prom"
+
+    result = CliRunner().invoke(
+        main, ["--stats", str(stats), "--metrics-file", str(prom), str(media)]
+    )
+
+    assert result.exit_code == 0, result.output
+    summary = json.loads(stats.read_text(encoding="utf-8"))
+    assert summary["counters"]["files"]["renamed"] == len(MOVIE_RENAME_CASES)
+    assert summary["counters"]["cache_lookups"]["miss"] == summary["counters"]["lookups"]
+    assert {"scan", "parse", "lookup", "search", "rename"} <= set(summary["stages"])
+    assert "reelname_lookups_total" in prom.read_text(encoding="utf-8")
@@ -0,0 +1,217 @@
+import asyncio
+import errno
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Callable
+
+from click.testing import CliRunner
+import pytest
+
+from reelname import move
+from reelname.cli import main
+from reelname.exceptions import InvalidLayoutError
+from reelname.move import Library, Mover, check_layout, move_file
+
+
+@pytest.fixture
+def cross_device(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Make links and renames between two different directories fail as across devices."""
+
+    def fake(real: Callable[..., None]) -> Callable[..., None]:
+        def same_device_only(src: Any, dst: Any, **kwargs: Any) -> None:
+            if Path(src).parent.parent != Path(dst).parent.parent:
+                raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+            real(src, dst, **kwargs)
+
+        return same_device_only
+
+    monkeypatch.setattr(move.os, "link", fake(os.link))
+    monkeypatch.setattr(move.os, "rename", fake(os.rename))
+
+
+def test_check_layout() -> None:
+    assert check_layout("{year}/{title}/{filename}") == "{year}/{title}/{filename}"
+    for layout in ("{title}/{name}", "{0}", "/abs/{filename}", "../{filename}", "{title"):
+        with pytest.raises(InvalidLayoutError):
+            check_layout(layout)
+
+
+def test_move_on_the_same_device(tmp_path: Path) -> None:
+    src = tmp_path / "in" / "Heat.1995.mkv"
+    src.parent.mkdir()
+    src.write_bytes(b"heat")
+    dst = Library(tmp_path / "lib").destination("Heat", "1995", "Heat (1995).mkv")
+
+    assert move_file(src, dst) == "moved"
+
+    assert dst == tmp_path / "lib" / "Heat (1995)" / "Heat (1995).mkv"
+    assert dst.read_bytes() == b"heat"
+    assert not src.exists()
+
+
+def test_copy_across_devices_with_progress(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, cross_device: None
+) -> None:
+    monkeypatch.setattr(move, "MOVE_CHUNK", 1000)
+    src = tmp_path / "in" / "Heat.1995.mkv"
+    src.parent.mkdir()
+    data = os.urandom(4000)
+    src.write_bytes(data)
+    os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+    dst = tmp_path / "lib" / "Heat (1995)" / "Heat (1995).mkv"
+    progress: list[tuple[int, int]] = []
+
+    assert move_file(src, dst, lambda done, total: progress.append((done, total))) == "copied"
+
+    assert dst.read_bytes() == data
+    assert dst.stat().st_mtime_ns == 1_000_000_000
+    assert not src.exists()
+    assert progress == [(1000, 4000), (2000, 4000), (3000, 4000), (4000, 4000)]
+    assert os.listdir(dst.parent) == [dst.name]  # no temporary file left behind
+
+
+def test_copy_falls_back_when_the_kernel_cannot(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def unsupported(*args: Any) -> int:
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    monkeypatch.setattr(move, "_copy_file_range", unsupported)
+    monkeypatch.setattr(move, "_sendfile", unsupported)
+    src = tmp_path / "src"
+    src.write_bytes(b"x" * 3_000_000)
+
+    move.copy_file(src, tmp_path / "dst")
+
+    assert (tmp_path / "dst").read_bytes() == src.read_bytes()
+
+
+def test_never_overwrites(tmp_path: Path, cross_device: None) -> None:
+    src = tmp_path / "in" / "Heat.1995.mkv"
+    src.parent.mkdir()
+    src.write_bytes(b"new")
+    dst = tmp_path / "lib" / "Heat (1995).mkv"
+    dst.parent.mkdir()
+    dst.write_bytes(b"old")
+
+    with pytest.raises(FileExistsError):
+        move_file(src, dst)
+
+    assert src.read_bytes() == b"new"
+    assert dst.read_bytes() == b"old"
+
+
+def _race(sources: list[Path], dst: Path, monkeypatch: pytest.MonkeyPatch) -> dict[Path, str]:
+    """Move every source to `dst` at once; how each went, or "taken"."""
+    barrier = threading.Barrier(len(sources), timeout=5)
+    check_free = move._check_free
+
+    def check_then_wait(path: Path) -> None:
+        check_free(path)
+        barrier.wait()  # every move has now seen `dst` free
+
+    monkeypatch.setattr(move, "_check_free", check_then_wait)
+    outcomes: dict[Path, str] = {}
+
+    def race(src: Path) -> None:
+        try:
+            outcomes[src] = move_file(src, dst)
+        except FileExistsError:
+            outcomes[src] = "taken"
+
+    threads = [threading.Thread(target=race, args=(src,)) for src in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+@pytest.mark.parametrize("devices", ["same", "cross"])
+def test_racing_moves_never_overwrite(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest, devices: str
+) -> None:
+    if devices == "cross":
+        request.getfixturevalue("cross_device")
+    for trial in range(5):
+        sources = [tmp_path / root / str(trial) / "Heat.1995.mkv" for root in ("a", "b")]
+        for src in sources:
+            src.parent.mkdir(parents=True)
+            src.write_bytes(src.parent.parent.name.encode())
+        dst = tmp_path / "lib" / str(trial) / "Heat (1995).mkv"
+        outcomes = _race(sources, dst, monkeypatch)
+
+        (winner,) = (src for src, outcome in outcomes.items() if outcome != "taken")
+        (loser,) = (src for src, outcome in outcomes.items() if outcome == "taken")
+        assert dst.read_bytes() == winner.parent.parent.name.encode()
+        assert not winner.exists()
+        assert loser.exists()
+        assert os.listdir(dst.parent) == [dst.name]
+
+
+def test_moves_run_concurrently(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_move(src: Path, dst: Path, progress: Any = None) -> str:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return "copied"
+
+    monkeypatch.setattr(move, "move_file", slow_move)
+    results: list[str | None] = []
+
+    async def scenario() -> None:
+        with Mover(jobs=3) as mover:
+            for i in range(7):
+                await mover.submit(tmp_path / f"{i}.mkv", tmp_path / "lib", results.append)
+            await mover.join()
+
+    start = time.monotonic()
+    asyncio.run(scenario())
+
+    assert results == ["copied"] * 7
+    assert peak == 3
+    assert time.monotonic() - start < 7 * 0.05
+
+
+def test_run_into_library(tmp_path: Path, fake_search: list, cross_device: None) -> None:
+    landing = tmp_path / "landing"
+    landing.mkdir()
+    (landing / "Heat.1995.720p.mkv").write_bytes(b"heat")
+    (landing / "Inception (2010) 1080p.mkv").write_bytes(b"inception")  # already formatted
+    (landing / "notes.txt").write_bytes(b"")
+    journal = tmp_path / "renames.jsonl"
+    args = ["--no-cache", "--output-dir", str(tmp_path / "library"), "--journal", str(journal)]
+
+    result = CliRunner().invoke(main, [*args, str(landing)])
+
+    assert result.exit_code == 0, result.output
+    assert "📦 Library: 2 files moved" in result.output
+    assert "(2 copied from another device)" in result.output
+    assert sorted(p.name for p in landing.iterdir()) == ["notes.txt"]
+    assert (tmp_path / "library" / "Heat (1995)" / "Heat (1995) 720p.mkv").read_bytes() == b"heat"
+    assert (tmp_path / "library" / "Inception (2010)" / "Inception (2010) 1080p.mkv").exists()
+
+    result = CliRunner().invoke(main, ["undo", str(journal)])
+
+    assert result.exit_code == 0, result.output
+    assert (landing / "Heat.1995.720p.mkv").read_bytes() == b"heat"
+    assert (landing / "Inception (2010) 1080p.mkv").exists()
+
+
+def test_bad_layout_is_a_usage_error(tmp_path: Path) -> None:
+    result = CliRunner().invoke(
+        main, ["--output-dir", str(tmp_path), "--layout", "{name}", str(tmp_path)]
+    )
+
+    assert result.exit_code == 1
+    assert "Invalid --layout" in result.output
@@ -0,0 +1,121 @@
+from pathlib import Path
+
+from click.testing import CliRunner
+import pytest
+
+from reelname.cli import main
+from reelname.exceptions import InvalidIndexError
+from reelname.offline import OfflineResolver, build_index
+from reelname.utils import _search_imdb
+
+TSV_ROWS = [
+    ("tt1375666", "movie", "Inception", "Inception", "0", "2010"),
+    ("tt0468569", "movie", "The Dark Knight", "The Dark Knight", "0", "2008"),
+    ("tt6751668", "movie", "Parasite", "Gisaengchung", "0", "2019"),
+    ("tt1345836", "movie", "The Dark Knight Rises", "The Dark Knight Rises", "0", "2012"),
+    ("tt10872600", "movie", "Spider-Man: No Way Home", "Spider-Man: No Way Home", "0", "2021"),
+    ("tt10838180", "movie", "The Matrix Resurrections", "The Matrix Resurrections", "0", "2021"),
+    ("tt0000001", "tvEpisode", "Inception", "Inception", "0", "2010"),
+    ("tt0000002", "movie", "No Year", "No Year", "0", r"\N"),
+]
+
+
+@pytest.fixture
+def index_path(tmp_path: Path) -> Path:
+    tsv = tmp_path / "title.basics.tsv"
+    header = "tconst\ttitleType\tprimaryTitle\toriginalTitle\tisAdult\tstartYear\tendYear"
+    lines = [header] + ["\t".join((*row, r"\N")) for row in TSV_ROWS]
+    tsv.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    path = tmp_path / "title.basics.idx"
+    # episodes and undated titles are left out
+    assert build_index(tsv, path) == 6
+    return path
+
+
+def test_offline_search(index_path: Path) -> None:
+    with OfflineResolver(index_path) as resolver:
+        assert resolver.search("the.dark knight", "2008") == [
+            {"title": "The Dark Knight", "year": 2008, "imdbID": "0468569"}
+        ]
+        assert resolver.search("Inception", "1999") == []
+        assert _search_imdb("Dark Knight Rises", "2012", resolver) == (
+            "The Dark Knight Rises",
+            "2012",
+        )
+        assert _search_imdb("Parasite", "2019", resolver) == ("Parasite", "2019")
+        assert _search_imdb("Something Else", "2010", resolver) is None
+
+
+def test_offline_search_ignores_punctuation(index_path: Path) -> None:
+    spider_man = {"title": "Spider-Man: No Way Home", "year": 2021, "imdbID": "10872600"}
+    with OfflineResolver(index_path) as resolver:
+        assert resolver.search("Spider-Man No Way Home", "2021") == [spider_man]
+        assert resolver.search("spider man no way home", "2021") == [spider_man]
+        # no exact hit: only titles sharing a word are scored
+        assert resolver.search("Spiderman: No Way Home", "2021")[0] == spider_man
+        assert resolver.search("Incepton", "2021") == []
+        assert _search_imdb("Spiderman No Way Home", "2021", resolver) == (
+            "Spider-Man: No Way Home",
+            "2021",
+        )
+
+
+def test_invalid_index(tmp_path: Path) -> None:
+    bogus = tmp_path / "bogus.idx"
+    bogus.write_bytes(b"not an index at all")
+    with pytest.raises(InvalidIndexError):
+        OfflineResolver(bogus)
+    with pytest.raises(InvalidIndexError):
+        OfflineResolver(tmp_path / "missing.idx")
+
+
+def test_truncated_index(tmp_path: Path, index_path: Path) -> None:
+    data = index_path.read_bytes()
+    truncated = tmp_path / "truncated.idx"
+    # in the year table, in the offsets and in the titles
+    for size in (20, 60, len(data) - 1):
+        truncated.write_bytes(data[:size])
+        with pytest.raises(InvalidIndexError):
+            OfflineResolver(truncated)
+
+    result = CliRunner().invoke(
+        main, ["--resolver", "offline", "--index", str(truncated), str(tmp_path)]
+    )
+    assert result.exit_code == 1
+    assert "Invalid offline index" in result.output
+
+
+def test_cli_offline_run(tmp_path: Path, index_path: Path) -> None:
+    media = tmp_path / "media"
+    media.mkdir()
+    (media / "Inception.2010.1080p.BluRay.x264-REF.mkv").write_bytes(b"")
+
+    runner = CliRunner()
+    result = runner.invoke(main, ["--resolver", "offline", "--index", str(index_path), str(media)])
+    assert result.exit_code == 0, result.output
+    assert (media / "Inception (2010) 1080p.BluRay.x264-REF.mkv").exists()
+
+
+def test_cli_index_build(tmp_path: Path, index_path: Path) -> None:
+    tsv = index_path.with_name("title.basics.tsv")
+    output = tmp_path / "rebuilt.idx"
+    result = CliRunner().invoke(main, ["index", "build", str(tsv), "-o", str(output)])
+    assert result.exit_code == 0, result.output
+    assert output.read_bytes() == index_path.read_bytes()
+
+
+def test_cli_offline_run_with_workers(tmp_path: Path, index_path: Path) -> None:
+    media = tmp_path / "media"
+    media.mkdir()
+    (media / "Inception.2010.1080p.BluRay.x264-REF.mkv").write_bytes(b"")
+    (media / "The.Dark.Knight.2008.720p.mkv").write_bytes(b"")
+
+    args = ["--resolver", "offline", "--index", str(index_path), "--workers", "2", str(media)]
+    result = CliRunner().invoke(main, args)
+
+    assert result.exit_code == 0, result.output
+    assert "🧵 Workers: 2 processes" in result.output
+    assert sorted(p.name for p in media.iterdir()) == [
+        "Inception (2010) 1080p.BluRay.x264-REF.mkv",
+        "The Dark Knight (2008) 720p.mkv",
+    ]
@@ -0,0 +1,79 @@
+import asyncio
+from pathlib import Path
+import random
+import time
+
+import pytest
+
+from reelname import utils
+
+from .data import MOVIE_RENAME_CASES, SKIP_CASES
+
+
+@pytest.fixture
+def slow_fake_search(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str]]:
+    """Replace the IMDb search with one that echoes the parsed title after a random delay."""
+    calls: list[tuple[str, str]] = []
+
+    def search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        calls.append((title, year))
+        time.sleep(random.uniform(0, 0.01))  # noqa: S311
+        return title, year
+
+    monkeypatch.setattr(utils, "_search_imdb", search)
+    return calls
+
+
+@pytest.mark.parametrize("jobs", [1, 4, 16])
+def test_process_files_is_deterministic(
+    media: Path, capsys: pytest.CaptureFixture[str], slow_fake_search: list, jobs: int
+) -> None:
+    asyncio.run(utils._process_files(media, jobs=jobs))
+
+    expected = sorted([new for _, new in MOVIE_RENAME_CASES] + SKIP_CASES)
+    assert sorted(p.name for p in media.iterdir()) == expected
+
+    # messages come out in filename order, whatever order the lookups finished in
+    renamed = [line for line in capsys.readouterr().out.splitlines() if line.startswith("✅")]
+    assert renamed == [f"✅ Renamed: {orig} → {new}" for orig, new in sorted(MOVIE_RENAME_CASES)]
+    # one lookup per distinct (title, year)
+    assert len(slow_fake_search) == len(set(slow_fake_search)) == 11
+
+
+def test_duplicate_lookups_are_coalesced(tmp_path: Path, slow_fake_search: list) -> None:
+    for episode in range(1, 11):
+        (tmp_path / f"The.Studio.2025.S01E{episode:02d}.1080p.WEB-DL.mkv").write_bytes(b"")
+    (tmp_path / "Inception.2010.1080p.BluRay.x264-REF.mkv").write_bytes(b"")
+
+    stats = asyncio.run(utils._process_files(tmp_path, jobs=4))
+
+    assert sorted(slow_fake_search) == [("Inception", "2010"), ("The Studio", "2025")]
+    assert (stats.lookups, stats.coalesced) == (2, 9)
+    assert (tmp_path / "The Studio (2025) S01E10.1080p.WEB-DL.mkv").exists()
+
+
+def test_rename_problems_skip_only_that_file(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "Heat.1995.720p.mkv").write_bytes(b"new")
+    (tmp_path / "Heat (1995) 720p.mkv").write_bytes(b"old")  # the target name is taken
+    (tmp_path / "Inception.2010.720p.mkv").write_bytes(b"")
+    (tmp_path / "Anora.2024.1080p.mkv").write_bytes(b"")
+
+    def search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        (tmp_path / "Inception.2010.720p.mkv").unlink(missing_ok=True)  # gone since the scan
+        return title, year
+
+    monkeypatch.setattr(utils, "_search_imdb", search)
+
+    asyncio.run(utils._process_files(tmp_path, jobs=1))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "Anora (2024) 1080p.mkv",
+        "Heat (1995) 720p.mkv",
+        "Heat.1995.720p.mkv",
+    ]
+    assert (tmp_path / "Heat (1995) 720p.mkv").read_bytes() == b"old"
+    out = capsys.readouterr().out
+    assert "⏩ Not renamed (target name is taken): Heat.1995.720p.mkv" in out
+    assert "⏩ Not renamed (No such file or directory): Inception.2010.720p.mkv" in out
@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+import shutil
+
+from click.testing import CliRunner
+import pytest
+
+from reelname import utils
+from reelname.cli import main
+
+from .data import MOVIE_RENAME_CASES, SKIP_CASES
+
+
+def make_plan(media: Path, output: Path) -> None:
+    result = CliRunner().invoke(main, ["plan", "--no-cache", str(media), "-o", str(output)])
+    assert result.exit_code == 0, result.output
+
+
+def test_plan_does_not_touch_files_and_apply_renames(
+    tmp_path: Path, media: Path, fake_search: list
+) -> None:
+    before = sorted(p.name for p in media.iterdir())
+    plan_path = tmp_path / "plan.json"
+
+    make_plan(media, plan_path)
+
+    assert sorted(p.name for p in media.iterdir()) == before
+    plan = json.loads(plan_path.read_text(encoding="utf-8"))
+    assert sorted((r["old"], r["new"]) for r in plan["renames"]) == sorted(MOVIE_RENAME_CASES)
+
+    result = CliRunner().invoke(main, ["apply", str(plan_path)])
+    assert result.exit_code == 0, result.output
+    assert f"{len(MOVIE_RENAME_CASES)} renamed, 0 skipped" in result.output
+    expected = sorted([new for _, new in MOVIE_RENAME_CASES] + SKIP_CASES)
+    assert sorted(p.name for p in media.iterdir()) == expected
+
+
+def test_plan_skips_files_gone_since_the_scan(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "Heat.1995.720p.mkv").write_bytes(b"")
+    (tmp_path / "Anora.2024.1080p.mkv").write_bytes(b"")
+
+    def search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        (tmp_path / "Heat.1995.720p.mkv").unlink(missing_ok=True)  # deleted mid-run
+        return title, year
+
+    monkeypatch.setattr(utils, "_search_imdb", search)
+    plan_path = tmp_path / "plan.json"
+
+    make_plan(tmp_path, plan_path)
+
+    plan = json.loads(plan_path.read_text(encoding="utf-8"))
+    assert [r["old"] for r in plan["renames"]] == ["Anora.2024.1080p.mkv"]
+
+
+def test_apply_skips_stale_and_conflicting_entries(
+    tmp_path: Path, media: Path, fake_search: list
+) -> None:
+    plan_path = tmp_path / "plan.json"
+    make_plan(media, plan_path)
+    (stale, _), (conflicting, taken) = MOVIE_RENAME_CASES[:2]
+    (media / stale).write_bytes(b"changed after planning")
+    (media / taken).write_bytes(b"someone else")
+
+    result = CliRunner().invoke(main, ["apply", str(plan_path)])
+
+    assert result.exit_code == 0, result.output
+    assert f"⏩ Not renamed (file changed since planned): {stale}" in result.output
+    assert f"⏩ Not renamed (target name is taken): {conflicting}" in result.output
+    assert f"{len(MOVIE_RENAME_CASES) - 2} renamed, 2 skipped" in result.output
+    assert (media / taken).read_bytes() == b"someone else"
+    assert (media / conflicting).exists()
+
+
+def test_apply_to_another_root_with_journal(tmp_path: Path, media: Path, fake_search: list) -> None:
+    plan_path = tmp_path / "plan.json"
+    make_plan(media, plan_path)
+    elsewhere = tmp_path / "mounted" / "media"
+    shutil.copytree(media, elsewhere)
+    journal = tmp_path / "renames.jsonl"
+
+    result = CliRunner().invoke(
+        main, ["apply", "--root", str(elsewhere), "--journal", str(journal), str(plan_path)]
+    )
+    assert result.exit_code == 0, result.output
+    assert f"{len(MOVIE_RENAME_CASES)} renamed, 0 skipped" in result.output
+
+    result = CliRunner().invoke(main, ["undo", str(journal)])
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in elsewhere.iterdir()) == sorted(p.name for p in media.iterdir())
+
+
+def test_apply_rejects_invalid_plan(tmp_path: Path) -> None:
+    plan_path = tmp_path / "plan.json"
+    plan_path.write_text('{"version": 99}', encoding="utf-8")
+
+    result = CliRunner().invoke(main, ["apply", str(plan_path)])
+
+    assert result.exit_code == 1
+    assert "Invalid rename plan" in result.output
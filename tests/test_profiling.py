@@ -0,0 +1,62 @@
+import logging
+from pathlib import Path
+import threading
+import time
+
+from click.testing import CliRunner
+import pytest
+
+from reelname import utils
+from reelname.cli import main
+from reelname.profiling import SamplingProfiler
+
+from .test_utils import FakeResolver
+
+
+def spin(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profiler_samples_other_threads(tmp_path: Path) -> None:
+    with SamplingProfiler(interval=0.001) as profiler:
+        worker = threading.Thread(target=spin, args=(0.2,), name="worker_3")
+        worker.start()
+        worker.join()
+
+    busy, hotspots = profiler.hotspots(5)
+    assert busy > 0
+    assert "test_profiling.py:spin" in [label for label, _, _ in hotspots]
+
+    path = tmp_path / "run.folded"
+    profiler.write_collapsed(path)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    # thread names lose their pool index, so workers share stacks
+    assert any(line.startswith("worker;") and "test_profiling.py:spin " in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_trace_lookups_logs_candidate_scores(caplog: pytest.LogCaptureFixture) -> None:
+    resolver = FakeResolver(
+        [{"title": "Heat", "year": 1995}, {"title": "Heat Wave", "year": 1995}], years={}
+    )
+
+    with caplog.at_level(logging.DEBUG, logger="reelname.utils"):
+        assert utils._search_imdb("Heat", "1995", resolver) == ("Heat", "1995")
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages[0].startswith("search 'Heat' (1995): 2 results in ")
+    assert any("100.0  'Heat' (1995)" in message for message in messages)
+    assert any("'Heat Wave' (1995)" in message for message in messages)
+    assert messages[-1] == "  → 'Heat' (100.0)"
+
+
+def test_cli_profile(tmp_path: Path, media: Path, fake_search: list) -> None:
+    profile = tmp_path / "run.folded"
+
+    result = CliRunner().invoke(main, ["--no-cache", "--profile", str(profile), str(media)])
+
+    assert result.exit_code == 0, result.output
+    assert "🔥 " in result.output
+    assert profile.exists()
@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Any
+
+from reelname.resolver import ImdbResolver
+
+
+class FakeCinemagoer:
+    instances = 0
+    lock = threading.Lock()
+
+    def __init__(self) -> None:
+        with FakeCinemagoer.lock:
+            FakeCinemagoer.instances += 1
+        self.in_use = False
+
+    def search_movie(self, query: str) -> list[dict[str, Any]]:
+        assert not self.in_use, "session shared between threads"
+        self.in_use = True
+        time.sleep(0.001)
+        self.in_use = False
+        title, year = query.rsplit(" ", 1)
+        return [{"title": title, "year": int(year)}]
+
+
+def test_resolver_reuses_a_bounded_pool_of_sessions() -> None:
+    FakeCinemagoer.instances = 0
+    resolver = ImdbResolver(size=3, factory=FakeCinemagoer)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: resolver.search("Inception", str(2000 + i)), range(50)))
+
+    assert results[7] == [{"title": "Inception", "year": 2007}]
+    assert 1 <= FakeCinemagoer.instances <= 3
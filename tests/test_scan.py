@@ -0,0 +1,61 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from reelname import utils
+from reelname.scan import ScanOptions, iter_file_batches, normalize_extensions
+
+TREE = [
+    "b.mkv",
+    "a.mkv",
+    "notes.txt",
+    "Movies/I/Inception.2010.1080p.mkv",
+    "Movies/I/Inception.2010.srt",
+    "Movies/A/Anora.2024.mp4",
+    "Movies/A/Sample/Anora.2024.sample.mp4",
+]
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    for relpath in TREE:
+        path = tmp_path / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    return tmp_path
+
+
+def relpaths(root: Path, options: ScanOptions | None = None) -> list[list[str]]:
+    return [
+        [path.relative_to(root).as_posix() for path in batch]
+        for batch in iter_file_batches(root, options)
+    ]
+
+
+def test_non_recursive_by_default(tree: Path) -> None:
+    assert relpaths(tree) == [["a.mkv", "b.mkv", "notes.txt"]]
+
+
+def test_recursive_walk_is_ordered_and_filtered(tree: Path) -> None:
+    options = ScanOptions(
+        recursive=True, exclude=("Sample",), extensions=normalize_extensions(("MKV", ".mp4"))
+    )
+    assert relpaths(tree, options) == [
+        ["a.mkv", "b.mkv"],
+        ["Movies/A/Anora.2024.mp4"],
+        ["Movies/I/Inception.2010.1080p.mkv"],
+    ]
+
+
+def test_include_matches_relative_paths(tree: Path) -> None:
+    options = ScanOptions(recursive=True, include=("Movies/I/*",))
+    assert relpaths(tree, options) == [
+        ["Movies/I/Inception.2010.1080p.mkv", "Movies/I/Inception.2010.srt"]
+    ]
+
+
+def test_recursive_processing_renames_in_place(tree: Path, fake_search: list) -> None:
+    options = ScanOptions(recursive=True, extensions=(".mkv",))
+    asyncio.run(utils._process_files(tree, scan=options))
+    assert (tree / "Movies/I/Inception (2010) 1080p.mkv").exists()
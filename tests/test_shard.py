@@ -0,0 +1,79 @@
+from contextlib import closing
+from pathlib import Path
+import re
+from typing import Any
+
+from click.testing import CliRunner
+import pytest
+
+from reelname.cache import LookupCache
+from reelname.cli import main
+from reelname.manifest import Manifest
+from reelname.shard import run_sharded
+
+from .data import MOVIE_RENAME_CASES, SKIP_CASES
+
+
+class EchoResolver:
+    """Finds every title as it was parsed. A class, so it pickles for the workers."""
+
+    def search(self, title: str, year: str) -> list[dict[str, Any]]:
+        return [{"title": title, "year": int(year)}]
+
+    def update(self, movie: dict[str, Any]) -> None:
+        pass
+
+
+def test_run_sharded(media: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    cache = LookupCache(tmp_path / "cache.sqlite3")
+    outputs = []
+    try:
+        for _ in range(2):
+            with closing(Manifest(media, tmp_path / "manifest.sqlite3")) as manifest:
+                run_sharded(
+                    str(media), 2, EchoResolver, cache, jobs=2, manifest=manifest, shard_size=3
+                )
+            outputs.append(capsys.readouterr().out)
+    finally:
+        cache.close()
+
+    expected = sorted([new for _, new in MOVIE_RENAME_CASES] + SKIP_CASES)
+    assert sorted(p.name for p in media.iterdir()) == expected
+    first, second = outputs
+    assert first.count("✅ Run-once processing complete.") == 1
+    assert "🧵 Workers: 2 processes" in first
+    # one merged report of every shard
+    renamed = re.findall(r"✅ Renamed: (.+) → ", first)
+    assert sorted(renamed) == sorted(orig for orig, _ in MOVIE_RENAME_CASES)
+    lookups = re.search(r"🔁 Lookups: (\d+) run", first)
+    cached = re.search(r"🗄️ Cache: (\d+) hits, (\d+) misses", first)
+    assert lookups and cached
+    assert int(cached[1]) + int(cached[2]) == int(lookups[1])  # every worker's counts
+    # the parent recorded what every worker decided
+    assert f"📒 Manifest: {len(expected)} unchanged files skipped" in second
+    assert "🔁 Lookups: 0 run" in second
+
+
+def test_workers_share_the_cache(
+    media: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    cache = LookupCache(tmp_path / "cache.sqlite3")
+    try:
+        run_sharded(str(media), 2, EchoResolver, cache, jobs=2, shard_size=2)
+        for orig, new in MOVIE_RENAME_CASES:
+            (media / new).rename(media / orig)
+        capsys.readouterr()
+        run_sharded(str(media), 3, EchoResolver, cache, jobs=2, shard_size=2)
+    finally:
+        cache.close()
+
+    out = capsys.readouterr().out
+    assert "🗄️ Cache: 0 hits" not in out
+    assert re.search(r"🗄️ Cache: \d+ hits, 0 misses", out)
+
+
+def test_workers_exclude_watch(tmp_path: Path) -> None:
+    result = CliRunner().invoke(main, ["--workers", "2", "-w", str(tmp_path)])
+
+    assert result.exit_code == 2
+    assert "--workers excludes --watch" in result.output
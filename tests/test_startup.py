@@ -0,0 +1,59 @@
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative import time of reelname.cli, in microseconds. About 75ms locally,
+# most of it click; generous so that slow CI machines don't flake.
+CLI_IMPORT_BUDGET_US = 300_000
+
+# Only needed once a command actually runs
+HEAVY_MODULES = [
+    "aiofiles",
+    "asyncio",
+    "imdb",
+    "importlib.metadata",
+    "rapidfuzz",
+    "sqlite3",
+    "watchdog",
+]
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Run `code` under `python -X importtime`; cumulative µs per imported module."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_is_fast() -> None:
+    times = import_times("import reelname.cli")
+
+    assert not [module for module in HEAVY_MODULES if module in times]
+    assert times["reelname.cli"] < CLI_IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize(
+    "module, dependency",
+    [
+        ("reelname.reelname", "watchdog"),
+        ("reelname.utils", "aiofiles"),
+        ("reelname.utils", "rapidfuzz"),
+        ("reelname.resolver", "imdb"),
+        ("reelname.offline", "rapidfuzz"),
+        # the --via-socket client leaves the lookup machinery to the daemon
+        ("reelname.client", "asyncio"),
+    ],
+)
+def test_dependency_loaded_on_first_use(module: str, dependency: str) -> None:
+    assert dependency not in import_times(f"import {module}")
@@ -0,0 +1,204 @@
+from pathlib import Path
+import threading
+import time
+from typing import Any, Optional
+from urllib.error import HTTPError
+
+from click.testing import CliRunner
+import pytest
+
+from reelname import utils
+from reelname.cli import main
+from reelname.exceptions import LookupFailedError
+from reelname.throttle import (
+    CircuitBreaker,
+    ThrottledResolver,
+    TokenBucket,
+    http_status,
+    retry_after,
+)
+
+
+def rate_limited(retry: str = "0") -> HTTPError:
+    return HTTPError("https://imdb.test", 429, "Too Many Requests", {"Retry-After": retry}, None)
+
+
+class FlakyResolver:
+    """Fails with the scripted errors, in order, then answers every search."""
+
+    def __init__(self, errors: list[Optional[Exception]]) -> None:
+        self.errors = errors
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def search(self, title: str, year: str) -> list[dict[str, Any]]:
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        return [{"title": title, "year": int(year)}]
+
+    def update(self, movie: Any) -> None:
+        pass
+
+
+def throttled(resolver: FlakyResolver, **kwargs: Any) -> ThrottledResolver:
+    return ThrottledResolver(
+        resolver,
+        TokenBucket(rate=1000, burst=10, max_rate=2000),
+        kwargs.pop("breaker", CircuitBreaker(threshold=10, cooldown=0.01)),
+        backoff=0.001,
+        **kwargs,
+    )
+
+
+def test_retries_rate_limits_and_backs_off() -> None:
+    flaky = FlakyResolver([rate_limited(), OSError("connection reset"), rate_limited()])
+    resolver = throttled(flaky)
+
+    assert resolver.search("Heat", "1995") == [{"title": "Heat", "year": 1995}]
+
+    assert flaky.calls == 4
+    assert (resolver.stats.retries, resolver.stats.throttled) == (3, 2)
+    assert resolver.bucket.rate < 1000 * 0.5 * 0.5
+
+
+def test_gives_up_after_the_last_attempt() -> None:
+    flaky = FlakyResolver([OSError("down")] * 3)
+    resolver = throttled(flaky, attempts=3)
+
+    with pytest.raises(LookupFailedError, match="down"):
+        resolver.search("Heat", "1995")
+    assert resolver.stats.failed == 1
+
+
+def test_waits_as_long_as_retry_after_asks() -> None:
+    resolver = throttled(FlakyResolver([rate_limited("0.1")]))
+
+    start = time.monotonic()
+    resolver.search("Heat", "1995")
+
+    assert time.monotonic() - start >= 0.1
+
+
+def test_error_inspection_sees_through_wrapping() -> None:
+    # the shape of Cinemagoer's IMDbDataAccessError
+    wrapped = Exception({"errcode": 503, "original exception": OSError("busy")})
+    assert http_status(wrapped) == 503
+    try:
+        try:
+            raise rate_limited("7")
+        except HTTPError as exc:
+            raise RuntimeError from exc
+    except RuntimeError as exc:
+        assert http_status(exc) == 429
+        assert retry_after(exc) == 7.0
+    assert http_status(OSError("no status")) is None
+
+
+def test_token_bucket_adapts_within_bounds() -> None:
+    bucket = TokenBucket(rate=4, burst=1, min_rate=1, max_rate=5, step=0.5, slow=1.0)
+
+    bucket.failed(throttled=True)
+    assert bucket.rate == 2
+    bucket.failed(throttled=True)
+    bucket.failed(throttled=True)
+    assert bucket.rate == 1
+    bucket.succeeded(0.01)
+    assert bucket.rate == 1.5
+    bucket.succeeded(2.0)  # slow
+    assert bucket.rate == pytest.approx(1.2)
+    for _ in range(20):
+        bucket.succeeded(0.01)
+    assert bucket.rate == 5
+
+
+def test_token_bucket_paces_requests() -> None:
+    bucket = TokenBucket(rate=50, burst=1)
+
+    assert bucket.acquire() == 0
+    start = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+
+    assert time.monotonic() - start >= 0.035
+
+
+def test_breaker_pauses_then_probes() -> None:
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05, max_cooldown=0.08)
+    breaker.failure()
+    assert not breaker.is_open
+    breaker.failure()
+    assert breaker.is_open
+
+    start = time.monotonic()
+    breaker.wait()  # becomes the probe
+    assert time.monotonic() - start >= 0.05
+    breaker.failure()  # failed probe: open for longer (capped)
+    start = time.monotonic()
+    breaker.wait()
+    assert time.monotonic() - start >= 0.08
+
+    released = threading.Event()
+    waiter = threading.Thread(target=lambda: (breaker.wait(), released.set()))
+    waiter.start()
+    assert not released.wait(0.05)  # held while the probe is in flight
+    breaker.success()
+    waiter.join(1)
+    assert released.is_set()
+    assert not breaker.is_open
+    assert breaker.trips == 2
+
+
+def test_breaker_keeps_queued_lookups() -> None:
+    flaky = FlakyResolver([OSError("down")] * 3)
+    resolver = throttled(flaky, breaker=CircuitBreaker(threshold=3, cooldown=0.05))
+    titles = [f"Movie {i}" for i in range(8)]
+    results: dict[str, list] = {}
+
+    def lookup(title: str) -> None:
+        results[title] = resolver.search(title, "2000")
+
+    threads = [threading.Thread(target=lookup, args=(title,)) for title in titles]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(results) == titles
+    assert resolver.breaker.trips == 1
+    assert resolver.stats.failed == 0
+
+
+def test_run_skips_files_whose_lookup_failed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("REELNAME_CACHE_DIR", str(tmp_path / "cache"))
+    failing = {"Heat"}
+    error = "HTTPError 503"
+
+    def search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        if title in failing:
+            raise LookupFailedError(error)
+        return title, year
+
+    monkeypatch.setattr(utils, "_search_imdb", search)
+    media = tmp_path / "media"
+    media.mkdir()
+    (media / "Heat.1995.720p.mkv").write_bytes(b"")
+    (media / "Inception.2010.720p.mkv").write_bytes(b"")
+
+    result = CliRunner().invoke(main, ["--no-cache", str(media)])
+
+    assert result.exit_code == 0, result.output
+    assert "⏩ Skipping (lookup failed, HTTPError 503): Heat.1995.720p.mkv" in result.output
+    assert sorted(p.name for p in media.iterdir()) == [
+        "Heat.1995.720p.mkv",
+        "Inception (2010) 720p.mkv",
+    ]
+
+    # not recorded as handled, so the next run tries again
+    failing.clear()
+    result = CliRunner().invoke(main, ["--no-cache", str(media)])
+    assert "✅ Renamed: Heat.1995.720p.mkv → Heat (1995) 720p.mkv" in result.output
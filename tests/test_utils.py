@@ -1,6 +1,16 @@
+from typing import Any
+
 import pytest
 
-from reelname.utils import extract_title_and_year, rebuild_filename
+from reelname.utils import (
+    _extract_slow,
+    _search_imdb,
+    extract_many,
+    extract_title_and_year,
+    get_match_score,
+    get_match_scores,
+    rebuild_filename,
+)
 
 from .data import EXTRACT_CASES, MOVIE_RENAME_CASES
 
@@ -20,3 +30,60 @@ def test_rebuild_filename_matches_extract(orig: str, expected_new: str) -> None:
     title, year = extract_title_and_year(orig)
     rebuilt = rebuild_filename(orig, title, year)  # type: ignore
     assert rebuilt == expected_new
+
+
+def test_get_match_scores_matches_get_match_score() -> None:
+    candidates = [new for _, new in MOVIE_RENAME_CASES] + ["", "Inception", "The Dark Knight"]
+    for title in ("Inception", "The Dark Knight", "Spider Man"):
+        assert get_match_scores(title, candidates) == [
+            get_match_score(title, candidate) for candidate in candidates
+        ]
+
+
+class FakeResolver:
+    def __init__(self, results: list[dict[str, Any]], years: dict[str, int]) -> None:
+        self.results = results
+        self.years = years
+        self.updated: list[str] = []
+
+    def search(self, title: str, year: str) -> list[dict[str, Any]]:
+        return self.results
+
+    def update(self, movie: dict[str, Any]) -> None:
+        self.updated.append(movie["title"])
+        movie["year"] = self.years[movie["title"]]
+
+
+def test_search_imdb_filters_by_year_and_updates_lazily() -> None:
+    resolver = FakeResolver(
+        [
+            {"title": "The Dark Knight", "year": 2012},  # wrong year, never scored
+            {"title": "Batman Begins"},  # missing year, but can't win
+            {"title": "The Dark Knight: The Making Of"},
+            {"title": "The Dark Knight"},  # missing year, and the winner
+        ],
+        years={"Batman Begins": 2005, "The Dark Knight": 2008},
+    )
+    assert _search_imdb("The Dark Knight", "2008", resolver) == ("The Dark Knight", "2008")
+    assert resolver.updated == ["The Dark Knight"]
+
+
+@pytest.mark.parametrize(
+    "filename, expected",
+    [
+        # bracketed beats dot-year, which beats space-year, wherever they appear
+        ("The.Movie.2010.Remake (2023).mkv", ("The Movie 2010 Remake", "2023")),
+        ("Title 1999 Something.2004.mkv", ("Title 1999 Something", "2004")),
+        ("Blade Runner 2049 2017 1080p.mkv", ("Blade Runner", "2049")),
+    ],
+)
+def test_extract_title_and_year_priority(filename: str, expected: tuple[str, str]) -> None:
+    assert extract_title_and_year(filename) == expected
+    assert _extract_slow(filename) == expected
+
+
+def test_extract_many() -> None:
+    filenames = [filename for filename, _ in EXTRACT_CASES]
+    expected = [title_year for _, title_year in EXTRACT_CASES]
+    assert extract_many(filenames) == expected
+    assert extract_many(filenames, processes=2, chunksize=4) == expected
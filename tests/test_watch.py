@@ -0,0 +1,155 @@
+import asyncio
+from pathlib import Path
+import threading
+
+import pytest
+
+from reelname import utils
+from reelname.pool import FairPool
+from reelname.reelname import FileChangeHandler
+from reelname.scan import ScanOptions
+
+
+def test_watcher_processes_only_settled_new_files_once(
+    tmp_path: Path, fake_search: list, capsys: pytest.CaptureFixture[str]
+) -> None:
+    (tmp_path / "Parasite.2019.1080p.mkv").write_bytes(b"")  # existing, never touched
+    loop = asyncio.new_event_loop()
+    handler = FileChangeHandler(tmp_path, loop, debounce=0.05)
+
+    async def scenario() -> None:
+        partial = tmp_path / "Inception.2010.1080p.mkv.part"
+        partial.write_bytes(b"x")
+        handler._notify(str(partial))  # ignored: still downloading
+
+        final = partial.with_suffix("")
+        partial.rename(final)
+        for _ in range(3):  # a burst of events for the same file
+            handler._notify(str(final))
+        growing = tmp_path / "Anora.2024.1080p.mkv"
+        growing.write_bytes(b"x")
+        handler._notify(str(growing))
+        await asyncio.sleep(0.03)
+        growing.write_bytes(b"xx")  # still growing when the window closes
+        await asyncio.sleep(0.5)
+
+        # our own rename shows up as a move; it must not be processed again
+        handler._notify(str(tmp_path / "Inception (2010) 1080p.mkv"))
+        await asyncio.sleep(0.2)
+
+    loop.run_until_complete(scenario())
+    loop.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "Anora (2024) 1080p.mkv",
+        "Inception (2010) 1080p.mkv",
+        "Parasite.2019.1080p.mkv",
+    ]
+    assert sorted(fake_search) == [("Anora", "2024"), ("Inception", "2010")]
+    output = capsys.readouterr().out
+    assert output.count("Detected new file") == 2
+    assert "Skipping already formatted" not in output
+
+
+def test_failing_file_does_not_take_its_batch_down(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    broken = True
+
+    def search(title: str, year: str, resolver: object = None) -> tuple[str, str]:
+        if title == "Heat" and broken:
+            raise RuntimeError("boom")
+        return title, year
+
+    monkeypatch.setattr(utils, "_search_imdb", search)
+    loop = asyncio.new_event_loop()
+    handler = FileChangeHandler(tmp_path, loop, debounce=0.02)
+
+    async def scenario() -> None:
+        nonlocal broken
+        for name in ("Heat.1995.720p.mkv", "Anora.2024.1080p.mkv"):
+            (tmp_path / name).write_bytes(b"")
+            handler._notify(str(tmp_path / name))
+        await asyncio.sleep(0.3)
+        broken = False
+        handler._notify(str(tmp_path / "Heat.1995.720p.mkv"))  # its next event retries it
+        await asyncio.sleep(0.3)
+
+    loop.run_until_complete(scenario())
+    loop.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "Anora (2024) 1080p.mkv",
+        "Heat (1995) 720p.mkv",
+    ]
+    assert (
+        "⚠️ Failed to process Heat.1995.720p.mkv: RuntimeError('boom')" in capsys.readouterr().err
+    )
+
+
+def test_pool_takes_lanes_in_turn() -> None:
+    order: list[str] = []
+    release = threading.Event()
+
+    def work(item: str) -> None:
+        release.wait(1)
+        order.append(item)
+
+    async def scenario() -> None:
+        with FairPool(jobs=1) as pool:
+            blocker = asyncio.ensure_future(pool.run("busy", work, "first"))
+            await asyncio.sleep(0.01)
+            # a burst in one lane, then a single call in another
+            calls = [pool.run("busy", work, f"busy {i}") for i in range(3)]
+            calls.append(pool.run("quiet", work, "quiet"))
+            tasks = [asyncio.ensure_future(call) for call in calls]
+            await asyncio.sleep(0.01)
+            release.set()
+            await asyncio.gather(blocker, *tasks)
+
+    asyncio.run(scenario())
+
+    assert order == ["first", "busy 0", "quiet", "busy 1", "busy 2"]
+
+
+def test_roots_share_a_pool_and_keep_their_own_stats(tmp_path: Path, fake_search: list) -> None:
+    outer = tmp_path / "downloads"
+    inner = outer / "landing"
+    inner.mkdir(parents=True)
+    other = tmp_path / "movies"
+    other.mkdir()
+    loop = asyncio.new_event_loop()
+    pool = FairPool(jobs=2)
+    scan = ScanOptions(recursive=True)
+    handlers = [
+        FileChangeHandler(outer, loop, scan=scan, debounce=0.05, pool=pool, nested=(inner,)),
+        FileChangeHandler(inner, loop, scan=scan, debounce=0.05, pool=pool),
+        FileChangeHandler(other, loop, scan=scan, debounce=0.05, pool=pool),
+    ]
+    files = [
+        outer / "Heat.1995.720p.mkv",
+        inner / "Anora.2024.1080p.mkv",
+        other / "Inception.2010.1080p.mkv",
+        other / "Parasite.2019.1080p.mkv",
+    ]
+
+    async def scenario() -> None:
+        for file in files:
+            file.write_bytes(b"x")
+            for handler in handlers:  # each observed path reaches every enclosing root
+                if handler.directory in file.parents:
+                    handler._notify(str(file))
+        await asyncio.sleep(0.5)
+
+    loop.run_until_complete(scenario())
+    loop.close()
+    pool.close()
+
+    assert sorted(fake_search) == [
+        ("Anora", "2024"),
+        ("Heat", "1995"),
+        ("Inception", "2010"),
+        ("Parasite", "2019"),
+    ]
+    assert [(h.stats.files, h.stats.renamed) for h in handlers] == [(1, 1), (1, 1), (2, 2)]
+    assert (inner / "Anora (2024) 1080p.mkv").exists()